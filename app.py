@@ -18,12 +18,13 @@ import cv2  # OpenCV для сохранения изображений
 
 # Импорт наших модулей
 from modules.screen_capture import ScreenCapture  # Модуль захвата экрана
-from modules.yolo_detector import YoloDetector  # Модуль детекции карт через YOLO
+from modules.model_loader import BackgroundModelLoader  # Фоновая загрузка детектора (YOLO или клиент сервера)
 from modules.overlay_static import StaticOverlay  # Статичные overlay элементы (доска, капелька)
 from modules.overlay_dynamic import DynamicOverlay  # Динамический overlay (шкала, цифра, карты)
 from modules.game_state import GameState  # Глобальное состояние игры
 from modules.handler_processor import handler_processor  # Координатор обработки детекций
-from modules.all_card import all_card  # Список всех карт для поиска атрибутов
+from modules.frame_index import FrameIndex  # Индекс детекций кадра (категории, классы, сетка зон)
+from modules.card_registry import card_registry  # Реестр всех карт для поиска атрибутов
 from modules.functions import cnt_box_timer  # Функция для подсчета количества таймеров
 
 # Импорт конфигурации
@@ -39,7 +40,8 @@ from config import (
     ELIXIR_DROP_SIZE_PERCENT,   # Размер капельки в % от ширины ROI
     ELIXIR_BAR_WIDTH_PERCENT,   # Ширина шкалы эликсира
     ELIXIR_BAR_HEIGHT_RATIO,    # Высота шкалы относительно капельки
-    ELIXIR_BAR_OFFSET_RATIO     # Отступ шкалы от капельки
+    ELIXIR_BAR_OFFSET_RATIO,    # Отступ шкалы от капельки
+    INFERENCE_MODE              # Модель в процессе или на сервере инференса
 )
 
 
@@ -47,10 +49,10 @@ def main():
     """
     Главная функция приложения
 
-    1. Инициализация модулей (ScreenCapture, CardDetector)
+    1. Инициализация модулей (ScreenCapture), фоновая загрузка модели YOLO
     2. Выбор области экрана (ROI)
     3. Создание overlay элементов (статичные и динамические)
-    4. Загрузка модели YOLO
+    4. Ожидание загрузки и прогрева модели YOLO
     5. Инициализация GameState
     6. Основной цикл:
         - Захват кадра
@@ -66,16 +68,21 @@ def main():
     print("Clash Royale Bot")
     print("=" * 80)
 
+    # Время фаз запуска (сек) - для отслеживания времени до первой детекции
+    startup_started = time.perf_counter()
+    startup_timings = {}
 
     # ===== 1: ИНИЦИАЛИЗАЦИЯ МОДУЛЕЙ =====
     logger.info("Инициализация модулей...")
 
+    # Импорт, загрузка и прогрев модели идут в фоне параллельно с выбором ROI и созданием overlay
+    # (модель в процессе или клиент сервера инференса)
+    model_loader = BackgroundModelLoader(INFERENCE_MODE)
+    model_loader.start()
+
     # Создаем объект для захвата экрана
     screen_capture = ScreenCapture()
 
-    # Создаем объект детектора карт
-    detector = YoloDetector()
-
     logger.info("Модули инициализированы ✓ ")
 
 
@@ -97,6 +104,7 @@ def main():
             return
 
     logger.info("Область экрана настроена ✓ ")
+    startup_timings['roi'] = time.perf_counter() - startup_started
 
 
 
@@ -113,6 +121,9 @@ def main():
     roi_width = screen_capture.roi['width']
     roi_height = screen_capture.roi['height']
 
+    # Размер ROI известен - фоновый поток прогревает модель на кадрах этого размера
+    model_loader.set_frame_shape((roi_height, roi_width, 3))
+
     # --- ПАРАМЕТРЫ ДЛЯ ДОСКИ ---
     board_width = int(roi_width * BOARD_WIDTH_PERCENT)
     board_height = int(roi_height * BOARD_HEIGHT_PERCENT)
@@ -164,17 +175,24 @@ def main():
 
 
 
-    # ===== 4: ЗАГРУЗКА МОДЕЛИ YOLO =====
-    logger.info("Загрузка модели YOLO...")
+    startup_timings['overlay'] = time.perf_counter() - startup_started - startup_timings['roi']
+
+    # ===== 4: ОЖИДАНИЕ ЗАГРУЗКИ МОДЕЛИ YOLO =====
+    logger.info("Ожидание загрузки модели YOLO...")
 
-    # Загружаем обученную модель
-    if not detector.load_model():
+    # Модель загружается и прогревается в фоне с начала main()
+    waited = time.perf_counter()
+    detector = model_loader.result()
+    startup_timings['model_wait'] = time.perf_counter() - waited
+    if detector is None:
         # Если загрузка не удалась, завершаем программу
         logger.error("Не удалось загрузить модель. Завершение программы.")
         screen_capture.cleanup()
         return
 
     logger.info("Модель загружена ✓ ")
+    logger.info("Фазы загрузки модели (фон): %s",
+                ", ".join(f"{name} {seconds:.2f} с" for name, seconds in model_loader.timings.items()))
 
     # --- ПОДГОТОВКА ПАПКИ detection/ (если включен режим отладки) ---
     if DETECTION_TEST:
@@ -232,47 +250,49 @@ def main():
 
             # --- 6.2: ДЕТЕКЦИЯ КАРТ ---
 
+            # Новая версия файла модели → загрузка в фоне, подмена в detect() между кадрами
+            detector.poll_model_file()
+
             # Отправляем кадр в YOLO модель для детекции карт
-            detections = detector.detect(frame)
+            # (остаток интервала кадра - для выбора размера входа модели при YOLO_DYNAMIC_IMGSZ)
+            detections = detector.detect(frame, budget_ms=(frame_interval - (time.time() - start_time)) * 1000)
             time_after_detection = time.time()
 
+            # Время до первой детекции и фазы запуска
+            if frame_count == 0:
+                startup_timings['first_detection'] = time.perf_counter() - startup_started
+                print("Запуск: " + ", ".join(f"{name} {seconds:.2f} с" for name, seconds in startup_timings.items()))
+
             # Текущая временная метка (timestamp в секундах с начала эпохи)
             current_time = time.time()
 
+            # Индекс детекций кадра: один на все проверки и процессоры
+            frame_index = FrameIndex(detections)
+
             # --- 6.3: ОБРАБОТКА ТЕХНИЧЕСКИХ КЛАССОВ ---
 
             # Проверка на начало боя (_ start) - подготовка колоды
-            if not game_start_timer:
-                for det in detections:
-                    if det['class_name'] == '_ start':
-                        print("Обнаружен _ start - подготовка колоды противника\n")
-                        game_state.card_manager.reset()
-                        game_start_timer = True
-                        break
+            if not game_start_timer and frame_index.has_class('_ start'):
+                print("Обнаружен _ start - подготовка колоды противника\n")
+                game_state.card_manager.reset()
+                game_start_timer = True
 
             # Проверка на первый таймер (_ timer total) - старт игрового режима
-            if game_start_timer and not game_pre_start:
-                for det in detections:
-                    if det['class_name'] == '_ timer total':
-                        print("Обнаружен первый _ timer total - старт игрового режима\n")
-                        game_state.game_start_time = current_time
-                        game_state.time_screen = current_time
-                        game_pre_start = True
-                        break
+            if game_start_timer and not game_pre_start and frame_index.has_class('_ timer total'):
+                print("Обнаружен первый _ timer total - старт игрового режима\n")
+                game_state.game_start_time = current_time
+                game_state.time_screen = current_time
+                game_pre_start = True
 
             # Проверка на конец боя (_ finish)
-            game_finished = False
-            for det in detections:
-                if det['class_name'] == '_ finish':
-                    game_finished = True
-                    break
+            game_finished = frame_index.has_class('_ finish')
 
             # --- 6.4: ОБРАБОТКА ДЕТЕКЦИЙ (если игра началась) ---
             if game_pre_start and not game_finished:
 
                 # Запускаем ГЛАВНЫЙ ОБРАБОТЧИК ДЕТЕКЦИЙ
                 # В нем происходит обработка детекций и обновление game_state
-                handler_processor(detections, current_time, game_state, all_card)
+                handler_processor(detections, current_time, game_state, card_registry, frame_index)
                 time_after_processing = time.time()
 
                 # ОБНОВЛЕНИЕ ДИНАМИЧЕСКОГО OVERLAY (шкала + цифра + карты)
@@ -16,6 +16,11 @@ import os
 # ===== ПУТИ К ФАЙЛАМ И ПАПКАМ =====
 # Путь к папке с моделью YOLO
 MODEL_PATH = os.path.join("models", "train_clash_royale2", "weights", "best.pt")
+
+# Горячая замена модели: при изменении файла MODEL_PATH новая модель загружается и прогревается в фоне,
+# затем подменяется между кадрами (состояние боя, ROI и overlay сохраняются)
+MODEL_HOT_SWAP = True
+MODEL_WATCH_INTERVAL = 2.0  # интервал проверки файла модели (сек)
 # Путь к файлу для сохранения координат выбранной области экрана
 ROI_CONFIG_PATH = "roi_config.txt"
 
@@ -72,6 +77,120 @@ YOLO_CONFIDENCE = 0.42  # Минимальный порог уверенност
 YOLO_IMG_SIZE = 544  # Размер изображения для обработки моделью (ширина, высота)
 YOLO_IOU = 0.85  # Минимальный порог IoU для фильтрации задвоенных детекций
 
+# Способ инференса: "direct" - свой letterbox и прямой вызов сети (modules/yolo_direct.py),
+# "predict" - model.predict() ultralytics (при ошибке подготовки "direct" используется он же).
+# "direct" включать после проверки совпадения детекций на своих кадрах: tools/compare_backends.py
+YOLO_BACKEND = "predict"
+
+# Режим исполнения сети для YOLO_BACKEND = "direct" (сеть готовится под фиксированный размер ROI):
+# None - eager, "torchscript" - trace + freeze (артефакт кэшируется на диске), "compile" - torch.compile
+YOLO_COMPILE_MODE = None
+YOLO_COMPILE_DIR = os.path.join("cache", "compiled")  # папка артефактов компиляции (ключ - хэш модели)
+
+# Размер входа модели по бюджету времени кадра: набор прогретых размеров, под нагрузкой - меньше,
+# в простое - больше (гистерезис: вниз сразу при превышении, вверх после паузы и с запасом по времени)
+YOLO_DYNAMIC_IMGSZ = False
+YOLO_IMG_SIZES = (448, 544, 640)  # прогреваемые размеры входа (YOLO_IMG_SIZE - начальный)
+YOLO_LATENCY_BUDGET_MS = 150  # бюджет времени инференса кадра (мс), не больше остатка интервала кадра
+YOLO_IMGSZ_DOWN_RATIO = 0.9  # время размера выше этой доли бюджета - размер уменьшается
+YOLO_IMGSZ_UP_RATIO = 0.6  # прогноз времени следующего размера до этой доли бюджета - размер увеличивается
+YOLO_IMGSZ_HOLD_FRAMES = 8  # минимум кадров на размере перед увеличением
+
+# Статическая маска интерфейса: области ROI (x1, y1, x2, y2 в долях ширины/высоты), где никогда нет нужных классов.
+# Области закрашиваются, полосы маски по краям ROI обрезаются - вход сети меньше при том же масштабе
+# (сеть уже получает прямоугольный вход по пропорциям ROI, поля letterbox - только до кратного 32).
+# Пустой список - без маски. Совпадение детекций с маской и без: tools/check_static_mask.py
+YOLO_STATIC_MASK = []  # например [(0.0, 0.0, 1.0, 0.05)] - полоса вверху ROI
+
+# Прогрев модели и подбор количества потоков CPU при загрузке
+YOLO_WARMUP_RUNS = 3  # прогревочных прогонов синтетическими кадрами (ленивая инициализация, аллокатор)
+YOLO_THREAD_BENCH_RUNS = 5  # замеров на каждый вариант количества потоков
+YOLO_THREAD_CANDIDATES = None  # варианты количества потоков (None - автоматически от числа ядер)
+YOLO_THREADS_CONFIG_PATH = "inference_threads.json"  # сохраненный выбор потоков по хостам
+
+# Пороги уверенности по классам (переопределяют YOLO_CONFIDENCE для отдельных классов)
+# Сначала читается файл калибровки, затем поверх применяется словарь из конфига
+YOLO_CLASS_CONFIDENCE_PATH = "class_confidence.json"  # файл калибровки (tools/calibrate_confidence.py)
+YOLO_CLASS_CONFIDENCE = {
+    # "_ lvl red": 0.35,  # пример: мелкий класс, поднимаем recall
+}
+
+# Подавление дублей по группам классов (после NMS ultralytics с порогом YOLO_IOU)
+# iou - порог IoU для дублей одного класса, cross_iou - для дублей разных классов группы
+# (из дублей разных классов остается метка с максимальной уверенностью), None - не сливать
+# categories - категории из class_taxonomy.CATEGORY_NAMES, classes - точные class_name
+YOLO_NMS_ENABLED = True
+YOLO_NMS_GROUPS = {
+    'units': {'categories': ['unit/building'], 'iou': 0.7, 'cross_iou': 0.8},
+    'field spells': {'categories': ['field spell'], 'iou': 0.6, 'cross_iou': 0.7},
+    'hand spells': {'categories': ['hand spell'], 'iou': 0.5, 'cross_iou': 0.5},
+    'abilities': {'categories': ['ability'], 'iou': 0.6, 'cross_iou': 0.7},
+    'levels': {'categories': ['level', 'level champion'], 'iou': 0.6, 'cross_iou': 0.7},
+    'timers': {'categories': ['timer'], 'iou': 0.6, 'cross_iou': None},
+}
+
+# Каскад моделей: быстрая модель на каждом кадре, большая (MODEL_PATH) - только на областях
+# вокруг неуверенных детекций быстрой модели и новых красных таймеров
+CASCADE_ENABLED = False
+CASCADE_FAST_MODEL_PATH = os.path.join("models", "train_clash_royale_nano", "weights", "best.pt")
+CASCADE_UNCERTAIN_BAND = (0.25, 0.6)  # уверенность быстрой модели, при которой детекция уточняется
+CASCADE_NEW_TIMER_IOU = 0.3  # красный таймер с IoU ниже этого к таймерам прошлого кадра - новый
+CASCADE_CROP_SIZE = 256  # размер входа основной модели для областей (каскад и области изменений кадра)
+CASCADE_CROP_PADDING = 0.5  # контекст вокруг бокса (доля размера бокса с каждой стороны)
+CASCADE_CROP_MIN_SIDE = 128  # минимальная сторона области (пиксели кадра); не меньше стороны с масштабом всего кадра
+CASCADE_MAX_CROPS = 6  # максимум областей на кадр
+
+# Инференс только по изменившимся областям кадра (между розыгрышами большая часть арены статична),
+# детекции неизменившейся части кадра переносятся с прошлого кадра
+MOTION_MASK_ENABLED = False
+MOTION_BLOCK_SIZE = 32  # размер блока сетки разности кадров (пиксели)
+MOTION_THRESHOLD = 10.0  # средняя абсолютная разность яркости в блоке, начиная с которой блок изменился
+MOTION_MAX_REGIONS = 4  # больше областей - инференс всего кадра
+MOTION_MAX_AREA = 0.5  # доля изменившейся площади кадра, начиная с которой - инференс всего кадра
+MOTION_REFRESH_INTERVAL = 15  # инференс всего кадра каждые N кадров (обновление перенесенных детекций)
+
+# Детекция по ключевым кадрам: модель - каждые KEYFRAME_INTERVAL кадров (и при изменениях сцены),
+# между ними боксы переносятся оптическим потоком (Lucas-Kanade). Вместе с FPS = 12 и KEYFRAME_INTERVAL = 3
+# дает 12 обновлений детекций в секунду при ~4 запусках модели
+KEYFRAME_ENABLED = False
+KEYFRAME_INTERVAL = 3  # ключевой кадр не реже чем каждые N кадров
+KEYFRAME_ON_CHANGE = True  # внеочередной ключевой кадр: большое изменение сцены или изменение без известных боксов
+KEYFRAME_CONFIDENCE_DECAY = 0.9  # множитель уверенности перенесенного бокса за кадр (затухает до порога класса, не ниже)
+KEYFRAME_FLOW_SCALE = 0.5  # масштаб кадра для оптического потока
+KEYFRAME_FLOW_GRID = 3  # сетка точек потока в боксе (N x N)
+KEYFRAME_MIN_POINTS = 3  # минимум отслеженных точек бокса (иначе бокс потерян)
+
+# Заклинания в НАШЕЙ руке определяет классификатор четырех слотов руки (сравнение с картинками карт из data/),
+# классы "Z..." основной модели отбрасываются
+HAND_CLASSIFIER_ENABLED = False
+HAND_SLOT_BOXES = [  # слоты руки (x1, y1, x2, y2) в долях ширины/высоты ROI, слева направо
+    (0.215, 0.835, 0.385, 0.951),
+    (0.408, 0.835, 0.578, 0.951),
+    (0.601, 0.835, 0.771, 0.951),
+    (0.794, 0.835, 0.964, 0.951),
+]
+HAND_CLASSIFIER_THRESHOLD = 0.8  # минимальная корреляция слота с картинкой карты-заклинания
+
+# Трекинг детекций между кадрами (постоянный track_id у каждой детекции)
+TRACKER_ENABLED = True
+TRACKER_HIGH_CONFIDENCE = 0.6  # граница высокой уверенности (первый этап сопоставления)
+TRACKER_MATCH_IOU = 0.3  # минимальный IoU трек-детекция (первый этап)
+TRACKER_LOW_MATCH_IOU = 0.2  # минимальный IoU трек-детекция (второй этап, низкая уверенность)
+TRACKER_MAX_LOST = 6  # сколько кадров трек живет без подтверждения (6 кадров = 1.5 сек при FPS=4)
+
+# Дисковый кэш детекций (для повторных прогонов записанных боев и подбора параметров процессоров)
+# None - кэш выключен (в рабочем режиме кадры не повторяются)
+DETECTION_CACHE_DIR = None  # например os.path.join("cache", "detections")
+DETECTION_CACHE_MAX_MB = 512  # максимальный размер кэша на диске
+
+# Сервер инференса: одна модель на несколько ботов (столов), кадры через Unix-сокет, пачки между клиентами
+# "local" - модель в процессе бота, "client" - детекции от сервера (python tools/inference_server.py)
+INFERENCE_MODE = "local"
+INFERENCE_SERVER_ADDRESS = "127.0.0.1:47650" if os.name == "nt" else "/tmp/clash_royale_yolo.sock"  # на Windows - TCP
+INFERENCE_MAX_BATCH = 4  # максимум кадров в пачке
+INFERENCE_MAX_WAIT_MS = 5.0  # сколько сервер ждет остальные кадры пачки после первого
+INFERENCE_CLIENT_TIMEOUT = 5.0  # таймаут ответа сервера (сек)
+
 
 # ===== НАСТРОЙКИ ОТЛАДКИ/ТЕСТИРОВАНИЯ =====
 DETECTION_TEST = True     # True - сохранять кадры, False - не сохранять
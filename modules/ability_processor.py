@@ -12,7 +12,9 @@ logger.setLevel(logging.INFO)
 logger.info("Загружен модуль: %s", __name__)
 
 from typing import Dict, List, Any, Optional, Tuple
-from modules.classes import Card
+from modules.card_registry import CardRegistry
+from modules.frame_index import FrameIndex
+from modules.class_taxonomy import CATEGORY_ABILITY, CATEGORY_LEVEL_CHAMPION
 
 
 def check_ability_dict_timeout(
@@ -44,49 +46,24 @@ def check_ability_dict_timeout(
         del ability_dict_enemy[class_name]
 
 
-def _is_box_in_zone(box: Tuple[float, float, float, float], zone: Tuple[float, float, float, float]) -> bool:
-    """
-    Проверяет находится ли центр бокса внутри зоны.
-
-    Args:
-        box: бокс для проверки (x1, y1, x2, y2)
-        zone: зона (x1, y1, x2, y2)
-
-    Returns:
-        True если центр бокса в зоне
-
-    Логика:
-        - Вычисляем центр бокса
-        - Проверяем вхождение центра в зону
-    """
-    # Центр бокса
-    box_center_x = (box[0] + box[2]) / 2
-    box_center_y = (box[1] + box[3]) / 2
-
-    # Проверка вхождения в зону
-    return (zone[0] <= box_center_x <= zone[2] and
-            zone[1] <= box_center_y <= zone[3])
-
-
 def _find_red_level_in_zone(
     box_ability: Tuple[float, float, float, float],
-    all_detections: List[Dict[str, Any]]
+    frame_index: FrameIndex
 ) -> bool:
     """
     Ищет красный уровень чемпиона (_lvl_red_cham) в зоне над абилкой.
 
     Args:
         box_ability: бокс абилки (x1, y1, x2, y2)
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
 
     Returns:
         True если найден красный уровень в зоне, False иначе
 
     Логика:
         1. Расширяем box_ability ВВЕРХ на полкорпуса (0.5 высоты)
-        2. Ищем детекции "_lvl_red_cham" в all_detections
-        3. Проверяем пересечение через _is_box_in_zone()
-        4. Если нашли хотя бы один → возвращаем True
+        2. Ищем детекции "_lvl_red_cham", центр которых в зоне (frame_index.centers_in)
+        3. Если нашли хотя бы один → возвращаем True
 
     Обоснование:
         Абилки визуализируются на месте чемпиона или рядом с ним.
@@ -99,54 +76,24 @@ def _find_red_level_in_zone(
     # Зона поиска: расширяем вверх на полкорпуса (0.5 высоты)
     search_zone = (x1, y1 - h * 0.5, x2, y2)
 
-    # Ищем красный уровень в детекциях
-    for detection in all_detections:
-        class_name = detection.get('class_name', '')
-        if class_name == '_ lvl red cham':
-            # Получаем бокс красного уровня
-            box_lvl = detection.get('bbox')  # (x1, y1, x2, y2)
-            if box_lvl and _is_box_in_zone(box_lvl, search_zone):
-                # Красный уровень найден в зоне!
-                return True
-
-    # Красный уровень не найден
-    return False
-
-
-def _find_card_by_ability_class_name(
-    class_name: str,
-    all_cards: List[Card]
-) -> Optional[Card]:
-    """
-    Вспомогательная функция для поиска карты чемпиона по ability_class_name.
-
-    Args:
-        class_name: ability_class_name для поиска
-        all_cards: список всех карт
-
-    Returns:
-        Card если найдена, None иначе
-    """
-    for card in all_cards:
-        if card.ability_class_name == class_name:
-            return card
-    return None
+    # Ищем красный уровень в зоне (только ячейки сетки зоны)
+    return bool(frame_index.centers_in(search_zone, (CATEGORY_LEVEL_CHAMPION,)))
 
 
 def process_ability_detections(
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     ability_dict_enemy: Dict[str, float],
     current_time: float,
-    all_cards: List[Card]
+    cards: CardRegistry
 ) -> float:
     """
     Главная функция обработки абилок чемпионов.
 
     Args:
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
         ability_dict_enemy: словарь таймаутов ВРАЖЕСКИХ активных абилок
         current_time: текущая временная метка
-        all_cards: список всех карт
+        cards: реестр карт
 
     Returns:
         float: суммарный потраченный эликсир в текущей итерации
@@ -154,7 +101,7 @@ def process_ability_detections(
     Логика (последовательность):
         1. Очистка истекших таймаутов ability_dict_enemy
         2. Обработка детекций абилок:
-           - Ищем абилки в all_detections (class_name начинается с "A": AC, AR, AE, AL)
+           - Ищем абилки в frame_index (class_name начинается с "A": AC, AR, AE, AL)
            - Для каждой абилки:
              a) Проверяем ability_dict_enemy → если ЕСТЬ → уже обработана → игнорируем
              b) Ищем красный уровень (_lvl_red_cham) в зоне над абилкой
@@ -179,15 +126,12 @@ def process_ability_detections(
     # 2. Обработка детекций абилок
     elixir_spent_total = 0.0
 
-    for detection in all_detections:
-        class_name = detection.get('class_name', '')
-
-        # Фильтруем абилки чемпионов (начинаются с "A": AC, AR, AE, AL)
-        if not (class_name and class_name.startswith('A') and len(class_name) > 1):
-            continue
+    # Абилки чемпионов (категория "A": AC, AR, AE, AL)
+    for detection in frame_index.of_category(CATEGORY_ABILITY):
+        class_name = detection['class_name']
 
         # Проверяем что это действительно абилка чемпиона
-        card = _find_card_by_ability_class_name(class_name, all_cards)
+        card = cards.by_ability_class_name(class_name)
         if not card or not card.champion:
             continue
 
@@ -201,7 +145,7 @@ def process_ability_detections(
         if not box_ability:
             continue
 
-        has_red_level = _find_red_level_in_zone(box_ability, all_detections)
+        has_red_level = _find_red_level_in_zone(box_ability, frame_index)
 
         # c) ВРАЖЕСКАЯ абилка (красный уровень найден)
         if has_red_level:
@@ -3,7 +3,7 @@
 Менеджер для управления циклом карт противника
 
 Управляет:
-- deck_cards: множество всех доступных карт (121 карта)
+- deck_cards: все еще неизвестные карты колоды (121 карта) по class_name
 - await_cards: очередь из 4 карт в ожидании (слева на панели)
 - hand_cards: список из 4 карт в руке противника (справа на панели)
 """
@@ -18,13 +18,12 @@ logger.info("Загружен модуль: %s", __name__)
 import sys
 from pathlib import Path
 from typing import Optional, List, Dict
-import copy
 
 # Добавляем корневую папку проекта в sys.path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from modules.classes import Card
-from modules import all_card
+from modules.card_registry import card_registry
 from modules.evolution_processor import find_oldest_detect_marker, mark_evolution_as_recorded
 
 
@@ -33,7 +32,7 @@ class CardManager:
     Класс для управления циклом карт противника
 
     Attributes:
-        deck_cards (set): Множество всех доступных карт (уменьшается по мере открытия)
+        deck_cards (dict): class_name → карта, все доступные карты (уменьшается по мере открытия)
         await_cards (list): Очередь из 4 карт в ожидании
         hand_cards (list): Список из 4 карт в руке
     """
@@ -44,18 +43,8 @@ class CardManager:
         Создает deck_cards со всеми 121 картами.
         Заполняет await_cards и hand_cards карточками-заглушками card_random.
         """
-        # Собираем все карты из total_card.py в список (кроме Card_random)
-        self.deck_cards = []
-
-        # Получаем все атрибуты из модуля total_card
-        for attr_name in dir(all_card):
-            # Ищем только переменные начинающиеся с "Card_" (но не Card_random)
-            if attr_name.startswith('Card_') and attr_name != 'Card_random':
-                card = getattr(all_card, attr_name)
-                # Проверяем что это экземпляр класса Card
-                if isinstance(card, Card):
-                    # Создаем глубокую копию карты
-                    self.deck_cards.append(copy.deepcopy(card))
+        # Копии всех карт реестра (кроме Card_random), поиск по class_name за O(1)
+        self.deck_cards: Dict[str, Card] = {card.class_name: card for card in card_registry.deck()}
 
         # Инициализируем await_cards и hand_cards заглушками
         self.await_cards = [self.card_random() for _ in range(4)]
@@ -69,7 +58,7 @@ class CardManager:
         Returns:
             Card: Карта со знаком вопроса (Card_random)
         """
-        return copy.deepcopy(all_card.Card_random)
+        return card_registry.random_card()
 
 
     def play_new_card(self, class_name: str, evolution_dict_timer: Dict[float, str] | None = None) -> bool:
@@ -93,11 +82,7 @@ class CardManager:
             bool: True если успешно, False если что-то пошло не так
         """
         # Ищем карту в deck_cards по class_name
-        found_card = None
-        for card in self.deck_cards:
-            if card.class_name == class_name:
-                found_card = card
-                break
+        found_card = self.deck_cards.get(class_name)
 
         # Проверяем что карта есть в deck_cards
         if found_card is None:
@@ -126,12 +111,11 @@ class CardManager:
         # await_cards теперь имеет 3 элемента [0,1,2]
 
         # 4. На первую позицию в await_cards ставим новую карту
-        new_card = copy.deepcopy(found_card)
+        new_card = found_card
         self.await_cards.insert(0, new_card)
 
-        # 5. Удаляем карту из deck_cards
-        if found_card in self.deck_cards:
-            self.deck_cards.remove(found_card)
+        # 5. Удаляем карту из deck_cards (карта колоды - уже копия из реестра)
+        del self.deck_cards[class_name]
 
         # 6. Обрабатываем маркер эволюции (если есть)
         if evolution_dict_timer is not None:
@@ -262,10 +246,7 @@ class CardManager:
         Returns:
             Optional[Card]: Найденная карта или None если не найдена
         """
-        for card in self.deck_cards:
-            if card.class_name == class_name:
-                return card
-        return None
+        return self.deck_cards.get(class_name)
 
 
     def get_deck_size(self) -> int:
@@ -0,0 +1,137 @@
+"""
+Модуль реестра карт.
+Неизменяемый реестр строится один раз при импорте из all_card: словари по всем ключам
+поиска (card_id, class_name, spell_my_hand_class_name, ability_class_name) и готовые
+наборы карт по типам. Процессоры и CardManager ищут карты за O(1) вместо перебора all_card.
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+import copy
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.classes import Card
+from modules.all_card import all_card
+
+RANDOM_CARD_ID = 0  # card_id карты-заглушки (неизвестная карта противника)
+
+
+def _build_index(cards: Tuple[Card, ...], key: str) -> MappingProxyType:
+    """
+    Словарь значение атрибута → карта (карты без значения пропускаются).
+
+    Raises:
+        ValueError: две карты с одинаковым значением ключа
+    """
+    index: Dict = {}
+    for card in cards:
+        value = getattr(card, key)
+        if value is None:
+            continue
+        if value in index:
+            raise ValueError(f"Повтор {key}={value!r}: {index[value].card_name} и {card.card_name}")
+        index[value] = card
+    return MappingProxyType(index)
+
+
+class CardRegistry:
+    """
+    Неизменяемый реестр карт с индексами по ключам поиска.
+
+    Карты реестра общие для всех потребителей и только читаются: изменяемое состояние
+    карты в бою (cnt_evo) - у копий в CardManager (deck(), random_card()).
+
+    Attributes:
+        cards (tuple): все карты в порядке all_card
+        spell_cards, champion_cards, evolution_cards (tuple): карты по типам
+        spell_class_names (frozenset): class_name заклинаний на поле
+        hand_spell_class_names (frozenset): class_name заклинаний в НАШЕЙ руке
+        ability_class_names (frozenset): class_name абилок чемпионов
+    """
+
+    __slots__ = (
+        'cards', '_by_id', '_by_class_name', '_by_hand_class_name', '_by_ability_class_name', '_by_any_name',
+        'spell_cards', 'champion_cards', 'evolution_cards',
+        'spell_class_names', 'hand_spell_class_names', 'ability_class_names',
+    )
+
+    def __init__(self, cards: Iterable[Card]):
+        """
+        Args:
+            cards: список карт (all_card)
+
+        Raises:
+            ValueError: повтор card_id или одного из class_name
+        """
+        cards = tuple(cards)
+        setattr_ = object.__setattr__
+        setattr_(self, 'cards', cards)
+        setattr_(self, '_by_id', _build_index(cards, 'card_id'))
+        setattr_(self, '_by_class_name', _build_index(cards, 'class_name'))
+        setattr_(self, '_by_hand_class_name', _build_index(cards, 'spell_my_hand_class_name'))
+        setattr_(self, '_by_ability_class_name', _build_index(cards, 'ability_class_name'))
+
+        # Все три нейминга карты в одном словаре (связь классов модели с картами)
+        by_any_name: Dict[str, Card] = {}
+        for index in (self._by_class_name, self._by_hand_class_name, self._by_ability_class_name):
+            for name, card in index.items():
+                if name in by_any_name and by_any_name[name] is not card:
+                    raise ValueError(f"class_name {name!r} у двух карт: {by_any_name[name].card_name} и {card.card_name}")
+                by_any_name[name] = card
+        setattr_(self, '_by_any_name', MappingProxyType(by_any_name))
+
+        setattr_(self, 'spell_cards', tuple(card for card in cards if card.spell))
+        setattr_(self, 'champion_cards', tuple(card for card in cards if card.champion))
+        setattr_(self, 'evolution_cards', tuple(card for card in cards if card.evolution))
+        setattr_(self, 'spell_class_names', frozenset(card.class_name for card in self.spell_cards if card.class_name))
+        setattr_(self, 'hand_spell_class_names', frozenset(self._by_hand_class_name))
+        setattr_(self, 'ability_class_names', frozenset(
+            card.ability_class_name for card in self.champion_cards if card.ability_class_name
+        ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CardRegistry неизменяем")
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def by_id(self, card_id: int) -> Optional[Card]:
+        """Карта по card_id."""
+        return self._by_id.get(card_id)
+
+    def by_class_name(self, class_name: str) -> Optional[Card]:
+        """Карта по class_name на поле боя."""
+        return self._by_class_name.get(class_name)
+
+    def by_hand_class_name(self, class_name: str) -> Optional[Card]:
+        """Карта-заклинание по class_name в НАШЕЙ руке (spell_my_hand_class_name)."""
+        return self._by_hand_class_name.get(class_name)
+
+    def by_ability_class_name(self, class_name: str) -> Optional[Card]:
+        """Карта чемпиона по class_name абилки."""
+        return self._by_ability_class_name.get(class_name)
+
+    def by_any_name(self, class_name: str) -> Optional[Card]:
+        """Карта по любому из трех неймингов (поле, НАША рука, абилка)."""
+        return self._by_any_name.get(class_name)
+
+    def deck(self) -> List[Card]:
+        """Копии всех карт колоды (без заглушки) для CardManager."""
+        return [copy.deepcopy(card) for card in self.cards if card.card_id != RANDOM_CARD_ID]
+
+    def random_card(self) -> Card:
+        """Копия карты-заглушки для неизвестных карт противника."""
+        return copy.deepcopy(self._by_id[RANDOM_CARD_ID])
+
+
+# Реестр всех карт (строится один раз при импорте)
+card_registry = CardRegistry(all_card)
@@ -0,0 +1,160 @@
+"""
+Модуль геометрии каскада моделей.
+Быстрая модель работает на всем кадре, большая - только на квадратных областях (crop)
+вокруг неуверенных детекций и новых красных таймеров. Здесь - выбор областей,
+масштаб областей (как у всего кадра) и слияние результатов большой модели с детекциями быстрой модели.
+"""
+
+import math
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+import numpy as np
+
+from modules.detection_postprocess import DetectionArrays, iou_matrix
+
+
+def box_centers(boxes: np.ndarray) -> np.ndarray:
+    """Центры боксов (N, 2)."""
+    return (boxes[:, :2] + boxes[:, 2:]) / 2
+
+
+def points_in_regions(points: np.ndarray, regions: np.ndarray) -> np.ndarray:
+    """
+    Попадание точек в прямоугольные области.
+
+    Args:
+        points: (N, 2) координаты x, y
+        regions: (R, 4) области x1, y1, x2, y2
+
+    Returns:
+        np.ndarray: (N, R) bool
+    """
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    return (
+        (x >= regions[None, :, 0]) & (x < regions[None, :, 2]) &
+        (y >= regions[None, :, 1]) & (y < regions[None, :, 3])
+    )
+
+
+def full_frame_scale(frame_hw, imgsz: int) -> float:
+    """Масштаб кадра во входе модели при инференсе всего кадра (letterbox до imgsz)."""
+    return imgsz / max(frame_hw)
+
+
+def full_scale_side(frame_hw, crop_size: int, imgsz: int) -> int:
+    """
+    Сторона области кадра, которая при приведении к crop_size получает масштаб всего кадра:
+    объекты в области модель видит того же размера, что и при инференсе всего кадра.
+
+    Args:
+        frame_hw: размер кадра (h, w)
+        crop_size: размер входа модели для областей
+        imgsz: размер входа модели для всего кадра
+
+    Returns:
+        int: сторона области (не больше меньшей стороны кадра)
+    """
+    return min(math.ceil(crop_size / full_frame_scale(frame_hw, imgsz)), min(frame_hw))
+
+
+def crop_input_scale(region_side: float, crop_size: int, frame_hw, imgsz: int) -> float:
+    """
+    Масштаб области во входе модели: область уменьшается до crop_size, но не увеличивается
+    сильнее масштаба всего кадра (меньшая область вписывается во вход с полями).
+    """
+    return min(crop_size / region_side, full_frame_scale(frame_hw, imgsz))
+
+
+def build_crop_regions(
+    boxes: np.ndarray,
+    frame_hw,
+    padding: float = 0.5,
+    min_side: int = 128,
+    max_regions: int = 6
+) -> np.ndarray:
+    """
+    Квадратные области кадра для уточнения детекций большой моделью.
+
+    Бокс расширяется на padding своего размера с каждой стороны (контекст вокруг объекта),
+    сторона области не меньше min_side, область сдвигается внутрь кадра.
+    Бокс, центр которого уже попал в построенную область, новую область не создает.
+
+    Args:
+        boxes: (N, 4) боксы в порядке приоритета
+        frame_hw: размер кадра (h, w)
+        padding: доля размера бокса, добавляемая с каждой стороны
+        min_side: минимальная сторона области
+        max_regions: максимум областей на кадр
+
+    Returns:
+        np.ndarray: (R, 4) float32 области x1, y1, x2, y2 (целые координаты)
+    """
+    frame_h, frame_w = frame_hw
+    limit = min(frame_h, frame_w)
+    regions = []
+
+    for box, center in zip(boxes, box_centers(boxes)):
+        if len(regions) >= max_regions:
+            break
+        if regions and points_in_regions(center[None, :], np.asarray(regions)).any():
+            continue
+
+        side = max(box[2] - box[0], box[3] - box[1]) * (1 + 2 * padding)
+        side = int(min(max(side, min_side), limit))
+        x1 = int(np.clip(round(center[0] - side / 2), 0, frame_w - side))
+        y1 = int(np.clip(round(center[1] - side / 2), 0, frame_h - side))
+        regions.append((x1, y1, x1 + side, y1 + side))
+
+    return np.asarray(regions, dtype=np.float32).reshape(-1, 4)
+
+
+def new_object_mask(boxes: np.ndarray, previous_boxes: np.ndarray, iou_threshold: float = 0.3) -> np.ndarray:
+    """
+    Маска боксов, не совпадающих ни с одним боксом прошлого кадра (новые объекты).
+
+    Args:
+        boxes: (N, 4) боксы текущего кадра
+        previous_boxes: (M, 4) боксы прошлого кадра
+        iou_threshold: IoU, начиная с которого объект считается тем же
+
+    Returns:
+        np.ndarray: (N,) bool
+    """
+    if len(previous_boxes) == 0:
+        return np.ones(len(boxes), dtype=bool)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=bool)
+    return iou_matrix(boxes, previous_boxes).max(axis=1) < iou_threshold
+
+
+def merge_region_detections(base: DetectionArrays, refined: DetectionArrays, regions: np.ndarray) -> DetectionArrays:
+    """
+    Слияние детекций: внутри областей остаются только уточненные детекции большой модели.
+
+    Args:
+        base: детекции быстрой модели по всему кадру
+        refined: детекции большой модели в областях (в координатах кадра)
+        regions: (R, 4) области уточнения
+
+    Returns:
+        DetectionArrays: детекции кадра
+    """
+    if len(regions) == 0:
+        return base
+
+    # Детекции быстрой модели с центром в области заменяются результатом большой модели
+    outside = ~points_in_regions(box_centers(base.boxes), regions).any(axis=1)
+    base = base.select(outside)
+
+    # Дубли из пересекающихся областей убирает suppress_duplicates в постобработке
+    return DetectionArrays(
+        np.concatenate([base.boxes, refined.boxes]),
+        np.concatenate([base.scores, refined.scores]),
+        np.concatenate([base.class_ids, refined.class_ids]),
+    )
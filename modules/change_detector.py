@@ -0,0 +1,201 @@
+"""
+Модуль поиска изменившихся областей кадра (разность кадров по блокам).
+Между розыгрышами большая часть арены статична: детектор запускается только на
+квадратных областях вокруг изменившихся блоков, детекции остальной части кадра
+переносятся с прошлого кадра. Периодический полный кадр обновляет перенесенные детекции.
+"""
+
+import math
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def label_blocks(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Связные группы блоков (4-связность) сетки изменений.
+
+    Args:
+        mask: (GH, GW) bool - изменившиеся блоки
+
+    Returns:
+        list: прямоугольники групп в блоках (row1, col1, row2, col2), row2/col2 не включительно
+    """
+    rows, cols = mask.shape
+    seen = np.zeros_like(mask)
+    groups = []
+
+    for start_row, start_col in zip(*np.nonzero(mask)):
+        if seen[start_row, start_col]:
+            continue
+        seen[start_row, start_col] = True
+        stack = [(start_row, start_col)]
+        r1, c1, r2, c2 = start_row, start_col, start_row, start_col
+        while stack:
+            r, c = stack.pop()
+            r1, c1, r2, c2 = min(r1, r), min(c1, c), max(r2, r), max(c2, c)
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and mask[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    stack.append((nr, nc))
+        groups.append((int(r1), int(c1), int(r2) + 1, int(c2) + 1))
+
+    return groups
+
+
+def square_tiles(rect, frame_hw, max_side: int, min_side: int = 0) -> List[Tuple[int, int, int, int]]:
+    """
+    Покрытие прямоугольника квадратами со стороной от min_side до max_side (внутри кадра).
+
+    Args:
+        rect: (x1, y1, x2, y2) прямоугольник в пикселях
+        frame_hw: размер кадра (h, w)
+        max_side: максимальная сторона квадрата
+        min_side: минимальная сторона квадрата (маленький прямоугольник - квадрат с контекстом вокруг)
+
+    Returns:
+        list: квадраты (x1, y1, x2, y2)
+    """
+    frame_h, frame_w = frame_hw
+    x1, y1, x2, y2 = rect
+    side = min(max(x2 - x1, y2 - y1, min_side), max_side, frame_h, frame_w)
+
+    def starts(lo, hi, limit):
+        """Начала квадратов вдоль одной оси: равномерно от lo до hi - side, внутри [0, limit - side]."""
+        count = max(1, math.ceil((hi - lo) / side))
+        if count == 1:
+            positions = [round((lo + hi) / 2 - side / 2)]
+        else:
+            positions = np.linspace(lo, hi - side, count).round().astype(int).tolist()
+        return [min(max(p, 0), limit - side) for p in positions]
+
+    return [
+        (x, y, x + side, y + side)
+        for y in starts(y1, y2, frame_h)
+        for x in starts(x1, x2, frame_w)
+    ]
+
+
+class ChangeDetector:
+    """
+    Изменившиеся области кадра по разности с прошлым кадром.
+
+    Кадр прореживается (каждый subsample-й пиксель зеленого канала), разность
+    усредняется по блокам block_size x block_size. Блоки с разностью выше threshold
+    (плюс соседние блоки) группируются в прямоугольники и покрываются квадратами.
+    update возвращает None, когда нужен полный кадр: первый кадр, смена размера,
+    каждые refresh_interval кадров, слишком много областей или изменившейся площади.
+    """
+
+    def __init__(
+        self,
+        block_size: int = 32,
+        threshold: float = 10.0,
+        max_regions: int = 4,
+        max_area: float = 0.5,
+        refresh_interval: int = 15,
+        subsample: int = 2
+    ):
+        """
+        Args:
+            block_size: размер блока сетки (пиксели кадра)
+            threshold: средняя абсолютная разность яркости в блоке, начиная с которой блок изменился
+            max_regions: максимум квадратов на кадр (больше - полный кадр)
+            max_area: доля площади кадра (больше - полный кадр)
+            refresh_interval: полный кадр каждые N кадров
+            subsample: шаг прореживания кадра
+        """
+        self.block_size = block_size
+        self.threshold = threshold
+        self.max_regions = max_regions
+        self.max_area = max_area
+        self.refresh_interval = refresh_interval
+        self.subsample = subsample
+        self.reset()
+
+    def reset(self) -> None:
+        """Сброс (следующий кадр - полный)."""
+        self._previous = None
+        self._frames_since_full = 0
+
+    def changed_blocks(self, gray: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """
+        Сетка изменившихся блоков.
+
+        Args:
+            gray: прореженный кадр (int16)
+            previous: прореженный прошлый кадр (int16)
+
+        Returns:
+            np.ndarray: (GH, GW) bool
+        """
+        step = max(self.block_size // self.subsample, 1)
+        diff = np.abs(gray - previous)
+
+        # Дополняем до целого числа блоков и усредняем по блокам
+        pad_h = -diff.shape[0] % step
+        pad_w = -diff.shape[1] % step
+        if pad_h or pad_w:
+            diff = np.pad(diff, ((0, pad_h), (0, pad_w)))
+        grid_h, grid_w = diff.shape[0] // step, diff.shape[1] // step
+        block_mean = diff.reshape(grid_h, step, grid_w, step).mean(axis=(1, 3))
+        changed = block_mean > self.threshold
+
+        # Соседние блоки: объект на границе блока и контекст вокруг него
+        dilated = changed.copy()
+        dilated[1:, :] |= changed[:-1, :]
+        dilated[:-1, :] |= changed[1:, :]
+        dilated[:, 1:] |= changed[:, :-1]
+        dilated[:, :-1] |= changed[:, 1:]
+        return dilated
+
+    def update(self, frame: np.ndarray, max_side: Optional[int] = None, min_side: int = 0) -> Optional[np.ndarray]:
+        """
+        Изменившиеся области нового кадра.
+
+        Args:
+            frame: кадр BGR (h, w, 3)
+            max_side: максимальная сторона квадрата области (None - без ограничения)
+            min_side: минимальная сторона квадрата области
+
+        Returns:
+            np.ndarray | None: (R, 4) float32 квадраты x1, y1, x2, y2 (R = 0 - кадр не изменился),
+                               None - нужен инференс всего кадра
+        """
+        gray = frame[::self.subsample, ::self.subsample, 1].astype(np.int16)
+        previous, self._previous = self._previous, gray
+        self._frames_since_full += 1
+
+        if previous is None or previous.shape != gray.shape or self._frames_since_full >= self.refresh_interval:
+            self._frames_since_full = 0
+            return None
+
+        changed = self.changed_blocks(gray, previous)
+        if not changed.any():
+            return np.zeros((0, 4), dtype=np.float32)
+
+        frame_h, frame_w = frame.shape[:2]
+        if changed.sum() * self.block_size ** 2 > self.max_area * frame_h * frame_w:
+            self._frames_since_full = 0
+            return None
+
+        side_limit = max_side or min(frame_h, frame_w)
+        regions = []
+        for r1, c1, r2, c2 in label_blocks(changed):
+            rect = (
+                c1 * self.block_size, r1 * self.block_size,
+                min(c2 * self.block_size, frame_w), min(r2 * self.block_size, frame_h),
+            )
+            regions.extend(square_tiles(rect, (frame_h, frame_w), side_limit, min_side))
+            if len(regions) > self.max_regions:
+                self._frames_since_full = 0
+                return None
+
+        return np.asarray(regions, dtype=np.float32).reshape(-1, 4)
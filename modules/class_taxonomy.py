@@ -0,0 +1,198 @@
+"""
+Модуль таксономии классов модели детекции.
+Таблица категорий строится ОДИН раз при загрузке модели (YoloDetector.load_model),
+процессоры сравнивают целочисленную категорию вместо разбора строк class_name на каждом кадре.
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from modules.classes import Card
+from modules.card_registry import CardRegistry
+
+
+# ==== КАТЕГОРИИ КЛАССОВ ====
+
+CATEGORY_TECHNICAL = 0        # служебные классы "_ ..." (_ start, _ timer total, _ finish, _ elixir x2, _ bomb, ...)
+CATEGORY_TIMER = 1            # красный таймер размещения карты (_ timer red)
+CATEGORY_LEVEL = 2            # красный уровень юнита/здания (_ lvl red)
+CATEGORY_LEVEL_CHAMPION = 3   # красный уровень чемпиона (_ lvl red cham)
+CATEGORY_FIELD_SPELL = 4      # заклинание на поле боя ("S...": SC, SE, SL)
+CATEGORY_HAND_SPELL = 5       # заклинание в НАШЕЙ руке ("Z...")
+CATEGORY_ABILITY = 6          # абилка чемпиона ("A...": AC, AR, AE, AL)
+CATEGORY_EVOLUTION = 7        # маркер эволюции (_ evolution mark)
+CATEGORY_UNIT = 8             # юниты и здания (все остальные классы: WC, WE, WL, BR, .WC, ...)
+
+CATEGORY_NAMES = {
+    CATEGORY_TECHNICAL: "technical",
+    CATEGORY_TIMER: "timer",
+    CATEGORY_LEVEL: "level",
+    CATEGORY_LEVEL_CHAMPION: "level champion",
+    CATEGORY_FIELD_SPELL: "field spell",
+    CATEGORY_HAND_SPELL: "hand spell",
+    CATEGORY_ABILITY: "ability",
+    CATEGORY_EVOLUTION: "evolution marker",
+    CATEGORY_UNIT: "unit/building",
+}
+
+# Все категории служебных классов (class_name начинается с "_")
+SERVICE_CATEGORIES = frozenset({
+    CATEGORY_TECHNICAL,
+    CATEGORY_TIMER,
+    CATEGORY_LEVEL,
+    CATEGORY_LEVEL_CHAMPION,
+    CATEGORY_EVOLUTION,
+})
+
+# Служебные классы со своей категорией (точное совпадение имени)
+SPECIAL_CLASS_CATEGORY = {
+    '_ timer red': CATEGORY_TIMER,
+    '_ lvl red': CATEGORY_LEVEL,
+    '_ lvl red cham': CATEGORY_LEVEL_CHAMPION,
+    '_ evolution mark': CATEGORY_EVOLUTION,
+}
+
+# Служебные классы, которые процессоры и app.py ищут по имени
+REQUIRED_CLASS_NAMES = frozenset({
+    '_ start',
+    '_ timer total',
+    '_ finish',
+    '_ timer red',
+    '_ lvl red',
+    '_ lvl red cham',
+    '_ evolution mark',
+    '_ bomb',
+    '_ elixir x2',
+    '_ elixir x3',
+})
+
+# Категории по первому символу class_name
+PREFIX_CATEGORY = {
+    '_': CATEGORY_TECHNICAL,
+    'S': CATEGORY_FIELD_SPELL,
+    'Z': CATEGORY_HAND_SPELL,
+    'A': CATEGORY_ABILITY,
+}
+
+
+def classify_class_name(class_name: str) -> int:
+    """
+    Определяет категорию класса по его имени (нейминг классов модели).
+
+    Args:
+        class_name: имя класса модели
+
+    Returns:
+        int: одна из констант CATEGORY_*
+
+    Логика:
+        1. Точное совпадение со служебными классами (_ timer red, _ lvl red, ...)
+        2. Первый символ class_name ("_", "S", "Z", "A")
+        3. Все остальное → юниты и здания
+    """
+    if class_name in SPECIAL_CLASS_CATEGORY:
+        return SPECIAL_CLASS_CATEGORY[class_name]
+
+    return PREFIX_CATEGORY.get(class_name[:1], CATEGORY_UNIT)
+
+
+class ClassTaxonomy:
+    """
+    Таблица категорий классов модели, индексированная по class_id.
+
+    Attributes:
+        class_names (list): class_id → class_name
+        categories (list): class_id → категория (CATEGORY_*)
+        cards (list): class_id → Card из базы карт (или None для служебных/неизвестных классов)
+        class_ids (dict): class_name → class_id
+    """
+
+    def __init__(self, class_names: Dict[int, str], cards: CardRegistry | Iterable[Card]):
+        """
+        Строит таблицу категорий и связывает классы модели с базой карт.
+
+        Args:
+            class_names: словарь классов модели {0: "WC skeleton", 1: "_ timer red", ...}
+            cards: реестр карт (или список карт)
+
+        Связь с картой ищется по всем трем неймингам карты:
+        class_name (поле боя), spell_my_hand_class_name (НАША рука), ability_class_name (абилка).
+        """
+        size = max(class_names) + 1 if class_names else 0
+
+        self.class_names: List[str] = [""] * size
+        self.categories: List[int] = [CATEGORY_TECHNICAL] * size
+        self.cards: List[Optional[Card]] = [None] * size
+        self.class_ids: Dict[str, int] = {}
+
+        # Индекс карт по всем вариантам class_name - из реестра
+        registry = cards if isinstance(cards, CardRegistry) else CardRegistry(cards)
+
+        for class_id, class_name in class_names.items():
+            category = classify_class_name(class_name)
+            card = registry.by_any_name(class_name)
+
+            self.class_names[class_id] = class_name
+            self.categories[class_id] = category
+            self.cards[class_id] = card
+            self.class_ids[class_name] = class_id
+
+            # Карточный класс без карты в базе — процессоры его проигнорируют
+            if card is None and category not in SERVICE_CATEGORIES:
+                logger.info("Класс без карты в all_card: %s (%s)", class_name, CATEGORY_NAMES[category])
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def category(self, class_id: int) -> int:
+        """Категория класса по class_id."""
+        return self.categories[class_id]
+
+    def card(self, class_id: int) -> Optional[Card]:
+        """Карта из базы по class_id (None если класс не связан с картой)."""
+        return self.cards[class_id]
+
+    def class_id(self, class_name: str) -> Optional[int]:
+        """class_id по class_name (None если такого класса нет в модели)."""
+        return self.class_ids.get(class_name)
+
+    def ids_of(self, category: int) -> List[int]:
+        """Список всех class_id заданной категории."""
+        return [class_id for class_id, cat in enumerate(self.categories) if cat == category]
+
+
+def check_class_compatibility(old: ClassTaxonomy, new: ClassTaxonomy) -> Tuple[List[str], List[str]]:
+    """
+    Проверка классов новой модели перед горячей заменой.
+
+    Args:
+        old: таблица классов текущей модели
+        new: таблица классов новой модели
+
+    Returns:
+        tuple: (errors, warnings)
+            errors - в новой модели нет служебных классов из REQUIRED_CLASS_NAMES,
+                     которые были в текущей (замена недопустима)
+            warnings - в новой модели нет карточных классов текущей модели
+                       (эти карты перестанут распознаваться)
+    """
+    errors = []
+    warnings = []
+
+    missing_required = sorted(name for name in REQUIRED_CLASS_NAMES if name in old.class_ids and name not in new.class_ids)
+    if missing_required:
+        errors.append(f"нет служебных классов: {', '.join(missing_required)}")
+
+    missing_cards = sorted(
+        name for name, class_id in old.class_ids.items()
+        if old.cards[class_id] is not None and name not in new.class_ids
+    )
+    if missing_cards:
+        warnings.append(f"нет карточных классов ({len(missing_cards)}): {', '.join(missing_cards)}")
+
+    return errors, warnings
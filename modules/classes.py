@@ -1,28 +1,142 @@
 from dataclasses import dataclass
+from collections import Counter
+from collections.abc import Mapping
 
+TIMER_OBJ_CAPACITY = 6  # timer_screen в timer_obj (1.5 сек при FPS=4)
 
 
-@dataclass
-class TimerObject(list):
+
+class ClassVoteWindow(Mapping):
+    '''
+    Голоса class_name по окну timer_screen (инкрементальная замена group_class_name)
+    Для каждого class_name храним levels: levels[k - 1] - число timer_screen, где class_name
+    встречается не меньше k раз. Это ровно размеры групп group_class_name (k-й проход
+    "вниз по строкам" забирает по одному class_name из каждой строки, где он еще остался),
+    поэтому окно обновляется при добавлении/вытеснении timer_screen за O(class_name в нем),
+    а groups() - за O(class_name в окне) без пересчета всех timer_screen.
+    Как Mapping: class_name → число timer_screen, где он есть (levels[0]).
+    '''
+    __slots__ = ('_levels',)
+
+    def __init__(self):
+        self._levels: dict[str, list[int]] = {} # class_name → размеры групп (невозрастающие)
+
+    def __getitem__(self, class_name: str) -> int:
+        return self._levels[class_name][0]
+
+    def __iter__(self):
+        return iter(self._levels)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def __repr__(self) -> str:
+        return f"ClassVoteWindow({self._levels})"
+
+    def update(self, class_names: list[str], sign: int) -> None:
+        '''Учет class_name одного timer_screen (sign=1 - добавлен, -1 - вытеснен)'''
+        for class_name, count in Counter(class_names).items():
+            levels = self._levels.setdefault(class_name, [])
+            if len(levels) < count:
+                levels.extend([0] * (count - len(levels)))
+            for k in range(count):
+                levels[k] += sign
+            while levels and levels[-1] <= 0:
+                levels.pop()
+            if not levels:
+                del self._levels[class_name]
+
+    def groups(self, threshold: int = 3) -> list[str]:
+        '''
+        class_name с группой >= threshold (как group_class_name по timer_screen окна):
+        по одному class_name на группу, по размеру группы убыв., при равенстве - по имени
+        '''
+        grouped = []
+        for class_name, levels in self._levels.items():
+            for size in levels:
+                if size < threshold:
+                    break  # размеры групп не возрастают
+                grouped.append((class_name, size))
+        grouped.sort(key=lambda x: (-x[1], x[0]))
+        return [class_name for class_name, _ in grouped]
+
+
+class TimerObject:
     '''
     Класс для timer_obj
-    Принимает массив массивов [[timer_screen],[timer_screen],[timer_screen],
-                               [timer_screen],[timer_screen],[timer_screen]]
-    Создаем дополнительные атрибуты: first_screen, last_screen, list_ignore
+    Кольцевой буфер на TIMER_OBJ_CAPACITY timer_screen: [[timer_screen],[timer_screen],[timer_screen],
+                                                         [timer_screen],[timer_screen],[timer_screen]]
+    Индекс 0 - самый новый timer_screen, len - 1 - самый старый (как у прежнего списка).
+    Счетчики по окну (box_timer_count, class_votes, lvl_box_count) обновляются при добавлении
+    и вытеснении timer_screen, поэтому сдвиг окна и подсчеты - O(1) без обхода всех timer_screen.
+    timer_screen после добавления не изменяется (счетчики посчитаны по нему).
+    Создаем дополнительные атрибуты: first_screen, last_screen, list_ignore, track_id
     '''
-    time_first_screen: int | None = None # время первой детекции box_timer
-    time_last_screen: int | None = None # время последней детекции box_timer
-    list_ignore: list[int] | None = None # список class_name которые игнорировать
-    status: str = "active" # статус timer_obj (error_1, active, done, bomb, bad)
+    __slots__ = (
+        '_slots', '_head', '_size',
+        'time_first_screen', 'time_last_screen', 'list_ignore', 'status', 'track_id',
+        'box_timer_count', 'class_votes', 'lvl_box_count',
+    )
+
+    def __init__(self, time_first_screen: int | None = None, time_last_screen: int | None = None,
+                 list_ignore: list[int] | None = None, status: str = "active", track_id: int | None = None):
+        self._slots: list = [None] * TIMER_OBJ_CAPACITY
+        self._head = 0  # позиция самого нового timer_screen в _slots
+        self._size = 0
+
+        self.time_first_screen = time_first_screen # время первой детекции box_timer
+        self.time_last_screen = time_last_screen # время последней детекции box_timer
+        self.list_ignore = list_ignore # список class_name которые игнорировать
+        self.status = status # статус timer_obj (error_1, active, done, bomb, bad)
+        self.track_id = track_id # track_id красного таймера от трекера (ключ поиска timer_obj)
+
+        self.box_timer_count = 0 # timer_screen с box_timer (cnt_box_timer)
+        self.class_votes = ClassVoteWindow() # голоса class_name по окну (группы group_class_name)
+        self.lvl_box_count = 0 # всего box_lvl во всех timer_screen
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._slots[(self._head + i) % TIMER_OBJ_CAPACITY]
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("timer_screen index out of range")
+        return self._slots[(self._head + index) % TIMER_OBJ_CAPACITY]
+
+    def __repr__(self) -> str:
+        return (f"TimerObject({list(self)}, status={self.status!r}, track_id={self.track_id}, "
+                f"box_timer_count={self.box_timer_count})")
+
+    def _count(self, timer_screen: list, sign: int) -> None:
+        '''Учет timer_screen в счетчиках окна (sign=1 - добавлен, -1 - вытеснен)'''
+        if timer_screen[0]:
+            self.box_timer_count += sign
+        if len(timer_screen) > 2 and timer_screen[2]:
+            self.lvl_box_count += sign * len(timer_screen[2])
+        if len(timer_screen) > 3 and timer_screen[3]:
+            self.class_votes.update(timer_screen[3], sign)
 
     def del_last_screen(self):
         '''Удаляет последний timer_screen из timer_obj'''
-        if len(self) > 0:
-            self.pop()
+        if self._size > 0:
+            position = (self._head + self._size - 1) % TIMER_OBJ_CAPACITY
+            self._count(self._slots[position], -1)
+            self._slots[position] = None
+            self._size -= 1
 
     def add_first_screen(self, timer_screen: list):
-        '''Добавляет новый timer_screen спереди'''
-        self.insert(0, timer_screen)
+        '''Добавляет новый timer_screen спереди (при заполненном буфере вытесняется самый старый)'''
+        if self._size == TIMER_OBJ_CAPACITY:
+            self.del_last_screen()
+        self._head = (self._head - 1) % TIMER_OBJ_CAPACITY
+        self._slots[self._head] = timer_screen
+        self._size += 1
+        self._count(timer_screen, 1)
 
     def print_all_screens(self):
         '''Выводит все timer_screen в timer_obj'''
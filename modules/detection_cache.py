@@ -0,0 +1,190 @@
+"""
+Модуль дискового кэша детекций (content-addressed).
+Ключ = хэш содержимого кадра + хэш модели + параметры инференса (imgsz, conf, iou).
+При повторном прогоне записанных боев инференс YOLO пропускается, пересчитывается только логика процессоров.
+"""
+
+import os
+import hashlib
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Optional
+
+import numpy as np
+
+from modules.detection_postprocess import DetectionArrays
+
+# Формат записи: [count uint32][boxes float32 (N, 4)][scores float32 (N,)][class_ids uint16 (N,)]
+_COUNT_DTYPE = np.dtype('<u4')
+_BOX_DTYPE = np.dtype('<f4')
+_SCORE_DTYPE = np.dtype('<f4')
+_CLASS_DTYPE = np.dtype('<u2')
+_FILE_SUFFIX = '.det'
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Хэш содержимого файла (для ключа кэша по модели).
+
+    Args:
+        path: путь к файлу
+        chunk_size: размер блока чтения
+
+    Returns:
+        str: hex-строка хэша
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_arrays(arrays: DetectionArrays) -> bytes:
+    """Компактная бинарная запись детекций (~22 байта на детекцию)."""
+    count = len(arrays)
+    return b''.join((
+        np.asarray([count], dtype=_COUNT_DTYPE).tobytes(),
+        np.ascontiguousarray(arrays.boxes, dtype=_BOX_DTYPE).tobytes(),
+        np.ascontiguousarray(arrays.scores, dtype=_SCORE_DTYPE).tobytes(),
+        np.ascontiguousarray(arrays.class_ids, dtype=_CLASS_DTYPE).tobytes(),
+    ))
+
+
+def decode_arrays(data: bytes) -> DetectionArrays:
+    """Чтение детекций из бинарной записи encode_arrays."""
+    count = int(np.frombuffer(data, dtype=_COUNT_DTYPE, count=1)[0])
+    offset = _COUNT_DTYPE.itemsize
+    boxes = np.frombuffer(data, dtype=_BOX_DTYPE, count=count * 4, offset=offset).reshape(count, 4)
+    offset += boxes.nbytes
+    scores = np.frombuffer(data, dtype=_SCORE_DTYPE, count=count, offset=offset)
+    offset += scores.nbytes
+    class_ids = np.frombuffer(data, dtype=_CLASS_DTYPE, count=count, offset=offset)
+    return DetectionArrays(boxes.astype(np.float32), scores.astype(np.float32), class_ids.astype(np.int64))
+
+
+class DetectionCache:
+    """
+    Дисковый кэш детекций с ограничением размера (LRU по времени последнего доступа).
+
+    Файлы кэша: <cache_dir>/<первые 2 символа ключа>/<ключ>.det
+    Время последнего доступа хранится в mtime файла (обновляется при каждом попадании).
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 512):
+        """
+        Args:
+            cache_dir: папка кэша (создается при необходимости)
+            max_size_mb: максимальный размер кэша на диске
+        """
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.size = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def make_key(frame: np.ndarray, model_hash: str, imgsz, conf: float, iou: float) -> str:
+        """
+        Ключ кэша по содержимому кадра и параметрам инференса.
+
+        Args:
+            frame: кадр BGR
+            model_hash: хэш файла модели (file_hash)
+            imgsz: размер входа модели (число или (h, w))
+            conf, iou: пороги инференса модели
+
+        Returns:
+            str: hex-строка ключа
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{frame.shape}|{frame.dtype}|{model_hash}|{imgsz}|{conf:.4f}|{iou:.4f}".encode())
+        digest.update(np.ascontiguousarray(frame).data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + _FILE_SUFFIX)
+
+    def get(self, key: str) -> Optional[DetectionArrays]:
+        """
+        Детекции из кэша по ключу.
+
+        Returns:
+            DetectionArrays если ключ есть в кэше, иначе None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # отмечаем доступ (LRU)
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return decode_arrays(data)
+
+    def put(self, key: str, arrays: DetectionArrays) -> None:
+        """
+        Сохраняет детекции в кэш (атомарно: запись во временный файл + переименование).
+        """
+        path = self._path(key)
+        data = encode_arrays(arrays)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            # Запись уже могла быть в кэше (другой процесс с тем же cache_dir) - ее размер вычитаем
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error("Ошибка записи в кэш детекций: %s", e)
+            return
+
+        self.size += len(data) - old_size
+        if self.size > self.max_size:
+            self._evict()
+
+    def _scan(self):
+        """Все файлы кэша: (mtime, size, path)."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(_FILE_SUFFIX):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Удаляет самые давно использованные записи, пока кэш не станет <= 90% лимита."""
+        entries = sorted(self._scan())
+        self.size = sum(size for _, size, _ in entries)
+        target = int(self.max_size * 0.9)
+
+        removed = 0
+        for _, size, path in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+            removed += 1
+
+        logger.info("Кэш детекций: удалено %s записей, размер %.1f МБ", removed, self.size / 1024 / 1024)
@@ -0,0 +1,417 @@
+"""
+Модуль постобработки детекций в колоночном формате (NumPy).
+Все стадии работают сразу над массивами детекций кадра, без цикла по объектам.
+"""
+
+import json
+import os
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.class_taxonomy import CATEGORY_NAMES
+
+
+@dataclass
+class DetectionArrays:
+    '''
+    Колоночное представление детекций одного кадра.
+    boxes:     (N, 4) float32 - координаты [x1, y1, x2, y2] в пикселях ROI
+    scores:    (N,)   float32 - уверенность детекций
+    class_ids: (N,)   int64   - ID классов модели
+    '''
+    boxes: np.ndarray
+    scores: np.ndarray
+    class_ids: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    @classmethod
+    def empty(cls) -> "DetectionArrays":
+        '''Пустой набор детекций'''
+        return cls(
+            np.zeros((0, 4), dtype=np.float32),
+            np.zeros((0,), dtype=np.float32),
+            np.zeros((0,), dtype=np.int64),
+        )
+
+    def select(self, index) -> "DetectionArrays":
+        '''Выборка детекций по булевой маске или массиву индексов'''
+        return DetectionArrays(self.boxes[index], self.scores[index], self.class_ids[index])
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Матрица IoU между двумя наборами боксов [x1, y1, x2, y2].
+
+    Args:
+        boxes_a: (N, 4)
+        boxes_b: (M, 4)
+
+    Returns:
+        np.ndarray: (N, M) float32, IoU каждой пары
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    area_a = np.clip(boxes_a[:, 2] - boxes_a[:, 0], 0, None) * np.clip(boxes_a[:, 3] - boxes_a[:, 1], 0, None)
+    area_b = np.clip(boxes_b[:, 2] - boxes_b[:, 0], 0, None) * np.clip(boxes_b[:, 3] - boxes_b[:, 1], 0, None)
+
+    ix1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    iy1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    ix2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    iy2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0).astype(np.float32)
+
+
+# ==== ПОРОГИ УВЕРЕННОСТИ ПО КЛАССАМ ====
+
+
+def load_class_thresholds(path: str) -> Dict[str, float]:
+    """
+    Загружает пороги уверенности по классам из файла калибровки.
+
+    Args:
+        path: путь к JSON файлу {"class_name": threshold, ...}
+
+    Returns:
+        dict: {class_name: threshold}, пустой словарь если файла нет или он поврежден
+    """
+    if not path or not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {str(name): float(thr) for name, thr in data.items()}
+    except Exception as e:
+        logger.error("Ошибка при чтении порогов уверенности %s: %s", path, e)
+        return {}
+
+
+def build_class_thresholds(
+    class_names: Dict[int, str],
+    default: float,
+    overrides: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """
+    Строит таблицу порогов уверенности, индексированную по class_id.
+
+    Args:
+        class_names: словарь классов модели {class_id: class_name}
+        default: порог по умолчанию (YOLO_CONFIDENCE)
+        overrides: пороги для отдельных классов {class_name: threshold}
+
+    Returns:
+        np.ndarray: (num_classes,) float32, thresholds[class_id] = порог класса
+    """
+    size = max(class_names) + 1 if class_names else 0
+    thresholds = np.full(size, default, dtype=np.float32)
+
+    overrides = overrides or {}
+    for class_id, class_name in class_names.items():
+        if class_name in overrides:
+            thresholds[class_id] = overrides[class_name]
+
+    # Пороги для классов, которых нет в модели — скорее всего опечатка в конфиге
+    unknown = set(overrides) - set(class_names.values())
+    if unknown:
+        logger.warning("Пороги для неизвестных классов проигнорированы: %s", sorted(unknown))
+
+    return thresholds
+
+
+def filter_by_class_confidence(detections: DetectionArrays, thresholds: np.ndarray) -> DetectionArrays:
+    """
+    Фильтрует детекции по порогу уверенности своего класса (одна маска NumPy на весь кадр).
+
+    Args:
+        detections: детекции кадра
+        thresholds: таблица порогов по class_id (build_class_thresholds)
+
+    Returns:
+        DetectionArrays: детекции с confidence >= порога своего класса
+    """
+    if len(detections) == 0:
+        return detections
+
+    mask = detections.scores >= thresholds[detections.class_ids]
+    return detections.select(mask)
+
+
+# ==== ПОДАВЛЕНИЕ ДУБЛЕЙ (NMS ПО ГРУППАМ КЛАССОВ) ====
+
+# Порог IoU "никогда" (IoU не бывает больше 1) - отключает слияние разных классов
+NO_CROSS_CLASS_IOU = 2.0
+
+
+@dataclass
+class NmsGroups:
+    '''
+    Таблицы групп классов для подавления дублей.
+    group_of_class: (num_classes,) int64   - индекс группы для каждого class_id
+    iou:            (num_groups,)  float32 - порог IoU для дублей одного класса
+    cross_iou:      (num_groups,)  float32 - порог IoU для дублей разных классов группы
+    names:          имена групп (для логов и бенчмарка)
+    '''
+    group_of_class: np.ndarray
+    iou: np.ndarray
+    cross_iou: np.ndarray
+    names: List[str]
+
+
+def build_nms_groups(
+    class_names: List[str],
+    categories: List[int],
+    groups: Dict[str, dict],
+    default_iou: float
+) -> NmsGroups:
+    """
+    Строит таблицы групп классов из конфига (YOLO_NMS_GROUPS).
+
+    Args:
+        class_names: class_id → class_name (ClassTaxonomy.class_names)
+        categories: class_id → категория (ClassTaxonomy.categories)
+        groups: {имя группы: {'categories': [...], 'classes': [...], 'iou': float, 'cross_iou': float | None}}
+                'categories' - имена категорий из CATEGORY_NAMES, 'classes' - точные class_name
+        default_iou: порог для классов вне групп (слияние разных классов для них отключено)
+
+    Returns:
+        NmsGroups
+
+    Приоритет: класс из 'classes' важнее категории из 'categories'.
+    Группа 0 - все классы, не попавшие ни в одну группу.
+    """
+    category_ids = {name: cat for cat, name in CATEGORY_NAMES.items()}
+
+    names = ['default']
+    iou = [default_iou]
+    cross_iou = [NO_CROSS_CLASS_IOU]
+    group_of_class = np.zeros(len(class_names), dtype=np.int64)
+
+    by_category: Dict[int, int] = {}
+    by_class: Dict[str, int] = {}
+
+    for group_name, group in groups.items():
+        index = len(names)
+        names.append(group_name)
+        iou.append(group.get('iou', default_iou))
+        cross = group.get('cross_iou')
+        cross_iou.append(NO_CROSS_CLASS_IOU if cross is None else cross)
+
+        for category_name in group.get('categories', []):
+            if category_name not in category_ids:
+                logger.warning("Неизвестная категория в группе NMS %s: %s", group_name, category_name)
+                continue
+            by_category[category_ids[category_name]] = index
+        for class_name in group.get('classes', []):
+            by_class[class_name] = index
+
+    for class_id, (class_name, category) in enumerate(zip(class_names, categories)):
+        group_of_class[class_id] = by_class.get(class_name, by_category.get(category, 0))
+
+    return NmsGroups(
+        group_of_class,
+        np.asarray(iou, dtype=np.float32),
+        np.asarray(cross_iou, dtype=np.float32),
+        names,
+    )
+
+
+def suppress_duplicates(detections: DetectionArrays, groups: NmsGroups) -> DetectionArrays:
+    """
+    Подавление дублей одного объекта внутри группы классов (NMS с порогами группы).
+
+    Args:
+        detections: детекции кадра
+        groups: таблицы групп (build_nms_groups)
+
+    Returns:
+        DetectionArrays: детекции без дублей, в порядке убывания уверенности
+
+    Логика:
+        1. Матрица IoU всех пар детекций кадра (одна операция NumPy)
+        2. Матрица подавления: пара в одной группе и IoU > порога
+           (порог iou для одного класса, cross_iou для разных классов группы)
+        3. Жадный проход по убыванию уверенности: оставляем детекцию,
+           вычеркиваем всё, что она подавляет → у дубля остается метка с максимальной уверенностью
+    """
+    count = len(detections)
+    if count < 2:
+        return detections
+
+    order = np.argsort(-detections.scores, kind='stable')
+    detections = detections.select(order)
+
+    ious = iou_matrix(detections.boxes, detections.boxes)
+    group = groups.group_of_class[detections.class_ids]
+    same_class = detections.class_ids[:, None] == detections.class_ids[None, :]
+    thresholds = np.where(same_class, groups.iou[group][:, None], groups.cross_iou[group][:, None])
+    suppress = (group[:, None] == group[None, :]) & (ious > thresholds)
+    np.fill_diagonal(suppress, False)
+
+    # Быстрый выход: дублей нет
+    if not suppress.any():
+        return detections
+
+    removed = np.zeros(count, dtype=bool)
+    keep = np.zeros(count, dtype=bool)
+    for i in range(count):
+        if removed[i]:
+            continue
+        keep[i] = True
+        removed |= suppress[i]
+
+    return detections.select(keep)
+
+
+# ==== КАЛИБРОВКА ПОРОГОВ ====
+
+
+def match_to_labels(
+    detections: DetectionArrays,
+    label_boxes: np.ndarray,
+    label_class_ids: np.ndarray,
+    iou_threshold: float = 0.5
+) -> np.ndarray:
+    """
+    Сопоставляет детекции кадра с разметкой (жадно, по убыванию уверенности, как в mAP).
+
+    Args:
+        detections: детекции кадра (без фильтра по порогам)
+        label_boxes: (M, 4) боксы разметки в пикселях
+        label_class_ids: (M,) классы разметки
+        iou_threshold: минимальный IoU для true positive
+
+    Returns:
+        np.ndarray: (N,) bool, True если детекция совпала с объектом разметки своего класса
+    """
+    is_tp = np.zeros(len(detections), dtype=bool)
+    if len(detections) == 0 or len(label_class_ids) == 0:
+        return is_tp
+
+    ious = iou_matrix(detections.boxes, label_boxes)
+    # Пары разных классов не сопоставляются
+    ious[detections.class_ids[:, None] != np.asarray(label_class_ids)[None, :]] = 0.0
+
+    used = np.zeros(len(label_class_ids), dtype=bool)
+    for i in np.argsort(-detections.scores, kind='stable'):
+        candidates = np.where(used, 0.0, ious[i])
+        j = int(np.argmax(candidates))
+        if candidates[j] >= iou_threshold:
+            used[j] = True
+            is_tp[i] = True
+
+    return is_tp
+
+
+def derive_class_thresholds(
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    is_tp: np.ndarray,
+    label_counts: Dict[int, int],
+    beta: float = 1.0,
+    min_threshold: float = 0.1,
+    max_threshold: float = 0.9
+) -> Dict[int, float]:
+    """
+    Подбирает порог уверенности для каждого класса по размеченным кадрам (максимум F-beta).
+
+    Args:
+        scores: (N,) уверенность всех детекций всех кадров
+        class_ids: (N,) классы детекций
+        is_tp: (N,) результат match_to_labels
+        label_counts: количество объектов разметки по классам {class_id: count}
+        beta: вес recall в F-мере (beta > 1 — важнее recall, beta < 1 — важнее precision)
+        min_threshold, max_threshold: допустимый диапазон порога
+
+    Returns:
+        dict: {class_id: threshold} для классов, у которых есть разметка
+
+    Логика (для каждого класса):
+        1. Сортируем детекции по убыванию уверенности
+        2. Накопительные TP/FP → precision и recall на каждом возможном пороге
+        3. Берем порог с максимальной F-beta
+    """
+    thresholds: Dict[int, float] = {}
+    beta2 = beta * beta
+
+    for class_id, n_labels in label_counts.items():
+        if n_labels <= 0:
+            continue
+
+        mask = class_ids == class_id
+        class_scores = scores[mask]
+        if class_scores.size == 0:
+            # Модель не нашла ни одного объекта — порог минимальный
+            thresholds[class_id] = min_threshold
+            continue
+
+        order = np.argsort(-class_scores, kind='stable')
+        class_scores = class_scores[order]
+        tp = np.cumsum(is_tp[mask][order])
+        fp = np.cumsum(~is_tp[mask][order])
+
+        precision = tp / (tp + fp)
+        recall = tp / n_labels
+        f_beta = (1 + beta2) * precision * recall / np.maximum(beta2 * precision + recall, 1e-9)
+
+        best = int(np.argmax(f_beta))
+        thresholds[class_id] = float(np.clip(class_scores[best], min_threshold, max_threshold))
+
+    return thresholds
+
+
+def save_class_thresholds(path: str, thresholds: Dict[int, float], class_names: Dict[int, str]) -> None:
+    """
+    Сохраняет пороги уверенности в JSON файл по class_name (читается load_class_thresholds).
+
+    Args:
+        path: путь к файлу
+        thresholds: {class_id: threshold}
+        class_names: словарь классов модели {class_id: class_name}
+    """
+    data = {class_names[class_id]: round(thr, 3) for class_id, thr in sorted(thresholds.items())}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def labels_from_yolo_txt(path: str, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Читает разметку кадра в формате YOLO (экспорт Roboflow): "class_id cx cy w h" в долях кадра.
+
+    Args:
+        path: путь к .txt файлу разметки
+        width, height: размеры кадра в пикселях
+
+    Returns:
+        tuple: (boxes (M, 4) float32 в пикселях, class_ids (M,) int64)
+    """
+    rows: List[Sequence[float]] = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 5:
+                    rows.append([float(v) for v in parts[:5]])
+
+    if not rows:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.int64)
+
+    data = np.asarray(rows, dtype=np.float32)
+    cx, cy = data[:, 1] * width, data[:, 2] * height
+    w, h = data[:, 3] * width, data[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, data[:, 0].astype(np.int64)
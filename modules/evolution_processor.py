@@ -13,6 +13,8 @@ logger.setLevel(logging.INFO)
 logger.info("Загружен модуль: %s", __name__)
 
 from typing import Dict, List, Any
+from modules.frame_index import FrameIndex
+from modules.class_taxonomy import CATEGORY_EVOLUTION
 
 # Константа: время отображения маркера эволюции на поле (в секундах)
 EVO_MARKER_DISPLAY_TIME = 3.0
@@ -49,7 +51,7 @@ def check_evolution_dict_timeout(
 
 
 def process_evolution_detections(
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     evolution_dict_timer: Dict[float, str],
     current_time: float
 ) -> None:
@@ -57,7 +59,7 @@ def process_evolution_detections(
     Главная функция обработки маркеров эволюций.
 
     Args:
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
         evolution_dict_timer: словарь таймеров маркеров {timestamp: status, ...}
         current_time: текущая временная метка
 
@@ -82,13 +84,8 @@ def process_evolution_detections(
     check_evolution_dict_timeout(evolution_dict_timer, current_time)
 
     # 2. Подсчет детектированных маркеров эволюции
-    detected_markers = 0
-
-    for detection in all_detections:
-        class_name = detection.get('class_name', '')
-        # Маркер эволюции: _ evolution mark
-        if class_name == '_ evolution mark':
-            detected_markers += 1
+    # Маркер эволюции: _ evolution mark
+    detected_markers = len(frame_index.of_category(CATEGORY_EVOLUTION))
 
     # 3. Сравнение с известными маркерами
     known_markers = len(evolution_dict_timer)
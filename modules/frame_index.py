@@ -0,0 +1,158 @@
+"""
+Модуль индекса детекций кадра.
+Индекс строится один раз на кадр (в app.py) и заменяет повторные линейные проходы
+процессоров по списку детекций: выборка по категории и по имени класса - словарь,
+поиск детекций категории в зоне - равномерная сетка ячеек (только ячейки зоны).
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import defaultdict
+
+Box = Tuple[float, float, float, float]  # (x1, y1, x2, y2)
+
+FRAME_INDEX_CELL_SIZE = 64  # сторона ячейки сетки (пиксели ROI), порядка размера зоны таймера/абилки
+
+
+class FrameIndex:
+    """
+    Индекс детекций одного кадра: категория → детекции, class_name → детекции,
+    (категория, ячейка сетки) → номера детекций.
+
+    Бокс попадает во все ячейки, которые он пересекает (запросы "бокс пересекает зону"),
+    центр бокса - в одну ячейку (запросы "центр бокса в зоне"). Результаты запросов
+    идут в порядке исходного списка детекций (как при линейном проходе).
+    """
+
+    def __init__(self, detections: List[Dict[str, Any]], cell_size: float = FRAME_INDEX_CELL_SIZE):
+        """
+        Args:
+            detections: детекции кадра (словари detector.detect)
+            cell_size: сторона ячейки сетки (пиксели)
+        """
+        self.detections = detections
+        self.cell_size = cell_size
+
+        self._by_category: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_name: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._boxes: Dict[Tuple, List[int]] = defaultdict(list)  # (категория, cx, cy) → номера боксов в ячейке
+        self._centers: Dict[Tuple, List[int]] = defaultdict(list)  # (категория, cx, cy) → номера центров в ячейке
+        self._extent = None  # занятые ячейки (cx1, cy1, cx2, cy2): запрос не перебирает пустые ячейки вне детекций
+
+        for number, detection in enumerate(detections):
+            category = detection.get('category')
+            self._by_category[category].append(detection)
+            class_name = detection.get('class_name')
+            if class_name:
+                self._by_name[class_name].append(detection)
+
+            box = detection.get('bbox')
+            if not box:
+                continue
+            cx1, cy1, cx2, cy2 = self._cells(box)
+            if self._extent is None:
+                self._extent = (cx1, cy1, cx2, cy2)
+            else:
+                ex1, ey1, ex2, ey2 = self._extent
+                self._extent = (min(ex1, cx1), min(ey1, cy1), max(ex2, cx2), max(ey2, cy2))
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    self._boxes[(category, cx, cy)].append(number)
+            self._centers[(category, self._cell((box[0] + box[2]) / 2), self._cell((box[1] + box[3]) / 2))].append(number)
+
+    def __len__(self) -> int:
+        return len(self.detections)
+
+    def __iter__(self):
+        return iter(self.detections)
+
+    @property
+    def categories(self) -> frozenset:
+        """Категории, которые есть на кадре."""
+        return frozenset(self._by_category)
+
+    def _cell(self, value: float) -> int:
+        return int(value // self.cell_size)
+
+    def _cells(self, box: Box) -> Tuple[int, int, int, int]:
+        """Диапазон ячеек (cx1, cy1, cx2, cy2) прямоугольника (включительно)."""
+        x1, y1, x2, y2 = box
+        return self._cell(min(x1, x2)), self._cell(min(y1, y2)), self._cell(max(x1, x2)), self._cell(max(y1, y2))
+
+    def of_category(self, category) -> List[Dict[str, Any]]:
+        """Детекции категории (в порядке кадра)."""
+        return self._by_category.get(category, [])
+
+    def of_class(self, class_name: str) -> List[Dict[str, Any]]:
+        """Детекции класса (в порядке кадра)."""
+        return self._by_name.get(class_name, [])
+
+    def has_class(self, class_name: str) -> bool:
+        """Есть ли класс на кадре."""
+        return class_name in self._by_name
+
+    def _query(self, grid, zone: Box, categories: Optional[Iterable]) -> List[int]:
+        """Номера детекций из ячеек зоны (кандидаты, без точной проверки)."""
+        if categories is None:
+            categories = self._by_category.keys()
+        categories = [category for category in categories if category in self._by_category]
+        if not categories or self._extent is None:
+            return []
+
+        zx1, zy1, zx2, zy2 = self._cells(zone)
+        ex1, ey1, ex2, ey2 = self._extent
+        zx1, zy1, zx2, zy2 = max(zx1, ex1), max(zy1, ey1), min(zx2, ex2), min(zy2, ey2)
+        found = set()
+        for category in categories:
+            for cx in range(zx1, zx2 + 1):
+                for cy in range(zy1, zy2 + 1):
+                    numbers = grid.get((category, cx, cy))
+                    if numbers:
+                        found.update(numbers)
+        return sorted(found)
+
+    def intersecting(self, zone: Box, categories: Optional[Iterable] = None) -> List[Dict[str, Any]]:
+        """
+        Детекции, бокс которых пересекает зону (касание границ - пересечение).
+
+        Args:
+            zone: зона (x1, y1, x2, y2)
+            categories: категории детекций (None - все)
+
+        Returns:
+            list: детекции в порядке кадра
+        """
+        zx1, zy1, zx2, zy2 = zone
+        result = []
+        for number in self._query(self._boxes, zone, categories):
+            detection = self.detections[number]
+            bx1, by1, bx2, by2 = detection['bbox']
+            if not (bx2 < zx1 or bx1 > zx2 or by2 < zy1 or by1 > zy2):
+                result.append(detection)
+        return result
+
+    def centers_in(self, zone: Box, categories: Optional[Iterable] = None) -> List[Dict[str, Any]]:
+        """
+        Детекции, центр бокса которых внутри зоны (границы включительно).
+
+        Args:
+            zone: зона (x1, y1, x2, y2)
+            categories: категории детекций (None - все)
+
+        Returns:
+            list: детекции в порядке кадра
+        """
+        zx1, zy1, zx2, zy2 = zone
+        result = []
+        for number in self._query(self._centers, zone, categories):
+            detection = self.detections[number]
+            bx1, by1, bx2, by2 = detection['bbox']
+            if zx1 <= (bx1 + bx2) / 2 <= zx2 and zy1 <= (by1 + by2) / 2 <= zy2:
+                result.append(detection)
+        return result
@@ -1,7 +1,9 @@
 from collections import Counter, defaultdict
 from typing import List, Tuple
 import math
+import numpy as np
 from config import get_roi_bounds
+from modules.classes import TimerObject
 
 
 
@@ -93,12 +95,66 @@ def iou_box(
 
 
 
+def iou_box_matrix(
+    boxes_a,
+    boxes_b,
+    alpha: float = 1,
+    sigma: float = 0.9
+) -> np.ndarray:
+    """
+    Композитный скор iou_box для всех пар боксов двух наборов (NumPy, один проход):
+      score[i, j] = iou_box(boxes_a[i], boxes_b[j], alpha, sigma)
+
+    boxes_a: (N, 4) боксы (x1, y1, x2, y2) с произвольным порядком координат
+    boxes_b: (M, 4) боксы
+    alpha, sigma: как в iou_box
+
+    Возвращает матрицу (N, M) float64 в [0, 1].
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    # --- нормализация координат (x1<=x2, y1<=y2)
+    a = np.concatenate([np.minimum(a[:, :2], a[:, 2:]), np.maximum(a[:, :2], a[:, 2:])], axis=1)
+    b = np.concatenate([np.minimum(b[:, :2], b[:, 2:]), np.maximum(b[:, :2], b[:, 2:])], axis=1)
+    ax1, ay1, ax2, ay2 = (a[:, k:k + 1] for k in range(4))  # (N, 1)
+    bx1, by1, bx2, by2 = (b[None, :, k] for k in range(4))  # (1, M)
+
+    # --- IoU (вырожденный бокс → 0)
+    area_a = (ax2 - ax1) * (ay2 - ay1)
+    area_b = (bx2 - bx1) * (by2 - by1)
+    inter = (np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0.0, None) *
+             np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0.0, None))
+    union = area_a + area_b - inter
+    valid = (area_a > 0.0) & (area_b > 0.0) & (union > 0.0)
+    iou = np.where(valid, inter / np.where(valid, union, 1.0), 0.0)
+
+    if alpha == 1:
+        return np.clip(iou, 0.0, 1.0)
+
+    # --- дистанция центров, нормированная на диагональ объединяющего прямоугольника
+    d = np.hypot((ax1 + ax2) * 0.5 - (bx1 + bx2) * 0.5, (ay1 + ay2) * 0.5 - (by1 + by2) * 0.5)
+    D = np.hypot(np.maximum(ax2, bx2) - np.minimum(ax1, bx1), np.maximum(ay2, by2) - np.minimum(ay1, by1))
+    if sigma <= 0.0:
+        center_term = np.ones_like(d)
+    else:
+        norm = d / (sigma * np.where(D > 0.0, D, 1.0))
+        center_term = np.where(D > 0.0, np.exp(-(norm * norm)), 1.0)
+
+    return np.clip(alpha * iou + (1.0 - alpha) * center_term, 0.0, 1.0)
+
+
+
 def cnt_box_timer(timer_obj: List[List[List[int]]]) -> int:
     '''
     Подсчитывает количество box_timer (первый элемент timer_screen) в timer_obj.
     Принимает объект timer_obj, состоящий из 6 timer_screen.
     Возвращает число,количество box_timer.
+    Для TimerObject - готовый счетчик окна (O(1)).
     '''
+    if isinstance(timer_obj, TimerObject):
+        return timer_obj.box_timer_count
+
     x = sum(1 for timer_screen in timer_obj if timer_screen[0])
 
     return x
@@ -223,7 +279,8 @@ def group_box_lvl(timer_obj: List[List], threshold: int = 3, iou_threshold: floa
     Принимает timer_obj (список из 6 timer_screen).
     Каждый timer_screen имеет структуру: [[box_timer], [box_zone], [[box_lvl], [box_lvl], ...], [class_name, ...]]
     Извлекает все box_lvl (timer_screen[2]) из всех timer_screen.
-    Группирует боксы с IoU >= iou_threshold.
+    Группы - компоненты связности графа "IoU >= iou_threshold" (матрица iou_box_matrix
+    + система непересекающихся множеств): результат не зависит от порядка боксов.
 
     Args:
         timer_obj: список из 6 timer_screen
@@ -243,47 +300,41 @@ def group_box_lvl(timer_obj: List[List], threshold: int = 3, iou_threshold: floa
         # Возвращает: 1 (одна группа с размером >= 3)
     """
 
+    # Боксов в окне меньше порога - групп нужного размера быть не может (счетчик TimerObject, O(1))
+    if isinstance(timer_obj, TimerObject) and timer_obj.lvl_box_count < threshold:
+        return 0
+
     # 1) Собираем все box_lvl из всех timer_screen
     all_boxes = []
     for timer_screen in timer_obj:
         # timer_screen[2] - это список box_lvl
         if len(timer_screen) > 2 and timer_screen[2]:
-            box_lvl_list = timer_screen[2]
-            # Добавляем все боксы из этого timer_screen
-            all_boxes.extend(box_lvl_list)
+            all_boxes.extend(timer_screen[2])
 
     # Если боксов нет - возвращаем 0
     if not all_boxes:
         return 0
 
-    # 2) Группировка боксов по IoU похожести
-    # Используем жадный алгоритм группировки
-    groups = []  # список групп, каждая группа - список боксов
-    used = [False] * len(all_boxes)  # отметки использованных боксов
-
-    for i, box_i in enumerate(all_boxes):
-        if used[i]:
-            continue
-
-        # Создаем новую группу с текущим боксом
-        current_group = [box_i]
-        used[i] = True
-
-        # Ищем все похожие боксы
-        for j, box_j in enumerate(all_boxes):
-            if used[j]:
-                continue
+    # 2) Пары похожих боксов (верхний треугольник матрицы iou_box, одним проходом NumPy)
+    similar = np.triu(iou_box_matrix(all_boxes, all_boxes) >= iou_threshold, k=1)
+    rows, cols = np.nonzero(similar)
 
-            # Проверяем IoU между box_i и box_j
-            similarity = iou_box(box_i, box_j)
+    # 3) Объединяем похожие боксы в группы (union-find со сжатием путей)
+    parent = list(range(len(all_boxes)))
 
-            if similarity >= iou_threshold:
-                current_group.append(box_j)
-                used[j] = True
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
 
-        groups.append(current_group)
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_j] = root_i
 
-    # 3) Считаем количество групп с размером >= threshold
-    valid_groups_count = sum(1 for group in groups if len(group) >= threshold)
+    # 4) Считаем количество групп с размером >= threshold
+    group_sizes = Counter(find(i) for i in range(len(all_boxes)))
+    valid_groups_count = sum(1 for size in group_sizes.values() if size >= threshold)
 
     return valid_groups_count
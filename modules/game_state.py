@@ -85,17 +85,19 @@ class GameState:
         self.game_start_time = None
         self.time_screen = None
 
-    def add_frame(self, detections: List, timestamp: float):
+    def add_frame(self, detections: List, timestamp: float, index=None):
         """
         Добавить кадр детекции в историю.
 
         Args:
             detections: список детекций с текущего кадра
             timestamp: временная метка кадра
+            index: индекс детекций кадра (FrameIndex), поиск по зонам в прошлых кадрах
         """
         self.log_screen.append({
             'detections': detections,
-            'timestamp': timestamp
+            'timestamp': timestamp,
+            'index': index
         })
 
     def set_elixir_rate(self, class_name: str):
@@ -0,0 +1,166 @@
+"""
+Модуль классификатора слотов НАШЕЙ руки.
+Четыре слота руки стоят на фиксированных местах ROI, поэтому заклинание в слоте
+определяется сравнением вырезки слота с картинками карт из data/ (нормированная
+корреляция уменьшенных изображений), без классов "Z..." основной модели.
+Результат - детекции того же формата, что и у YoloDetector (категория CATEGORY_HAND_SPELL).
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.classes import Card
+from modules.class_taxonomy import CATEGORY_HAND_SPELL
+
+
+def embed(image: np.ndarray, size: Tuple[int, int] = (20, 16), margin: float = 0.1) -> np.ndarray:
+    """
+    Вектор изображения карты: центральная часть (без рамки и углов),
+    средние по сетке size, нулевое среднее и единичная норма.
+
+    Args:
+        image: изображение (h, w, 3)
+        size: размер сетки (строки, столбцы)
+        margin: доля ширины/высоты, отрезаемая с каждой стороны
+
+    Returns:
+        np.ndarray: (rows * cols * 3,) float32
+    """
+    h, w = image.shape[:2]
+    dy, dx = int(h * margin), int(w * margin)
+    image = image[dy:h - dy, dx:w - dx, :3].astype(np.float32)
+
+    # Средние по ячейкам сетки (границы ячеек - целые пиксели)
+    rows = np.linspace(0, image.shape[0], size[0] + 1).astype(int)
+    cols = np.linspace(0, image.shape[1], size[1] + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(image, rows[:-1], axis=0), cols[:-1], axis=1)
+    vector = (sums / (np.diff(rows)[:, None, None] * np.diff(cols)[None, :, None])).ravel()
+
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def load_card_templates(cards: Sequence[Card]) -> List[Tuple[Optional[str], np.ndarray]]:
+    """
+    Картинки карт колоды (обычная и эволюция) для классификатора.
+
+    Args:
+        cards: список карт (all_card)
+
+    Returns:
+        list: [(spell_my_hand_class_name | None, изображение BGR), ...]
+              None - карта не заклинание (эталон для отказа)
+    """
+    import cv2  # OpenCV нужен только для чтения картинок карт
+
+    templates = []
+    for card in cards:
+        if card.card_name.startswith("Card Random"):
+            continue  # заглушки неизвестных карт
+        for path in (card.image_path, card.evolution_image_path):
+            if not path:
+                continue
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                logger.warning("Картинка карты не найдена: %s", path)
+                continue
+            templates.append((card.spell_my_hand_class_name, image))
+    return templates
+
+
+class HandSlotClassifier:
+    """
+    Заклинание в каждом из четырех слотов НАШЕЙ руки.
+
+    Эталоны - все карты колоды (заклинания и остальные): слот считается заклинанием,
+    если ближайший эталон - заклинание и корреляция с ним не ниже threshold.
+    """
+
+    def __init__(
+        self,
+        templates: Sequence[Tuple[Optional[str], np.ndarray]],
+        slots: Sequence[Tuple[float, float, float, float]],
+        threshold: float = 0.8,
+        size: Tuple[int, int] = (20, 16)
+    ):
+        """
+        Args:
+            templates: эталоны [(spell_my_hand_class_name | None, изображение), ...]
+            slots: слоты руки (x1, y1, x2, y2) в долях ширины/высоты ROI
+            threshold: минимальная корреляция с эталоном заклинания
+            size: размер сетки вектора изображения
+        """
+        self.slots = np.asarray(slots, dtype=np.float32).reshape(-1, 4)
+        self.threshold = threshold
+        self.size = size
+        self.labels = [label for label, _ in templates]
+        self.vectors = np.stack([embed(image, size) for _, image in templates]) if templates else \
+            np.zeros((0, size[0] * size[1] * 3), dtype=np.float32)
+
+        logger.info("Классификатор руки: %s эталонов (%s заклинаний), %s слотов",
+                    len(self.labels), sum(label is not None for label in self.labels), len(self.slots))
+
+    def slot_boxes(self, frame_hw) -> np.ndarray:
+        """Слоты в пикселях кадра: (S, 4) int."""
+        frame_h, frame_w = frame_hw
+        return np.round(self.slots * np.array([frame_w, frame_h, frame_w, frame_h])).astype(int)
+
+    def classify(self, frame: np.ndarray) -> List[Tuple[Optional[str], float]]:
+        """
+        Заклинание в каждом слоте.
+
+        Args:
+            frame: кадр ROI (BGR)
+
+        Returns:
+            list: [(spell_my_hand_class_name | None, корреляция), ...] по слотам
+        """
+        if not len(self.vectors):
+            return [(None, 0.0)] * len(self.slots)
+
+        results = []
+        for x1, y1, x2, y2 in self.slot_boxes(frame.shape[:2]):
+            crop = frame[y1:y2, x1:x2]
+            if crop.shape[0] < self.size[0] * 2 or crop.shape[1] < self.size[1] * 2:
+                results.append((None, 0.0))
+                continue
+            scores = self.vectors @ embed(crop, self.size)
+            best = int(scores.argmax())
+            label = self.labels[best] if scores[best] >= self.threshold else None
+            results.append((label, float(scores[best])))
+        return results
+
+    def detect(self, frame: np.ndarray, taxonomy=None) -> List[Dict[str, Any]]:
+        """
+        Детекции заклинаний в руке (формат YoloDetector.detect).
+
+        Args:
+            frame: кадр ROI (BGR)
+            taxonomy: ClassTaxonomy модели для class_id (None - class_id не заполняется)
+
+        Returns:
+            list: детекции с категорией CATEGORY_HAND_SPELL
+        """
+        detections = []
+        boxes = self.slot_boxes(frame.shape[:2])
+        for (class_name, score), bbox in zip(self.classify(frame), boxes.tolist()):
+            if class_name is None:
+                continue
+            detections.append({
+                'class_id': taxonomy.class_id(class_name) if taxonomy is not None else None,
+                'class_name': class_name,
+                'category': CATEGORY_HAND_SPELL,
+                'confidence': score,
+                'bbox': bbox,
+                'track_id': None
+            })
+        return detections
@@ -10,9 +10,10 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 logger.info("Загружен модуль: %s", __name__)
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from modules.game_state import GameState
-from modules.classes import Card
+from modules.card_registry import CardRegistry
+from modules.frame_index import FrameIndex
 from modules import timer_processor
 from modules import spell_processor
 from modules import ability_processor
@@ -23,7 +24,8 @@ def handler_processor(
     all_detections: List[Dict[str, Any]],
     current_time: float,
     game_state: GameState,
-    all_cards: List[Card]
+    cards: CardRegistry,
+    frame_index: Optional[FrameIndex] = None
 ) -> Dict[str, Any]:
     """
     Главная функция координатор для обработки детекций текущего кадра. Обновляет game_state и возвращает результаты обработки.
@@ -32,7 +34,8 @@ def handler_processor(
         all_detections: список всех детекций текущего кадра
         current_time: временная метка текущего кадра
         game_state: объект глобального состояния игры
-        all_cards: список всех карт для поиска атрибутов
+        cards: реестр карт для поиска атрибутов
+        frame_index: индекс детекций кадра (None - строится здесь)
 
     Returns:
         dict: результаты обработки {
@@ -52,8 +55,12 @@ def handler_processor(
         7. Обновление баланса эликсира противника
         8. Возврат результатов
     """
+    # Индекс детекций: один на кадр для всех процессоров (и для log_screen)
+    if frame_index is None:
+        frame_index = FrameIndex(all_detections)
+
     # 1. Добавляем кадр в историю детекций
-    game_state.add_frame(all_detections, current_time)
+    game_state.add_frame(all_detections, current_time, frame_index)
 
     # Инициализируем результаты
     results = {
@@ -70,7 +77,7 @@ def handler_processor(
     # Независимая от других процессов, только фиксация маркеров
     # Обновление cnt_evo происходит в card_manager.play_known_card/play_new_card
     evolution_processor.process_evolution_detections(
-        all_detections,
+        frame_index,
         game_state.evolution_dict_timer,
         current_time
     )
@@ -81,7 +88,7 @@ def handler_processor(
         game_state.log_screen,
         game_state.timer_list,
         game_state.card_manager,
-        all_detections,
+        frame_index,
         current_time,
         game_state.evolution_dict_timer
     )
@@ -89,22 +96,22 @@ def handler_processor(
 
     # 5. Обработка заклинаний (всегда запускается)
     elixir_spent_spell = spell_processor.process_spell_detections(
-        all_detections,
+        frame_index,
         game_state.spell_dict_hand,
         game_state.spell_dict_our,
         game_state.spell_dict_enemy,
         game_state.card_manager,
         current_time,
-        all_cards
+        cards
     )
     results['elixir_spent_spell'] = elixir_spent_spell
 
     # 6. Обработка абилок чемпионов (всегда запускается, внутри фильтр)
     elixir_spent_ability = ability_processor.process_ability_detections(
-        all_detections,
+        frame_index,
         game_state.ability_dict_enemy,
         current_time,
-        all_cards
+        cards
     )
     results['elixir_spent_ability'] = elixir_spent_ability
 
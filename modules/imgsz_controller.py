@@ -0,0 +1,118 @@
+"""
+Модуль выбора размера входа модели по бюджету времени кадра.
+Под нагрузкой кадры не укладываются в бюджет - размер входа уменьшается,
+в простое - увеличивается (больше пикселей для мелких классов: уровни, таймеры).
+Гистерезис (разные пороги вниз/вверх и минимальное время на размере) не дает
+размеру переключаться на каждом кадре.
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Dict, Optional, Sequence
+
+
+class ImgszController:
+    """
+    Размер входа модели на кадр из набора прогретых размеров.
+
+    Время инференса каждого размера - экспоненциальное среднее замеров, для еще не
+    замеренного размера - пересчет от ближайшего замеренного пропорционально числу пикселей.
+    Вниз - сразу, как только время текущего размера превысило down_ratio * бюджет.
+    Вверх - на один размер, если на текущем размере прошло hold_frames кадров
+    и прогноз для следующего не больше up_ratio * бюджет.
+    """
+
+    def __init__(
+        self,
+        sizes: Sequence[int],
+        budget_ms: float,
+        initial: Optional[int] = None,
+        down_ratio: float = 0.9,
+        up_ratio: float = 0.6,
+        hold_frames: int = 8,
+        alpha: float = 0.3
+    ):
+        """
+        Args:
+            sizes: прогретые размеры входа
+            budget_ms: бюджет времени инференса кадра (мс)
+            initial: начальный размер (None - наибольший)
+            down_ratio: доля бюджета, выше которой размер уменьшается
+            up_ratio: доля бюджета, до которой допускается следующий размер
+            hold_frames: минимум кадров на размере перед увеличением
+            alpha: вес нового замера в среднем времени
+        """
+        if not sizes:
+            raise ValueError("Пустой набор размеров входа")
+        if up_ratio >= down_ratio:
+            raise ValueError("up_ratio должен быть меньше down_ratio (гистерезис)")
+        self.sizes = sorted(set(int(size) for size in sizes))
+        self.budget_ms = budget_ms
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.hold_frames = hold_frames
+        self.alpha = alpha
+
+        self.latency: Dict[int, float] = {}  # размер → среднее время инференса (мс)
+        self.index = self.sizes.index(initial) if initial in self.sizes else len(self.sizes) - 1
+        self.frames_on_size = 0
+        self.counts = {size: 0 for size in self.sizes}  # кадров на каждом размере
+        self.switches = 0
+
+    @property
+    def size(self) -> int:
+        """Текущий размер входа."""
+        return self.sizes[self.index]
+
+    def predict(self, size: int) -> Optional[float]:
+        """Ожидаемое время инференса размера (мс), None - нет ни одного замера."""
+        if size in self.latency:
+            return self.latency[size]
+        if not self.latency:
+            return None
+        nearest = min(self.latency, key=lambda known: abs(known - size))
+        return self.latency[nearest] * (size / nearest) ** 2
+
+    def update(self, size: int, latency_ms: float) -> None:
+        """Замер времени инференса кадра на размере size."""
+        previous = self.latency.get(size)
+        self.latency[size] = latency_ms if previous is None else previous + self.alpha * (latency_ms - previous)
+
+    def choose(self, remaining_ms: Optional[float] = None) -> int:
+        """
+        Размер входа для следующего кадра.
+
+        Args:
+            remaining_ms: оставшееся время кадра (None - только бюджет budget_ms)
+
+        Returns:
+            int: размер входа
+        """
+        budget = self.budget_ms if remaining_ms is None else min(self.budget_ms, remaining_ms)
+        index = self.index
+
+        current = self.predict(self.sizes[index])
+        if current is not None and current > budget * self.down_ratio:
+            # Не укладываемся: наибольший размер с прогнозом в пределах порога (или наименьший)
+            while index > 0 and self.predict(self.sizes[index]) > budget * self.down_ratio:
+                index -= 1
+        elif self.frames_on_size >= self.hold_frames and index + 1 < len(self.sizes):
+            upper = self.predict(self.sizes[index + 1])
+            if upper is not None and upper <= budget * self.up_ratio:
+                index += 1
+
+        if index != self.index:
+            logger.info("Размер входа модели: %s → %s (бюджет %.0f мс, время %.1f мс)",
+                        self.size, self.sizes[index], budget, current or 0.0)
+            self.index = index
+            self.frames_on_size = 0
+            self.switches += 1
+
+        self.frames_on_size += 1
+        self.counts[self.size] += 1
+        return self.size
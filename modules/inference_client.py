@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Модуль клиента сервера инференса.
+InferenceClient повторяет интерфейс YoloDetector: инференс выполняет сервер
+(modules/inference_server.py), а постобработка, трекинг и кэш детекций остаются
+в процессе бота - у каждого стола свои треки.
+"""
+
+import json
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from modules.yolo_detector import YoloDetector, _ModelRuntime
+from modules.detection_cache import decode_arrays
+from modules.inference_server import (
+    ProtocolError,
+    connect,
+    send_frame_request,
+    send_info_request,
+    recv_response,
+)
+
+from config import (
+    INFERENCE_SERVER_ADDRESS,  # Адрес сервера инференса
+    INFERENCE_CLIENT_TIMEOUT,  # Таймаут ответа сервера (сек)
+)
+
+
+class InferenceClient(YoloDetector):
+    """
+    Детектор, отправляющий кадры на сервер инференса.
+
+    Модель живет на сервере; клиент получает классы модели (MSG_INFO) и строит
+    по ним те же таблицы, что и YoloDetector. Когда сервер заменил модель
+    (поколение в ответе изменилось), таблицы перестраиваются перед постобработкой кадра.
+    """
+
+    def __init__(self, address=INFERENCE_SERVER_ADDRESS, timeout=INFERENCE_CLIENT_TIMEOUT):
+        """
+        Args:
+            address (str): путь к Unix-сокету сервера или "host:port"
+            timeout (float): таймаут ответа сервера (сек)
+        """
+        super().__init__(model_path=address)
+        self.address = address
+        self.timeout = timeout
+        self._sock = None
+        self._generation = None  # поколение модели сервера, для которого построены таблицы
+        self.change_detector = None  # области кадра требуют модели в процессе (инференс на сервере - весь кадр)
+        self.imgsz_controller = None  # размер входа выбирает сервер (YOLO_IMG_SIZE)
+
+    def load_model(self, frame_shape=None):
+        """
+        Подключение к серверу и построение таблиц классов его модели.
+
+        Args:
+            frame_shape (tuple | None): не используется (прогрев выполняет сервер)
+
+        Returns:
+            bool: True если сервер доступен
+        """
+        try:
+            self.runtime = self._load_runtime(self.address)
+            return True
+        except (OSError, ProtocolError, ValueError) as e:
+            logger.error("ОШИБКА подключения к серверу инференса %s: %s", self.address, e)
+            return False
+
+    def _load_runtime(self, model_path, with_crops=False):
+        """Классы модели сервера → таблицы классов (модели в процессе клиента нет)."""
+        info = json.loads(self._call(send_info_request)[1].decode('utf-8'))
+        class_names = {int(class_id): name for class_id, name in info['class_names'].items()}
+        logger.info("Сервер инференса %s: %s классов (поколение модели %s)",
+                    self.address, len(class_names), info['generation'])
+
+        taxonomy, class_thresholds, predict_confidence, nms_groups = self._build_class_tables(class_names)
+        self._generation = info['generation']
+
+        return _ModelRuntime(
+            self.address, 0.0, None, info['model_hash'], class_names, taxonomy,
+            class_thresholds, predict_confidence, nms_groups, None
+        )
+
+    def _connect(self):
+        if self._sock is None:
+            self._sock = connect(self.address, self.timeout)
+        return self._sock
+
+    def _close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _call(self, send, *args):
+        """Запрос к серверу с одним переподключением при обрыве соединения."""
+        for attempt in range(2):
+            try:
+                sock = self._connect()
+                send(sock, *args)
+                return recv_response(sock)
+            except (OSError, ProtocolError):
+                self._close()
+                if attempt:
+                    raise
+
+    def _infer(self, frame, runtime=None, imgsz=None):
+        """
+        Инференс кадра на сервере.
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+            runtime: не используется (модель на сервере)
+            imgsz: не используется (размер входа сервера)
+
+        Returns:
+            DetectionArrays: детекции модели сервера (до постобработки)
+        """
+        generation, data = self._call(send_frame_request, frame)
+
+        # Сервер заменил модель: перестраиваем таблицы до постобработки этого кадра
+        if generation != self._generation:
+            self._pending_runtime = self._load_runtime(self.address)
+            self._apply_pending_swap()
+
+        return decode_arrays(data)
+
+    def detect_raw_batch(self, frames):
+        """Пачка кадров (по одному запросу на кадр, пачки собирает сервер)."""
+        return [self._infer(frame) for frame in frames]
+
+    def prepare_frame_shape(self, frame_shape):
+        """Прогрев выполняет сервер."""
+        self.frame_shape = frame_shape
+
+    def warmup(self, frame_shape, runtime=None):
+        """Прогрев выполняет сервер."""
+
+    def select_threads(self, frame_shape):
+        """Потоки CPU выбирает сервер."""
+
+    def request_model_swap(self, model_path=None, frame_shape=None):
+        """Модель заменяется на сервере."""
+        return False
+
+    def poll_model_file(self):
+        """Файл модели отслеживает сервер."""
+        return False
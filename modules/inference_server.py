@@ -0,0 +1,286 @@
+"""
+Модуль локального сервера инференса.
+Один процесс держит модель YOLO (YoloDetector) и обслуживает несколько ботов (столов):
+кадры приходят через Unix-сокет (на Windows - TCP на localhost), запросы разных клиентов
+собираются в пачки в пределах бюджета задержки и идут через сеть одним проходом.
+Ответ - колоночные детекции (формат encode_arrays), постобработка и трекинг - на стороне клиента.
+
+Протокол (little-endian):
+    запрос:  [тип uint8][h uint32][w uint32][c uint32][кадр uint8 h*w*c]   (тип MSG_FRAME)
+             [тип uint8][0][0][0]                                         (тип MSG_INFO)
+    ответ:   [статус uint8][поколение модели uint32][длина uint32][данные]
+             данные: MSG_FRAME - encode_arrays, MSG_INFO - JSON {class_names, model_hash, generation},
+             статус STATUS_ERROR - текст ошибки
+"""
+
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import logging
+import threading
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Optional
+
+import numpy as np
+
+from modules.detection_cache import encode_arrays, file_hash
+
+REQUEST_HEADER = struct.Struct('<BIII')  # тип, h, w, c
+RESPONSE_HEADER = struct.Struct('<BII')  # статус, поколение модели, длина данных
+
+MSG_FRAME = 1
+MSG_INFO = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+class ProtocolError(Exception):
+    """Ошибка протокола сервера инференса (соединение закрыто, неверное сообщение)."""
+
+
+def parse_address(address: str):
+    """
+    Адрес сервера → (семейство сокета, адрес для bind/connect).
+
+    "host:port" - TCP, иначе путь к Unix-сокету.
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and os.sep not in host:
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def connect(address: str, timeout: Optional[float] = None) -> socket.socket:
+    """Подключение к серверу инференса."""
+    family, target = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(target)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """Чтение ровно size байт без лишних копий (ProtocolError если соединение закрыто)."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ProtocolError("соединение закрыто")
+        received += count
+    return buffer
+
+
+def send_frame_request(sock: socket.socket, frame: np.ndarray) -> None:
+    """Отправка кадра на инференс."""
+    frame = np.ascontiguousarray(frame, dtype=np.uint8)
+    h, w, c = frame.shape
+    sock.sendall(REQUEST_HEADER.pack(MSG_FRAME, h, w, c))
+    sock.sendall(memoryview(frame).cast('B'))
+
+
+def send_info_request(sock: socket.socket) -> None:
+    """Запрос классов и хэша модели сервера."""
+    sock.sendall(REQUEST_HEADER.pack(MSG_INFO, 0, 0, 0))
+
+
+def recv_response(sock: socket.socket):
+    """
+    Чтение ответа сервера.
+
+    Returns:
+        tuple: (поколение модели, данные)
+
+    Raises:
+        ProtocolError: соединение закрыто или сервер вернул ошибку
+    """
+    status, generation, length = RESPONSE_HEADER.unpack(recv_exact(sock, RESPONSE_HEADER.size))
+    data = recv_exact(sock, length)
+    if status != STATUS_OK:
+        raise ProtocolError(f"ошибка сервера: {data.decode('utf-8', errors='replace')}")
+    return generation, data
+
+
+class _Request:
+    """Кадр клиента в очереди на инференс."""
+    __slots__ = ('frame', 'done', 'arrays', 'error', 'generation')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.done = threading.Event()
+        self.arrays = None
+        self.error = None
+        self.generation = 0  # поколение модели, которой посчитаны детекции
+
+
+class InferenceServer:
+    """
+    Сервер инференса: поток на каждого клиента + один поток пачек.
+
+    Поток пачек берет первый запрос из очереди и ждет остальные не дольше max_wait_ms
+    (или до max_batch запросов), затем прогоняет пачку через detector.detect_raw_batch.
+    """
+
+    def __init__(self, detector, address: str, max_batch: int = 4, max_wait_ms: float = 5.0):
+        """
+        Args:
+            detector: загруженный YoloDetector
+            address: путь к Unix-сокету или "host:port"
+            max_batch: максимум кадров в пачке
+            max_wait_ms: сколько ждать остальные кадры пачки после первого
+        """
+        self.detector = detector
+        self.address = address
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = queue.Queue()
+        self._running = False
+        self._listener = None
+        self._info_cache = {}  # поколение модели → JSON с классами и хэшем
+
+        self.batches = 0
+        self.frames = 0
+
+    def serve_forever(self) -> None:
+        """Запуск сервера (блокирует поток до shutdown)."""
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.remove(target)  # сокет от прошлого запуска
+
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(target)
+        self._listener.listen()
+        self._running = True
+
+        batch_thread = threading.Thread(target=self._batch_loop, name="inference-batch", daemon=True)
+        batch_thread.start()
+        logger.info("Сервер инференса: %s (пачка до %s кадров, ожидание %.1f мс)",
+                    self.address, self.max_batch, self.max_wait * 1000)
+
+        try:
+            while self._running:
+                try:
+                    client, _ = self._listener.accept()
+                except OSError:
+                    break  # сокет закрыт в shutdown
+                threading.Thread(target=self._client_loop, args=(client,), name="inference-client", daemon=True).start()
+        finally:
+            self._running = False
+            self._queue.put(None)
+            batch_thread.join()
+            if family == socket.AF_UNIX and os.path.exists(target):
+                os.remove(target)
+
+    def shutdown(self) -> None:
+        """Остановка сервера."""
+        self._running = False
+        if self._listener is not None:
+            try:
+                self._listener.shutdown(socket.SHUT_RDWR)  # прерывает accept в потоке сервера
+            except OSError:
+                pass
+            self._listener.close()
+
+    def _info(self):
+        """
+        Классы и хэш текущей модели (JSON, строится один раз на поколение модели).
+
+        Returns:
+            tuple: (поколение модели, JSON) - из одного снимка detector.runtime
+            (модель заменяется в потоке пачек параллельно с потоками клиентов)
+        """
+        runtime = self.detector.runtime
+        generation = runtime.generation
+        if generation not in self._info_cache:
+            self._info_cache[generation] = json.dumps({
+                'class_names': {str(class_id): name for class_id, name in runtime.class_names.items()},
+                'model_hash': runtime.model_hash or file_hash(runtime.model_path),
+                'generation': generation,
+            }, ensure_ascii=False).encode('utf-8')
+        return generation, self._info_cache[generation]
+
+    def _client_loop(self, client: socket.socket) -> None:
+        """Обслуживание одного клиента: запрос → очередь пачек → ответ."""
+        with client:
+            while self._running:
+                try:
+                    kind, h, w, c = REQUEST_HEADER.unpack(recv_exact(client, REQUEST_HEADER.size))
+                    if kind == MSG_INFO:
+                        generation, info = self._info()
+                        self._reply(client, STATUS_OK, generation, info)
+                        continue
+                    if kind != MSG_FRAME:
+                        raise ProtocolError(f"неизвестный тип сообщения: {kind}")
+
+                    data = recv_exact(client, h * w * c)
+                    request = _Request(np.frombuffer(data, dtype=np.uint8).reshape(h, w, c))
+                    self._queue.put(request)
+                    request.done.wait()
+
+                    if request.error is not None:
+                        self._reply(client, STATUS_ERROR, request.generation, request.error.encode('utf-8'))
+                    else:
+                        self._reply(client, STATUS_OK, request.generation, encode_arrays(request.arrays))
+
+                except (ProtocolError, OSError):
+                    break  # клиент отключился
+
+    @staticmethod
+    def _reply(client: socket.socket, status: int, generation: int, data: bytes) -> None:
+        client.sendall(RESPONSE_HEADER.pack(status, generation, len(data)) + data)
+
+    def _batch_loop(self) -> None:
+        """Сбор запросов в пачки и инференс."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)  # завершение после текущей пачки
+                    break
+                batch.append(request)
+
+            # Новая версия файла модели → загрузка в фоне, подмена между пачками
+            self.detector.poll_model_file()
+
+            try:
+                results = self.detector.detect_raw_batch([request.frame for request in batch])
+                generation = self.detector.runtime.generation  # замена модели - только в этом потоке
+                for request, arrays in zip(batch, results):
+                    request.arrays = arrays
+                    request.generation = generation
+            except Exception as e:
+                logger.error("ОШИБКА инференса пачки: %s", e)
+                for request in batch:
+                    request.error = str(e)
+
+            self.batches += 1
+            self.frames += len(batch)
+            for request in batch:
+                request.done.set()
@@ -0,0 +1,208 @@
+"""
+Модуль детекции по ключевым кадрам.
+Модель запускается только на ключевых кадрах (каждые K кадров, при большом изменении
+сцены или когда в кадре изменилась область без известных объектов - появилось что-то новое).
+Между ключевыми кадрами боксы переносятся разреженным оптическим потоком
+(пирамидальный Lucas-Kanade по нескольким точкам внутри каждого бокса): класс сохраняется,
+уверенность затухает до порога своего класса (не ниже), бокс отбрасывается только когда
+оптический поток его потерял.
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Optional
+
+import cv2  # OpenCV: оптический поток Lucas-Kanade
+import numpy as np
+
+from modules.detection_postprocess import DetectionArrays, filter_by_class_confidence
+from modules.cascade import box_centers, points_in_regions
+from modules.change_detector import ChangeDetector
+
+
+def box_grid_points(boxes: np.ndarray, grid: int = 3, inner: float = 0.5) -> np.ndarray:
+    """
+    Точки для оптического потока: сетка grid x grid в центральной части каждого бокса.
+
+    Args:
+        boxes: (N, 4) боксы x1, y1, x2, y2
+        grid: точек по каждой оси
+        inner: доля ширины/высоты бокса, занятая сеткой
+
+    Returns:
+        np.ndarray: (N * grid * grid, 2) float32, точки бокса i - строки [i * grid², (i + 1) * grid²)
+    """
+    steps = (np.arange(grid, dtype=np.float32) + 0.5) / grid  # доли внутри сетки
+    offsets = (1 - inner) / 2 + inner * steps
+    fx, fy = np.meshgrid(offsets, offsets)
+    fx, fy = fx.ravel(), fy.ravel()
+
+    widths = (boxes[:, 2] - boxes[:, 0])[:, None]
+    heights = (boxes[:, 3] - boxes[:, 1])[:, None]
+    xs = boxes[:, 0:1] + widths * fx[None, :]
+    ys = boxes[:, 1:2] + heights * fy[None, :]
+    return np.stack([xs.ravel(), ys.ravel()], axis=1).astype(np.float32)
+
+
+def median_shifts(old_points: np.ndarray, new_points: np.ndarray, valid: np.ndarray, per_box: int, min_points: int):
+    """
+    Смещение каждого бокса - медиана смещений его отслеженных точек.
+
+    Args:
+        old_points, new_points: (N * per_box, 2) точки до и после
+        valid: (N * per_box,) bool - точка отслежена
+        per_box: точек на бокс
+        min_points: минимум отслеженных точек, иначе бокс потерян
+
+    Returns:
+        tuple: ((N, 2) смещения dx, dy, (N,) bool - бокс отслежен)
+    """
+    count = len(valid) // per_box
+    deltas = (new_points - old_points).reshape(count, per_box, 2)
+    valid = valid.reshape(count, per_box)
+
+    # Медиана только по отслеженным точкам (неотслеженные - NaN)
+    deltas = np.where(valid[:, :, None], deltas, np.nan)
+    tracked = valid.sum(axis=1) >= min_points
+    shifts = np.zeros((count, 2), dtype=np.float32)
+    if tracked.any():
+        shifts[tracked] = np.nanmedian(deltas[tracked], axis=1)
+    return shifts, tracked
+
+
+class KeyframePropagator:
+    """
+    Перенос детекций ключевого кадра на промежуточные кадры оптическим потоком.
+
+    Поток считается между соседними кадрами (по уменьшенному серому кадру),
+    точки каждый кадр берутся заново из текущих боксов.
+    """
+
+    def __init__(
+        self,
+        interval: int = 3,
+        decay: float = 0.9,
+        flow_scale: float = 0.5,
+        grid: int = 3,
+        min_points: int = 3,
+        change_detector: Optional[ChangeDetector] = None
+    ):
+        """
+        Args:
+            interval: ключевой кадр не реже чем каждые interval кадров
+            decay: множитель уверенности за каждый перенесенный кадр (не ниже порога класса)
+            flow_scale: масштаб кадра для оптического потока
+            grid: сетка точек в боксе (grid x grid)
+            min_points: минимум отслеженных точек бокса (иначе бокс отбрасывается)
+            change_detector: изменившиеся области кадра для внеочередных ключевых кадров (None - только по интервалу)
+        """
+        self.interval = interval
+        self.decay = decay
+        self.flow_scale = flow_scale
+        self.grid = grid
+        self.min_points = min_points
+        self.change_detector = change_detector
+
+        self._gray = None  # уменьшенный серый прошлый кадр
+        self._arrays = None  # детекции прошлого кадра
+        self._frames_since_key = 0
+        self.stats = {'frames': 0, 'keyframes': 0, 'forced': 0}
+
+    def reset(self) -> None:
+        """Сброс (следующий кадр - ключевой)."""
+        self._gray = None
+        self._arrays = None
+        if self.change_detector is not None:
+            self.change_detector.reset()
+
+    def _prepare_gray(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.flow_scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.flow_scale, fy=self.flow_scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def is_keyframe(self, frame: np.ndarray) -> bool:
+        """
+        Нужен ли инференс модели на этом кадре.
+
+        Ключевой кадр: первый кадр, каждые interval кадров, большое изменение сцены
+        (ChangeDetector требует полный кадр) или изменившаяся область без известных боксов.
+        """
+        self.stats['frames'] += 1
+        regions = self.change_detector.update(frame) if self.change_detector is not None else None
+
+        if self._arrays is None or self._frames_since_key + 1 >= self.interval:
+            return True
+
+        if self.change_detector is not None:
+            if regions is None:
+                self.stats['forced'] += 1
+                return True
+            if len(regions) and len(self._arrays):
+                # область изменений без центра известного бокса - новый объект
+                covered = points_in_regions(box_centers(self._arrays.boxes), regions).any(axis=0)
+                if not covered.all():
+                    self.stats['forced'] += 1
+                    return True
+            elif len(regions):
+                self.stats['forced'] += 1
+                return True
+
+        return False
+
+    def set_keyframe(self, frame: np.ndarray, arrays: DetectionArrays) -> None:
+        """Детекции модели на ключевом кадре (после постобработки)."""
+        self._gray = self._prepare_gray(frame)
+        self._arrays = arrays
+        self._frames_since_key = 0
+        self.stats['keyframes'] += 1
+
+    def propagate(self, frame: np.ndarray, thresholds: Optional[np.ndarray] = None) -> DetectionArrays:
+        """
+        Перенос детекций прошлого кадра на новый кадр.
+
+        Args:
+            frame: кадр BGR
+            thresholds: пороги уверенности по class_id (уверенность затухает не ниже порога)
+
+        Returns:
+            DetectionArrays: перенесенные детекции
+        """
+        gray = self._prepare_gray(frame)
+        arrays = self._arrays
+        self._frames_since_key += 1
+
+        if len(arrays):
+            per_box = self.grid * self.grid
+            old_points = box_grid_points(arrays.boxes * self.flow_scale, self.grid)
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(
+                self._gray, gray, old_points.reshape(-1, 1, 2), None, winSize=(15, 15), maxLevel=2
+            )
+            valid = status.ravel().astype(bool)
+            shifts, tracked = median_shifts(old_points, new_points.reshape(-1, 2), valid, per_box, self.min_points)
+
+            shifts /= self.flow_scale
+            boxes = arrays.boxes + np.concatenate([shifts, shifts], axis=1)
+            frame_h, frame_w = frame.shape[:2]
+            boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, frame_w)
+            boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, frame_h)
+
+            scores = arrays.scores * self.decay
+            if thresholds is not None:
+                # Затухание до порога класса, но не ниже: детекция ключевого кадра чуть выше порога
+                # не пропадает на промежуточных кадрах (мерцание в счетчиках timer_screen и руки)
+                floor = np.minimum(thresholds[arrays.class_ids], arrays.scores)
+                scores = np.maximum(scores, floor).astype(arrays.scores.dtype)
+            arrays = DetectionArrays(boxes.astype(np.float32), scores, arrays.class_ids)
+            arrays = arrays.select(tracked)
+            if thresholds is not None:
+                arrays = filter_by_class_confidence(arrays, thresholds)  # ниже порога только уже на ключевом кадре
+
+        self._gray = gray
+        self._arrays = arrays
+        return arrays
@@ -0,0 +1,91 @@
+"""
+Модуль фоновой загрузки детектора при запуске приложения.
+Импорт ultralytics/torch и загрузка весов - самая долгая часть запуска: они идут
+в отдельном потоке параллельно с выбором ROI и созданием overlay. Прогрев модели
+ждет размер ROI (кадры прогрева того же размера, что и рабочие).
+"""
+
+import time
+import logging
+import threading
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+
+class BackgroundModelLoader:
+    """
+    Загрузка детектора в фоновом потоке: импорт модулей модели → load_model →
+    ожидание размера ROI (set_frame_shape) → прогрев. Главный поток забирает
+    готовый детектор через result() перед первым кадром.
+
+    Время фаз (сек) - в timings: import, load, wait_roi, warmup.
+    """
+
+    def __init__(self, inference_mode: str = "local"):
+        """
+        Args:
+            inference_mode: "local" - YoloDetector, "client" - InferenceClient
+        """
+        self.inference_mode = inference_mode
+        self.timings = {}
+
+        self._frame_shape = None
+        self._frame_shape_ready = threading.Event()
+        self._detector = None
+        self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+
+    def start(self) -> None:
+        """Запуск фоновой загрузки."""
+        self._thread.start()
+
+    def set_frame_shape(self, frame_shape) -> None:
+        """Размер кадра ROI (h, w, 3) известен - можно прогревать модель."""
+        self._frame_shape = frame_shape
+        self._frame_shape_ready.set()
+
+    def result(self, timeout=None):
+        """
+        Ожидание окончания загрузки.
+
+        Args:
+            timeout (float | None): максимальное ожидание (сек)
+
+        Returns:
+            детектор (YoloDetector | InferenceClient) или None при ошибке загрузки
+        """
+        self._thread.join(timeout)
+        return self._detector
+
+    def _run(self) -> None:
+        """Фоновый поток загрузки."""
+        try:
+            started = time.perf_counter()
+            # Импорт здесь, а не в app.py: ultralytics/torch загружаются параллельно с главным потоком
+            if self.inference_mode == "client":
+                from modules.inference_client import InferenceClient
+                detector = InferenceClient()
+            else:
+                from modules.yolo_detector import YoloDetector
+                detector = YoloDetector()
+            self.timings['import'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            if not detector.load_model():
+                return
+            self.timings['load'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            self._frame_shape_ready.wait()
+            self.timings['wait_roi'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            detector.prepare_frame_shape(self._frame_shape)
+            self.timings['warmup'] = time.perf_counter() - started
+
+            self._detector = detector
+
+        except Exception as e:
+            logger.error("ОШИБКА фоновой загрузки модели: %s", e)
@@ -13,7 +13,10 @@ logger.info("Загружен модуль: %s", __name__)
 
 from typing import Dict, List, Any, Optional
 from modules.classes import Card
+from modules.card_registry import CardRegistry
 from modules.card_manager import CardManager
+from modules.frame_index import FrameIndex
+from modules.class_taxonomy import CATEGORY_FIELD_SPELL, CATEGORY_HAND_SPELL
 
 
 def cleanup_spell_dict_hand(spell_dict_hand: Dict[str, List[int]]) -> None:
@@ -36,21 +39,21 @@ def cleanup_spell_dict_hand(spell_dict_hand: Dict[str, List[int]]) -> None:
 
 
 def update_spell_dict_hand(
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     spell_dict_hand: Dict[str, List[int]],
     spell_dict_our: Dict[str, List[float]],
     current_time: float,
-    all_cards: List[Card]
+    cards: CardRegistry
 ) -> None:
     """
     Обновляет список НАШИХ заклинаний в НАШЕЙ руке (spell_dict_hand).
 
     Args:
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
         spell_dict_hand: словарь НАШИХ заклинаний в руке {"class_name": [1,0,0,0], ...}
         spell_dict_our: словарь списков таймаутов НАШИХ активных заклинаний {"class_name": [timeout_1, ...], ...}
         current_time: текущая временная метка
-        all_cards: список всех карт для получения spell_life_time
+        cards: реестр карт (spell_life_time)
 
     Логика:
         1. Ищем детекции заклинаний в НАШЕЙ руке (class_name начинается с "Z", особый нейминг для карт в НАШЕЙ руке)
@@ -72,12 +75,7 @@ def update_spell_dict_hand(
     """
     # Находим все заклинания в текущих детекциях (НАША рука)
     # Обрабатываем все детекции с class_name начинающимся на "Z"
-    detected_spells = set()
-    for detection in all_detections:
-        class_name = detection.get('class_name', '')
-        # Фильтруем заклинания (начинаются с "Z")
-        if class_name and class_name.startswith('Z') and len(class_name) > 1:
-            detected_spells.add(class_name)
+    detected_spells = {detection['class_name'] for detection in frame_index.of_category(CATEGORY_HAND_SPELL)}
 
     # Обновляем spell_dict_hand
     # Для каждого известного заклинания добавляем 1 или 0 в начало списка
@@ -93,7 +91,7 @@ def update_spell_dict_hand(
         if spell_dict_hand[class_name] == [0, 0, 0, 0]:
             # Заклинание исчезло из руки → переносим в spell_dict_our
             # Находим карту для получения spell_life_time
-            card = _find_card_by_spell_my_hand_class_name(class_name, all_cards)
+            card = cards.by_hand_class_name(class_name)
             # Если карта найдена и у нее есть время отыгрывания заклинания, то записываем в словарь spell_dict_our
             if card and card.spell_life_time:
                 # Таймаут = текущее время + время отыгрывания заклинания
@@ -150,7 +148,7 @@ def check_spell_dict_timeout(
 def _process_new_enemy_spell(
     class_name: str,
     card_manager: CardManager,
-    all_cards: List[Card]
+    cards: CardRegistry
 ) -> Optional[Card]:
     """
     Обрабатывает ОДНО новое вражеское заклинание: запускает цикл карт и возвращает карту.
@@ -158,7 +156,7 @@ def _process_new_enemy_spell(
     Args:
         class_name: class_name детектированного заклинания на поле
         card_manager: менеджер карт противника
-        all_cards: список всех карт для получения spell_life_time
+        cards: реестр карт (spell_life_time)
 
     Returns:
         Card если заклинание обработано, None если карта не найдена
@@ -167,7 +165,7 @@ def _process_new_enemy_spell(
         1. Ищем карту в hand_cards → play_known_card()
         2. Если не нашли и есть card_random → ищем в deck_cards → play_new_card()
         3. Если не нашли → ищем в await_cards (сбой цикла)
-        4. Если не нашли в card_manager → ищем в all_cards (для таймаута)
+        4. Если не нашли в card_manager → ищем в реестре карт (для таймаута)
         5. Возвращаем найденную карту
     """
     found_card = None
@@ -192,68 +190,34 @@ def _process_new_enemy_spell(
             # TODO: Особый случай - карта в await, нужна специальная логика смены цикла
             card_manager.play_known_card(class_name)  # временно используем обычную логику
 
-    # Если карта не найдена в card_manager, ищем в all_cards для получения spell_life_time
+    # Если карта не найдена в card_manager, ищем в реестре карт для получения spell_life_time
     if not found_card:
-        found_card = _find_card_by_class_name(class_name, all_cards)
+        found_card = cards.by_class_name(class_name)
 
     return found_card
 
 
-def _find_card_by_class_name(class_name: str, all_cards: List[Card]) -> Optional[Card]:
-    """
-    Вспомогательная функция для поиска карты заклинания по class_name.
-
-    Args:
-        class_name: class_name для поиска
-        all_cards: список всех карт
-
-    Returns:
-        Card если найдена, None иначе
-    """
-    for card in all_cards:
-        if card.class_name == class_name:
-            return card
-    return None
-
-
-def _find_card_by_spell_my_hand_class_name(class_name: str, all_cards: List[Card]) -> Optional[Card]:
-    """
-    Вспомогательная функция для поиска карты заклинания по spell_my_hand_class_name.
-
-    Args:
-        class_name: class_name для поиска
-        all_cards: список всех карт
-
-    Returns:
-        Card если найдена, None иначе
-    """
-    for card in all_cards:
-        if card.spell_my_hand_class_name == class_name:
-            return card
-    return None
-
-
 def process_spell_detections(
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     spell_dict_hand: Dict[str, List[int]],
     spell_dict_our: Dict[str, List[float]],
     spell_dict_enemy: Dict[str, List[float]],
     card_manager: CardManager,
     current_time: float,
-    all_cards: List[Card]
+    cards: CardRegistry
 ) -> float:
     """
     Главная функция обработки заклинаний.
     Координирует все процессы: обновление spell_dict_hand, проверку таймаутов, обработку детекций.
 
     Args:
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
         spell_dict_hand: словарь НАШИХ заклинаний в руке (скользящее окно)
         spell_dict_our: словарь списков таймаутов НАШИХ активных заклинаний
         spell_dict_enemy: словарь списков таймаутов ВРАЖЕСКИХ активных заклинаний
         card_manager: менеджер карт противника
         current_time: текущая временная метка
-        all_cards: список всех карт
+        cards: реестр карт
 
     Returns:
         float: суммарный потраченный эликсир в текущей итерации
@@ -283,7 +247,7 @@ def process_spell_detections(
     cleanup_spell_dict_hand(spell_dict_hand)
 
     # 2. Обновление spell_dict_hand (НАШИ заклинания в руке)
-    update_spell_dict_hand(all_detections, spell_dict_hand, spell_dict_our, current_time, all_cards)
+    update_spell_dict_hand(frame_index, spell_dict_hand, spell_dict_our, current_time, cards)
 
     # 3. Проверка и очистка spell_dict_our (истекшие таймауты НАШИХ заклинаний)
     check_spell_dict_timeout(spell_dict_our, current_time)
@@ -297,15 +261,13 @@ def process_spell_detections(
     # 5.1. Подсчитываем детекции каждого заклинания в текущем кадре
     detected_spells_count: Dict[str, int] = {}
 
-    for detection in all_detections:
-        class_name = detection.get('class_name', '')
-        # Заклинания на поле боя имеют class_name начинающийся с "S" (SC, SE, SL, SR)
-        if class_name and class_name.startswith('S') and len(class_name) > 1:
-            # Проверяем что это действительно заклинание
-            card = _find_card_by_class_name(class_name, all_cards)
-            if card and card.spell:
-                # Увеличиваем счетчик детекций
-                detected_spells_count[class_name] = detected_spells_count.get(class_name, 0) + 1
+    # Заклинания на поле боя имеют категорию "S" (SC, SE, SL, SR)
+    for detection in frame_index.of_category(CATEGORY_FIELD_SPELL):
+        class_name = detection['class_name']
+        # Проверяем что это действительно заклинание (готовый набор class_name заклинаний)
+        if class_name in cards.spell_class_names:
+            # Увеличиваем счетчик детекций
+            detected_spells_count[class_name] = detected_spells_count.get(class_name, 0) + 1
 
     # 5.2. Обрабатываем каждое уникальное заклинание
     for class_name, detected_count in detected_spells_count.items():
@@ -320,7 +282,7 @@ def process_spell_detections(
 
             # Обрабатываем ОДНО новое вражеское заклинание (запуск цикла карт, списание элека)
             # Даже если new_enemy_count > 1 (лаг), обрабатываем как одно (игровая механика)
-            found_card = _process_new_enemy_spell(class_name, card_manager, all_cards)
+            found_card = _process_new_enemy_spell(class_name, card_manager, cards)
 
             # Если карта найдена, списываем элек и добавляем таймауты
             if found_card:
@@ -0,0 +1,122 @@
+"""
+Модуль статической маски интерфейса.
+Области ROI, где никогда нет нужных классов (элементы интерфейса), закрашиваются
+цветом полей letterbox, а полосы маски по краям ROI обрезаются: сеть получает меньше
+пикселей при том же масштабе. Боксы детекций возвращаются в координаты всего кадра.
+"""
+
+import math
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+class StaticMask:
+    """
+    Маска интерфейса ROI.
+
+    Области задаются в долях ширины/высоты ROI (x1, y1, x2, y2). Кадр обрезается
+    до описывающего прямоугольника незакрытой части, закрытые области внутри него
+    закрашиваются. Пиксельная геометрия считается один раз на размер кадра
+    (у сервера инференса кадры разных ботов могут быть разного размера).
+    """
+
+    def __init__(self, rects: Sequence[Tuple[float, float, float, float]], fill: int = 114):
+        """
+        Args:
+            rects: закрываемые области (x1, y1, x2, y2) в долях ROI
+            fill: цвет закраски (как поля letterbox)
+        """
+        self.rects = tuple(tuple(float(v) for v in rect) for rect in rects)
+        self.fill = fill
+
+        # размер кадра (h, w) → (оставляемая часть кадра (x1, y1, x2, y2),
+        #                       закрашиваемые области в координатах обрезанного кадра)
+        self._geometry = {}
+
+    def _prepare(self, frame_hw):
+        """Пиксельная геометрия маски под размер кадра."""
+        frame_hw = tuple(frame_hw)
+        if frame_hw in self._geometry:
+            return self._geometry[frame_hw]
+
+        frame_h, frame_w = frame_hw
+        masked = np.zeros((frame_h, frame_w), dtype=bool)
+        pixel_rects = []
+        for x1, y1, x2, y2 in self.rects:
+            rect = (round(x1 * frame_w), round(y1 * frame_h), round(x2 * frame_w), round(y2 * frame_h))
+            masked[rect[1]:rect[3], rect[0]:rect[2]] = True
+            pixel_rects.append(rect)
+
+        # Описывающий прямоугольник незакрытой части кадра
+        rows = np.flatnonzero((~masked).any(axis=1))
+        cols = np.flatnonzero((~masked).any(axis=0))
+        if rows.size == 0:
+            logger.warning("Статическая маска закрывает весь кадр - маска не применяется")
+            crop = (0, 0, frame_w, frame_h)
+            pixel_rects = []
+        else:
+            crop = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+        cx1, cy1, cx2, cy2 = crop
+        blank = []
+        for x1, y1, x2, y2 in pixel_rects:
+            x1, y1, x2, y2 = max(x1, cx1), max(y1, cy1), min(x2, cx2), min(y2, cy2)
+            if x1 < x2 and y1 < y2:
+                blank.append((x1 - cx1, y1 - cy1, x2 - cx1, y2 - cy1))
+
+        self._geometry[frame_hw] = (crop, blank)
+        logger.info("Статическая маска: кадр %sx%s → %sx%s (%.1f%% пикселей обрезано)",
+                    frame_w, frame_h, cx2 - cx1, cy2 - cy1, self.cropped_fraction(frame_hw) * 100)
+        return crop, blank
+
+    def crop_box(self, frame_hw) -> Tuple[int, int, int, int]:
+        """Оставляемая часть кадра (x1, y1, x2, y2) в пикселях."""
+        return self._prepare(frame_hw)[0]
+
+    def cropped_fraction(self, frame_hw) -> float:
+        """Доля пикселей кадра, отрезанная маской."""
+        x1, y1, x2, y2 = self.crop_box(frame_hw)
+        return 1 - (x2 - x1) * (y2 - y1) / (frame_hw[0] * frame_hw[1])
+
+    def scaled_imgsz(self, imgsz: int, frame_hw, stride: int = 32) -> int:
+        """
+        Размер входа модели для обрезанного кадра с тем же масштабом, что у всего кадра
+        (длинная сторона входа пропорционально меньше, кратно stride).
+        """
+        x1, y1, x2, y2 = self.crop_box(frame_hw)
+        crop_long = max(x2 - x1, y2 - y1)
+        return min(imgsz, math.ceil(imgsz * crop_long / max(frame_hw) / stride) * stride)
+
+    def apply(self, frame: np.ndarray):
+        """
+        Обрезка и закраска кадра.
+
+        Args:
+            frame: кадр BGR (h, w, 3)
+
+        Returns:
+            tuple: (кадр для сети, смещение (x, y) обрезанного кадра в исходном)
+        """
+        (x1, y1, x2, y2), blank = self._prepare(frame.shape[:2])
+        masked = frame[y1:y2, x1:x2]
+        if blank:
+            masked = masked.copy()
+            for bx1, by1, bx2, by2 in blank:
+                masked[by1:by2, bx1:bx2] = self.fill
+        return masked, (x1, y1)
+
+    @staticmethod
+    def restore(boxes: np.ndarray, offset) -> np.ndarray:
+        """Боксы обрезанного кадра → координаты исходного кадра (на месте)."""
+        if offset[0] or offset[1]:
+            boxes[:, [0, 2]] += offset[0]
+            boxes[:, [1, 3]] += offset[1]
+        return boxes
@@ -14,10 +14,28 @@ from typing import List, Tuple, Optional, Dict, Any
 from collections import deque, Counter, defaultdict
 import math
 
-from modules.classes import TimerObject, Card
+import numpy as np
+
+from modules.classes import TimerObject, Card, TIMER_OBJ_CAPACITY
 from modules.card_manager import CardManager
+from modules.frame_index import FrameIndex
+from modules.functions import iou_box_matrix, group_box_lvl
+from modules.tracker import optimal_match
+from modules.class_taxonomy import (
+    SERVICE_CATEGORIES,
+    CATEGORY_TIMER,
+    CATEGORY_LEVEL,
+    CATEGORY_UNIT,
+    CATEGORY_HAND_SPELL,
+)
 from config import get_roi_bounds
 
+# Категории классов, которые попадают в class_name таймера (все кроме "_", "A", "S")
+TIMER_CLASS_CATEGORIES = frozenset({CATEGORY_UNIT, CATEGORY_HAND_SPELL})
+
+# Минимальный скор iou_box (alpha=0.5, sigma=0.5) красного таймера и timer_obj для геометрического сопоставления
+TIMER_MATCH_THRESHOLD = 0.7
+
 
 
 # ==== ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ====
@@ -115,7 +133,11 @@ def cnt_box_timer(timer_obj: List[List[List[int]]]) -> int:
     Подсчитывает количество box_timer (первый элемент timer_screen) в timer_obj.
     Принимает объект timer_obj, состоящий из 6 timer_screen.
     Возвращает число,количество box_timer.
+    Для TimerObject - готовый счетчик окна (O(1)).
     '''
+    if isinstance(timer_obj, TimerObject):
+        return timer_obj.box_timer_count
+
     x = sum(1 for timer_screen in timer_obj if timer_screen[0])
 
     return x
@@ -233,80 +255,6 @@ def boxtimer_to_boxzone(box_timer: Box) -> Box:
 
 
 
-def group_box_lvl(timer_obj: List[List], threshold: int = 3, iou_threshold: float = 0.7) -> int:  # TODO: по умолчанию 3 - правильно
-    """
-    Группирует box_lvl из timer_obj по пересечению их координат (IoU).
-
-    Принимает timer_obj (список из 6 timer_screen).
-    Каждый timer_screen имеет структуру: [[box_timer], [box_zone], [[box_lvl], [box_lvl], ...], [class_name, ...]]
-    Извлекает все box_lvl (timer_screen[2]) из всех timer_screen.
-    Группирует боксы с IoU >= iou_threshold.
-
-    Args:
-        timer_obj: список из 6 timer_screen
-        threshold: минимальное количество боксов в группе для учета (по умолчанию 3)
-        iou_threshold: порог IoU для считания боксов одинаковыми (по умолчанию 0.7)
-
-    Returns:
-        int: количество групп, у которых размер >= threshold
-
-    Пример:
-        timer_obj = [
-            [[box_timer], [box_zone], [[100,200,120,220], [102,198,118,222]], [class_name]],
-            [[box_timer], [box_zone], [[101,201,119,221]], [class_name]],
-            ...
-        ]
-        # Первые два бокса похожи (IoU > 0.7) → группа размера 3
-        # Возвращает: 1 (одна группа с размером >= 3)
-    """
-
-    # 1) Собираем все box_lvl из всех timer_screen
-    all_boxes = []
-    for timer_screen in timer_obj:
-        # timer_screen[2] - это список box_lvl
-        if len(timer_screen) > 2 and timer_screen[2]:
-            box_lvl_list = timer_screen[2]
-            # Добавляем все боксы из этого timer_screen
-            all_boxes.extend(box_lvl_list)
-
-    # Если боксов нет - возвращаем 0
-    if not all_boxes:
-        return 0
-
-    # 2) Группировка боксов по IoU похожести
-    # Используем жадный алгоритм группировки
-    groups = []  # список групп, каждая группа - список боксов
-    used = [False] * len(all_boxes)  # отметки использованных боксов
-
-    for i, box_i in enumerate(all_boxes):
-        if used[i]:
-            continue
-
-        # Создаем новую группу с текущим боксом
-        current_group = [box_i]
-        used[i] = True
-
-        # Ищем все похожие боксы
-        for j, box_j in enumerate(all_boxes):
-            if used[j]:
-                continue
-
-            # Проверяем IoU между box_i и box_j
-            similarity = iou_box(box_i, box_j)
-
-            if similarity >= iou_threshold:
-                current_group.append(box_j)
-                used[j] = True
-
-        groups.append(current_group)
-
-    # 3) Считаем количество групп с размером >= threshold
-    valid_groups_count = sum(1 for group in groups if len(group) >= threshold)
-
-    return valid_groups_count
-
-
-
 # ==== ФУНКЦИИ ДЛЯ РАБОТЫ С timer_obj ====
 
 
@@ -329,7 +277,7 @@ def cleanup_timer_list(timer_list: List[TimerObject]) -> None:
 
 def create_timer_screen(
     box_timer: Box,
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     log_screen: deque
 ) -> Tuple[List, List[str]]:
     """
@@ -340,8 +288,8 @@ def create_timer_screen(
 
     Args:
         box_timer: координаты обнаруженного красного таймера (x1, y1, x2, y2)
-        all_detections: все детекции текущего кадра (список словарей с 'class_name', 'box', 'conf')
-        log_screen: последние 4 кадра для создания list_ignore
+        frame_index: индекс детекций текущего кадра (FrameIndex)
+        log_screen: последние 4 кадра для создания list_ignore (индекс кадра - ключ 'index')
 
     Returns:
         Tuple:
@@ -366,36 +314,24 @@ def create_timer_screen(
     zone_box = [box_zone]
 
     # 3. Ищем все красные уровни (_ lvl red) в box_zone
-    box_lvl_list = []
-    for detection in all_detections:
-        if detection.get('class_name') == '_ lvl red':
-            det_box = detection.get('bbox')
-            # det_box = [int(det_box[0]), int(det_box[1]), int(det_box[2]), int(det_box[3])] # TODO: вернуть после тестирования
-            # print(f"det_box: {det_box}; box_zone: {box_zone}") # TODO: удалить после тестирования
-            if det_box and _is_box_in_zone(det_box, box_zone):
-                box_lvl_list.append(det_box)
+    box_lvl_list = [detection['bbox'] for detection in frame_index.intersecting(box_zone, (CATEGORY_LEVEL,))]
 
     # 4. Ищем все class_name персонажей в box_zone
-    class_name_list = []
-    for detection in all_detections:
-        class_name = detection.get('class_name')
-        # Исключаем служебные классы (начинающиеся с "_")
-        if class_name and not class_name.startswith('_') and not class_name.startswith('A') and not class_name.startswith('S'):
-            det_box = detection.get('bbox')
-            if det_box and _is_box_in_zone(det_box, box_zone):
-                class_name_list.append(class_name)
+    # Исключаем служебные классы ("_"), абилки ("A") и заклинания на поле ("S")
+    class_name_list = [
+        detection['class_name'] for detection in frame_index.intersecting(box_zone, TIMER_CLASS_CATEGORIES)
+        if detection.get('class_name')
+    ]
 
     # 5. Создаем list_ignore из log_screen (последние 4 кадра)
     list_ignore = []
     for frame in log_screen:
-        frame_detections = frame.get('detections', [])
-        for detection in frame_detections:
+        index = frame.get('index') or FrameIndex(frame.get('detections', []))
+        categories = [category for category in index.categories if category not in SERVICE_CATEGORIES]
+        for detection in index.intersecting(box_zone, categories):
             class_name = detection.get('class_name')
-            if class_name and not class_name.startswith('_'):
-                det_box = detection.get('bbox')
-                if det_box and _is_box_in_zone(det_box, box_zone):
-                    if class_name not in list_ignore:
-                        list_ignore.append(class_name)
+            if class_name and class_name not in list_ignore:
+                list_ignore.append(class_name)
 
     # 6. Формируем timer_screen
     timer_screen = [timer_box, zone_box, box_lvl_list, class_name_list]
@@ -405,30 +341,6 @@ def create_timer_screen(
     return timer_screen, list_ignore
 
 
-def _is_box_in_zone(box: Box, zone: Box) -> bool:
-    """
-    Проверяет, есть ли пересечение между боксом и зоной.
-
-    Args:
-        box: координаты проверяемого бокса (x1, y1, x2, y2)
-        zone: координаты зоны (x1, y1, x2, y2)
-
-    Returns:
-        True если боксы пересекаются, иначе False
-    """
-    bx1, by1, bx2, by2 = box
-    zx1, zy1, zx2, zy2 = zone
-
-    # Проверка на пересечение прямоугольников
-    if bx2 < zx1 or bx1 > zx2:
-        return False
-
-    if by2 < zy1 or by1 > zy2:
-        return False
-
-    return True
-
-
 def find_timer_obj(
     timer_list: List[TimerObject],
     timer_screen: List,
@@ -457,26 +369,46 @@ def find_timer_obj(
     if not new_box_timer:
         return None
 
-    for timer_obj in timer_list:
-        # Ищем первый непустой timer_screen в timer_obj (идем сверху вниз)
-        search_box_timer = None
-        for ts in timer_obj:
-            if ts and ts[0]:  # timer_screen не пуст и box_timer есть
-                search_box_timer = ts[0][0]
-                break
-
-        if not search_box_timer:
-            continue
+    # Скоры нового box_timer против всех timer_obj одним вызовом NumPy, первый по порядку выше порога
+    scores = timer_match_scores([new_box_timer], timer_list)[0]
+    for timer_obj, score in zip(timer_list, scores):
+        if score >= iou_threshold:
+            return timer_obj
 
-        # Сравниваем box_timer через iou_box
-        iou_value = iou_box(search_box_timer, new_box_timer, alpha=0.5, sigma=0.5)
+    return None
 
-        if iou_value >= iou_threshold:
-            return timer_obj
 
+def first_box_timer(timer_obj: TimerObject) -> Optional[Box]:
+    """Первый непустой box_timer в timer_obj (идем от нового timer_screen к старому), None если нет."""
+    for ts in timer_obj:
+        if ts and ts[0]:  # timer_screen не пуст и box_timer есть
+            return ts[0][0]
     return None
 
 
+def timer_match_scores(new_boxes: List[Box], timer_list: List[TimerObject]) -> np.ndarray:
+    """
+    Матрица скоров сопоставления красных таймеров кадра с timer_obj.
+
+    Args:
+        new_boxes: box_timer красных таймеров кадра
+        timer_list: timer_obj
+
+    Returns:
+        np.ndarray: (len(new_boxes), len(timer_list)) композитный скор iou_box (alpha=0.5, sigma=0.5)
+                    с первым непустым box_timer каждого timer_obj; -1 для timer_obj без box_timer
+    """
+    known = [first_box_timer(timer_obj) for timer_obj in timer_list]
+    has_box = np.array([box is not None for box in known], dtype=bool)
+
+    scores = np.full((len(new_boxes), len(timer_list)), -1.0)
+    if len(new_boxes) and has_box.any():
+        scores[:, has_box] = iou_box_matrix(
+            new_boxes, [box for box in known if box is not None], alpha=0.5, sigma=0.5
+        )
+    return scores
+
+
 def create_timer_obj(
     timer_screen: List,
     timestamp: float,
@@ -499,18 +431,17 @@ def create_timer_obj(
         - Заполняем атрибуты: time_first_screen, time_last_screen, list_ignore
         - status устанавливается по умолчанию в "active" (из dataclass)
     """
-    # Создаем 5 пустых timer_screen
-    empty_screens = [[[], [], [], []] for _ in range(5)]
-
-    # Формируем timer_obj: [timer_screen] + 5 пустых
-    timer_obj_data = [timer_screen] + empty_screens
-
     # Создаем TimerObject с атрибутами
-    timer_obj = TimerObject()
-    timer_obj.extend(timer_obj_data)  # Заполняем данными как список
-    timer_obj.time_first_screen = timestamp
-    timer_obj.time_last_screen = timestamp
-    timer_obj.list_ignore = list_ignore if list_ignore else []
+    timer_obj = TimerObject(
+        time_first_screen=timestamp,
+        time_last_screen=timestamp,
+        list_ignore=list_ignore if list_ignore else []
+    )
+
+    # Формируем timer_obj: [timer_screen] + 5 пустых (пустые добавляются первыми - они старше)
+    for _ in range(TIMER_OBJ_CAPACITY - 1):
+        timer_obj.add_first_screen([[], [], [], []])
+    timer_obj.add_first_screen(timer_screen)
 
     return timer_obj
 
@@ -530,15 +461,15 @@ def update_timer_obj(
 
     Логика:
         - Вставляем timer_screen на первую позицию (метод add_first_screen)
-        - Обновляем last_screen
+        - Обновляем time_last_screen
     """
     timer_obj.add_first_screen(timer_screen)
-    timer_obj.last_screen = timestamp
+    timer_obj.time_last_screen = timestamp
 
 
 def add_empty_timer_screen( # TODO: переписать, реализовать подсчет _lvl_red и class_name
     timer_obj: TimerObject,
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     timestamp: float
 ) -> None:
     """
@@ -547,7 +478,7 @@ def add_empty_timer_screen( # TODO: переписать, реализовать
 
     Args:
         timer_obj: timer_obj с 5 элементами
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
         timestamp: временная метка
 
     Логика:
@@ -574,20 +505,11 @@ def add_empty_timer_screen( # TODO: переписать, реализовать
 
     # Ищем красные уровни в box_zone
     box_lvl_list = []
-    # for detection in all_detections:
-    #     if detection.get('class_name') == '_ lvl red':
-    #         det_box = detection.get('bbox')
-    #         if det_box and _is_box_in_zone(det_box, box_zone):
-    #             box_lvl_list.append(det_box)
+    # box_lvl_list = [detection['bbox'] for detection in frame_index.intersecting(box_zone, (CATEGORY_LEVEL,))]
 
     # Ищем class_name в box_zone
     class_name_list = []
-    # for detection in all_detections:
-    #     class_name = detection.get('class_name')
-    #     if class_name and not class_name.startswith('_'):
-    #         det_box = detection.get('bbox')
-    #         if det_box and _is_box_in_zone(det_box, box_zone):
-    #             class_name_list.append(class_name)
+    # class_name_list = [detection['class_name'] for detection in frame_index.intersecting(box_zone, TIMER_CLASS_CATEGORIES)]
 
     # Создаем timer_screen: box_timer пуст, box_zone есть, box_lvl и class_name найдены
     timer_screen = [[], [box_zone], box_lvl_list, class_name_list]
@@ -620,7 +542,7 @@ def check_timer_conditions(
         Усл.2 - подсчет и группировка box_lvl (group_box_lvl)
             Ищем группы красных уровней с подтверждением >= 3
 
-        Усл.3 - подсчет и группировка class_name (group_class_name)
+        Усл.3 - группировка class_name (окно голосов timer_obj.class_votes, как group_class_name)
             Ищем class_name с подтверждением >= 3
             Если class_name == "_ bomb" → устанавливаем status="bomb", возвращаем None
 
@@ -651,13 +573,9 @@ def check_timer_conditions(
     # print(f"lvl_groups_count: {lvl_groups_count}") # TODO: удалить после тестирования
 
     # Усл.3: Подсчет и группировка class_name
-    # Извлекаем все class_name из timer_obj
-    all_class_names = []
-    for timer_screen in timer_obj:
-        if len(timer_screen) > 3 and timer_screen[3]:
-            all_class_names.append(timer_screen[3])
-
-    grouped_class_names = group_class_name(all_class_names, threshold=1)  # TODO: вернуть threshold=3
+    # Группы class_name ведет окно голосов TimerObject (обновляется при сдвиге окна),
+    # результат совпадает с group_class_name по всем timer_screen
+    grouped_class_names = timer_obj.class_votes.groups(threshold=1)  # TODO: вернуть threshold=3
     # print(f"grouped_class_names: {grouped_class_names}") # TODO: удалить после тестирования
 
     # Проверка на "_bomb" (бомбы игнорируем)
@@ -756,7 +674,7 @@ def process_timer_detections(
     log_screen: deque,
     timer_list: List[TimerObject],
     card_manager: CardManager,
-    all_detections: List[Dict[str, Any]],
+    frame_index: FrameIndex,
     timestamp: float,
     evolution_dict_timer: Dict[float, str] | None = None
 ) -> float:
@@ -769,7 +687,7 @@ def process_timer_detections(
         log_screen: последние 4 кадра с детекциями
         timer_list: глобальный список timer_obj (модифицируется)
         card_manager: менеджер карт противника
-        all_detections: все детекции текущего кадра
+        frame_index: индекс детекций текущего кадра (FrameIndex)
         timestamp: временная метка текущего кадра
         evolution_dict_timer: словарь таймеров маркеров эволюции (опционально)
 
@@ -779,7 +697,7 @@ def process_timer_detections(
     Последовательность:
         1. Обработка новых красных таймеров:
             - Создание timer_screen для каждого _ timer red
-            - Поиск совпадений в timer_obj из timer_list
+            - Поиск timer_obj по track_id таймера, иначе оптимальное геометрическое сопоставление (optimal_match)
             - Создание новых (status="active") или обновление существующих timer_obj
         2. Добавление пустых timer_screen (для timer_obj с len < 6)
         3. Проверка условий и обработка подтвержденных таймеров:
@@ -796,40 +714,59 @@ def process_timer_detections(
     # cleanup_timer_list(timer_list) # TODO: лишнее удаление, так как в handler_processor.py уже есть очистка
 
     # 2. Обработка новых красных таймеров
-    red_timers = []
-    for detection in all_detections:
-        if detection.get('class_name') == '_ timer red':
-            box = detection.get('bbox')
-            if box:
-                red_timers.append(box)
+    red_timers = [
+        (detection['bbox'], detection.get('track_id'))
+        for detection in frame_index.of_category(CATEGORY_TIMER) if detection.get('bbox')
+    ]
+
+    # Индекс timer_obj по track_id (поиск за O(1) вместо геометрического перебора)
+    timer_by_track = {timer_obj.track_id: timer_obj for timer_obj in timer_list if timer_obj.track_id is not None}
+    live_tracks = {track_id for _, track_id in red_timers if track_id is not None}
+
+    # Геометрическое сопоставление (трек мог пересоздаться): красные таймеры без timer_obj по track_id
+    # ↔ timer_obj, чей трек не виден на этом кадре. Один-к-одному с максимумом суммы скоров:
+    # два близких розыгрыша не перехватывают timer_obj друг у друга
+    unmatched_rows = [row for row, (_, track_id) in enumerate(red_timers) if track_id not in timer_by_track]
+    candidates = [timer_obj for timer_obj in timer_list if timer_obj.track_id not in live_tracks]
+    match_scores = timer_match_scores([red_timers[row][0] for row in unmatched_rows], candidates)
+    rows, cols = optimal_match(match_scores, TIMER_MATCH_THRESHOLD)
+    geometric_match = {unmatched_rows[row]: candidates[col] for row, col in zip(rows, cols)}
 
     # Для каждого красного таймера создаем или обновляем timer_obj
-    for box_timer in red_timers:
+    for row, (box_timer, track_id) in enumerate(red_timers):
         # Создаем timer_screen
-        timer_screen, list_ignore = create_timer_screen(box_timer, all_detections, log_screen)
+        timer_screen, list_ignore = create_timer_screen(box_timer, frame_index, log_screen)
 
-        # Ищем существующий timer_obj
-        current_timer = find_timer_obj(timer_list, timer_screen, iou_threshold=0.7)
+        # Существующий timer_obj: сначала по track_id, затем по геометрическому сопоставлению
+        current_timer = timer_by_track.get(track_id) if track_id is not None else None
+        if current_timer is None:
+            current_timer = geometric_match.get(row)
 
         if current_timer:
             # Обновляем существующий timer_obj
             update_timer_obj(current_timer, timer_screen, timestamp)
         else:
             # Создаем новый timer_obj
-            new_timer_obj = create_timer_obj(timer_screen, timestamp, list_ignore)
-            timer_list.append(new_timer_obj)
+            current_timer = create_timer_obj(timer_screen, timestamp, list_ignore)
+            timer_list.append(current_timer)
+
+        # Привязываем timer_obj к актуальному track_id
+        if track_id is not None and current_timer.track_id != track_id:
+            timer_by_track.pop(current_timer.track_id, None)
+            current_timer.track_id = track_id
+            timer_by_track[track_id] = current_timer
 
     # 3. Добавление пустого timer_screen (когда в timer_obj меньше 6 элементов)
     for timer_obj in timer_list:
-        if len(timer_obj) < 6:
-            add_empty_timer_screen(timer_obj, all_detections, timestamp)
+        if len(timer_obj) < TIMER_OBJ_CAPACITY:
+            add_empty_timer_screen(timer_obj, frame_index, timestamp)
 
     # 4. Проверка условий и обработка подтвержденных таймеров
     elixir_spent_total = [0.0]  # Используем список для mutable объекта
 
     for timer_obj in timer_list:
         # Проверяем только timer_obj с 6 элементами
-        if len(timer_obj) != 6:
+        if len(timer_obj) != TIMER_OBJ_CAPACITY:
             continue
 
         # Пропускаем timer_obj если status != "active"
@@ -849,13 +786,7 @@ def process_timer_detections(
     # 5. Удаление timer_obj (ЕДИНСТВЕННОЕ место удаления!)
     # Удаляем ТОЛЬКО когда cnt_box_timer == 0 (таймер исчез с экрана на 1.5+ сек)
     # Независимо от статуса (active, done, bomb, bad, error_1)
-    timers_to_remove = []
-    for timer_obj in timer_list:
-        timer_count = cnt_box_timer(timer_obj)
-        if timer_count == 0:
-            timers_to_remove.append(timer_obj)
-
-    for timer_obj in timers_to_remove:
-        timer_list.remove(timer_obj)
+    # Отбор по счетчику окна (O(1) на timer_obj) и по объекту, а не по равенству полей
+    timer_list[:] = [timer_obj for timer_obj in timer_list if cnt_box_timer(timer_obj) > 0]
 
     return elixir_spent_total[0]
@@ -0,0 +1,271 @@
+"""
+Модуль трекинга детекций между кадрами (в стиле ByteTrack).
+Присваивает каждой детекции постоянный track_id, чтобы процессоры хранили состояние по ID,
+а не искали объект геометрически на каждом кадре.
+"""
+
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import Tuple
+
+import numpy as np
+
+from modules.detection_postprocess import DetectionArrays, iou_matrix
+
+
+def greedy_match(scores: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Жадное сопоставление один-к-одному по матрице скоров (лучшие пары первыми).
+
+    Args:
+        scores: (N, M) матрица скоров (например IoU)
+        threshold: минимальный скор пары
+
+    Returns:
+        tuple: (rows, cols) - индексы сопоставленных строк и столбцов
+    """
+    rows, cols = np.nonzero(scores >= threshold)
+    if rows.size == 0:
+        return rows, cols
+
+    # Кандидаты по убыванию скора, берем пару если строка и столбец еще свободны
+    order = np.argsort(-scores[rows, cols], kind='stable')
+    used_rows = np.zeros(scores.shape[0], dtype=bool)
+    used_cols = np.zeros(scores.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+    for k in order:
+        r, c = rows[k], cols[k]
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        matched_rows.append(r)
+        matched_cols.append(c)
+
+    return np.asarray(matched_rows, dtype=np.int64), np.asarray(matched_cols, dtype=np.int64)
+
+
+def _min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Венгерский алгоритм (кратчайшие увеличивающие пути, потенциалы строк/столбцов), N <= M.
+    Внутренний цикл по столбцам векторизован: O(N² · M) операций NumPy на строку меньше.
+
+    Args:
+        cost: (N, M) матрица стоимостей, N <= M
+
+    Returns:
+        np.ndarray: (N,) столбец, назначенный каждой строке (минимальная сумма стоимостей)
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)  # столбец → строка (1..n), 0 - свободен; столбец 0 - фиктивный
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        col = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current = owner[col]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = col
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+
+            col = next_col
+            if owner[col] == 0:
+                break
+
+        # Разворот увеличивающего пути
+        while col:
+            previous = way[col]
+            owner[col] = owner[previous]
+            col = previous
+
+    assignment = np.empty(n, dtype=np.int64)
+    assigned = np.nonzero(owner[1:])[0]
+    assignment[owner[1:][assigned] - 1] = assigned
+    return assignment
+
+
+def optimal_match(scores: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Оптимальное сопоставление один-к-одному по матрице скоров (максимум суммы скоров пар).
+
+    Пары ниже порога не сопоставляются (гейтинг): их стоимость равна стоимости "без пары",
+    поэтому они не вытесняют допустимые пары и отбрасываются после назначения.
+    В отличие от greedy_match близкие объекты не "перехватывают" пары друг у друга.
+
+    Args:
+        scores: (N, M) матрица скоров (например IoU)
+        threshold: минимальный скор пары
+
+    Returns:
+        tuple: (rows, cols) - индексы сопоставленных строк и столбцов (по возрастанию rows)
+    """
+    allowed = scores >= threshold
+    if not allowed.any():
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    # Только строки и столбцы, у которых есть хоть одна допустимая пара
+    row_index = np.nonzero(allowed.any(axis=1))[0]
+    col_index = np.nonzero(allowed.any(axis=0))[0]
+    sub_allowed = allowed[np.ix_(row_index, col_index)]
+    cost = np.where(sub_allowed, -scores[np.ix_(row_index, col_index)], 0.0)
+
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost, sub_allowed = cost.T, sub_allowed.T
+    assignment = _min_cost_assignment(cost)
+    rows = np.arange(cost.shape[0])
+    keep = sub_allowed[rows, assignment]
+    rows, cols = rows[keep], assignment[keep]
+    if transposed:
+        rows, cols = cols, rows
+
+    order = np.argsort(rows)
+    return row_index[rows[order]], col_index[cols[order]]
+
+
+class ByteTracker:
+    """
+    Трекер детекций по IoU с двухэтапным сопоставлением (ByteTrack).
+
+    Состояние треков хранится колонками NumPy:
+        boxes (T, 4), class_ids (T,), track_ids (T,), lost (T,) - сколько кадров трек не подтвержден
+
+    Сопоставление на каждом кадре:
+        1. Детекции с высокой уверенностью ↔ все треки (IoU >= match_iou)
+        2. Детекции с низкой уверенностью ↔ оставшиеся треки (IoU >= low_match_iou)
+        3. Несопоставленные детекции → новые треки
+        4. Несопоставленные треки → lost += 1, удаляются после max_lost кадров
+    Пары разных классов не сопоставляются.
+    """
+
+    def __init__(
+        self,
+        high_confidence: float = 0.6,
+        match_iou: float = 0.3,
+        low_match_iou: float = 0.2,
+        max_lost: int = 6
+    ):
+        """
+        Args:
+            high_confidence: граница "высокой" уверенности детекции (первый этап)
+            match_iou: минимальный IoU пары трек-детекция на первом этапе
+            low_match_iou: минимальный IoU на втором этапе (детекции с низкой уверенностью)
+            max_lost: сколько кадров трек живет без подтверждения
+        """
+        self.high_confidence = high_confidence
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.max_lost = max_lost
+        self.reset()
+
+    def reset(self) -> None:
+        """Сброс всех треков (новый бой)."""
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.class_ids = np.zeros((0,), dtype=np.int64)
+        self.track_ids = np.zeros((0,), dtype=np.int64)
+        self.lost = np.zeros((0,), dtype=np.int64)
+        self.next_id = 1
+
+    def __len__(self) -> int:
+        return int(self.track_ids.shape[0])
+
+    def remap_classes(self, mapping: np.ndarray) -> None:
+        """
+        Перенумерация классов треков после замены модели.
+
+        Args:
+            mapping: (C_old,) int64 - новый class_id для каждого старого (-1 - класса нет, трек удаляется)
+        """
+        class_ids = mapping[self.class_ids]
+        alive = class_ids >= 0
+        self.boxes = self.boxes[alive]
+        self.class_ids = class_ids[alive]
+        self.track_ids = self.track_ids[alive]
+        self.lost = self.lost[alive]
+
+    def _match(self, detections: DetectionArrays, det_index: np.ndarray, track_index: np.ndarray, threshold: float):
+        """Сопоставление подмножества детекций с подмножеством треков (IoU + один класс)."""
+        if det_index.size == 0 or track_index.size == 0:
+            empty = np.zeros((0,), dtype=np.int64)
+            return empty, empty
+
+        ious = iou_matrix(detections.boxes[det_index], self.boxes[track_index])
+        ious[detections.class_ids[det_index][:, None] != self.class_ids[track_index][None, :]] = 0.0
+        rows, cols = greedy_match(ious, threshold)
+        return det_index[rows], track_index[cols]
+
+    def update(self, detections: DetectionArrays) -> np.ndarray:
+        """
+        Обновляет треки детекциями нового кадра.
+
+        Args:
+            detections: детекции кадра (после постобработки)
+
+        Returns:
+            np.ndarray: (N,) int64 - track_id для каждой детекции (в порядке detections)
+        """
+        count = len(detections)
+        result = np.full(count, -1, dtype=np.int64)
+        matched_tracks = np.zeros(len(self), dtype=bool)
+
+        high = detections.scores >= self.high_confidence
+        all_tracks = np.arange(len(self))
+
+        # 1. Высокая уверенность ↔ все треки
+        det_a, trk_a = self._match(detections, np.flatnonzero(high), all_tracks, self.match_iou)
+        result[det_a] = self.track_ids[trk_a]
+        matched_tracks[trk_a] = True
+
+        # 2. Низкая уверенность ↔ оставшиеся треки
+        det_b, trk_b = self._match(detections, np.flatnonzero(~high), np.flatnonzero(~matched_tracks), self.low_match_iou)
+        result[det_b] = self.track_ids[trk_b]
+        matched_tracks[trk_b] = True
+
+        # Обновляем подтвержденные треки
+        det_matched = np.concatenate([det_a, det_b])
+        trk_matched = np.concatenate([trk_a, trk_b])
+        self.boxes[trk_matched] = detections.boxes[det_matched]
+        self.lost[trk_matched] = 0
+
+        # 4. Неподтвержденные треки стареют и удаляются
+        self.lost[~matched_tracks] += 1
+        alive = self.lost <= self.max_lost
+        self.boxes = self.boxes[alive]
+        self.class_ids = self.class_ids[alive]
+        self.track_ids = self.track_ids[alive]
+        self.lost = self.lost[alive]
+
+        # 3. Несопоставленные детекции → новые треки
+        new = np.flatnonzero(result < 0)
+        if new.size:
+            new_ids = np.arange(self.next_id, self.next_id + new.size, dtype=np.int64)
+            self.next_id += int(new.size)
+            result[new] = new_ids
+
+            self.boxes = np.concatenate([self.boxes, detections.boxes[new]])
+            self.class_ids = np.concatenate([self.class_ids, detections.class_ids[new]])
+            self.track_ids = np.concatenate([self.track_ids, new_ids])
+            self.lost = np.concatenate([self.lost, np.zeros(new.size, dtype=np.int64)])
+
+        return result
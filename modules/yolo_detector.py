@@ -5,7 +5,11 @@
 """
 
 import os
+import json
+import time
+import socket
 import logging
+import threading
 
 # Настраиваем логгер модуля
 logger = logging.getLogger(__name__)
@@ -13,18 +17,186 @@ logger.setLevel(logging.INFO)
 logger.info("Загружен модуль: %s", __name__)
 
 from ultralytics import YOLO  # type: ignore # Библиотека Ultralytics для работы с YOLO моделями
+import torch  # type: ignore # PyTorch (количество потоков CPU)
 import cv2  # OpenCV для работы с изображениями
+import numpy as np  # NumPy для колоночных массивов детекций
+from dataclasses import dataclass
+from typing import Optional
+
+from modules.class_taxonomy import (
+    ClassTaxonomy,  # Таблица категорий классов
+    check_class_compatibility,  # Проверка классов новой модели при горячей замене
+    CATEGORY_TIMER,  # Категория красного таймера (новые таймеры уточняются в каскаде)
+    CATEGORY_HAND_SPELL,  # Категория заклинаний в НАШЕЙ руке (классификатор слотов)
+)
+from modules.card_registry import card_registry  # Реестр карт для связи классов с картами
+from modules.detection_postprocess import (
+    DetectionArrays,  # Колоночный формат детекций
+    load_class_thresholds,  # Чтение файла калибровки порогов
+    build_class_thresholds,  # Таблица порогов по class_id
+    filter_by_class_confidence,  # Векторный фильтр по порогам классов
+    NmsGroups,  # Таблицы групп классов для подавления дублей
+    build_nms_groups,  # Построение групп классов для подавления дублей
+    suppress_duplicates,  # Векторное подавление дублей по группам классов
+)
+from modules.yolo_direct import DirectYoloRunner, letterbox_geometry  # Прямой инференс сети без model.predict()
+from modules.cascade import (  # Каскад моделей
+    build_crop_regions, new_object_mask, merge_region_detections, full_scale_side, crop_input_scale
+)
+from modules.change_detector import ChangeDetector  # Изменившиеся области кадра
+from modules.hand_classifier import HandSlotClassifier, load_card_templates  # Классификатор слотов руки
+from modules.keyframe_tracker import KeyframePropagator  # Перенос детекций между ключевыми кадрами
+from modules.imgsz_controller import ImgszController  # Размер входа модели по бюджету времени
+from modules.static_mask import StaticMask  # Статическая маска интерфейса
+from modules.tracker import ByteTracker  # Трекер детекций (track_id)
+from modules.detection_cache import DetectionCache, file_hash  # Дисковый кэш детекций
 
 from config import (
     MODEL_PATH,  # Путь к обученной модели
+    MODEL_HOT_SWAP,  # Горячая замена модели при изменении файла
+    MODEL_WATCH_INTERVAL,  # Интервал проверки файла модели (сек)
     YOLO_CONFIDENCE,  # Порог уверенности для фильтрации детекций
     YOLO_IMG_SIZE,  # Размер изображения для YOLO
     YOLO_IOU, # Минимальный порог IoU для фильтрации задвоенных детекций
+    YOLO_BACKEND,  # Способ инференса ("direct" / "predict")
+    YOLO_COMPILE_MODE,  # Режим исполнения сети (None / "torchscript" / "compile")
+    YOLO_COMPILE_DIR,  # Папка артефактов компиляции сети
+    YOLO_DYNAMIC_IMGSZ,  # Размер входа модели по бюджету времени кадра
+    YOLO_IMG_SIZES,  # Прогреваемые размеры входа
+    YOLO_LATENCY_BUDGET_MS,  # Бюджет времени инференса кадра (мс)
+    YOLO_IMGSZ_DOWN_RATIO,  # Доля бюджета для уменьшения размера
+    YOLO_IMGSZ_UP_RATIO,  # Доля бюджета для увеличения размера
+    YOLO_IMGSZ_HOLD_FRAMES,  # Минимум кадров на размере перед увеличением
+    YOLO_STATIC_MASK,  # Области интерфейса без нужных классов
+    YOLO_WARMUP_RUNS,  # Количество прогревочных прогонов модели
+    YOLO_THREAD_BENCH_RUNS,  # Количество замеров на каждый вариант потоков
+    YOLO_THREAD_CANDIDATES,  # Варианты количества потоков CPU
+    YOLO_THREADS_CONFIG_PATH,  # Файл сохраненного выбора потоков по хостам
+    YOLO_CLASS_CONFIDENCE,  # Пороги уверенности для отдельных классов
+    YOLO_CLASS_CONFIDENCE_PATH,  # Файл калибровки порогов по классам
+    YOLO_NMS_ENABLED,  # Включение подавления дублей по группам классов
+    YOLO_NMS_GROUPS,  # Группы классов и их пороги IoU
+    CASCADE_ENABLED,  # Включение каскада моделей
+    CASCADE_FAST_MODEL_PATH,  # Путь к быстрой модели каскада
+    CASCADE_UNCERTAIN_BAND,  # Полоса неуверенности быстрой модели
+    CASCADE_NEW_TIMER_IOU,  # Порог IoU нового красного таймера
+    CASCADE_CROP_SIZE,  # Размер входа большой модели для областей
+    CASCADE_CROP_PADDING,  # Контекст вокруг бокса области
+    CASCADE_CROP_MIN_SIDE,  # Минимальная сторона области
+    CASCADE_MAX_CROPS,  # Максимум областей на кадр
+    MOTION_MASK_ENABLED,  # Инференс только по изменившимся областям кадра
+    MOTION_BLOCK_SIZE,  # Размер блока сетки разности кадров
+    MOTION_THRESHOLD,  # Порог разности яркости блока
+    MOTION_MAX_REGIONS,  # Максимум областей изменений на кадр
+    MOTION_MAX_AREA,  # Доля изменившейся площади для полного кадра
+    MOTION_REFRESH_INTERVAL,  # Период инференса всего кадра
+    KEYFRAME_ENABLED,  # Модель только на ключевых кадрах, между ними - оптический поток
+    KEYFRAME_INTERVAL,  # Максимальный интервал ключевых кадров
+    KEYFRAME_ON_CHANGE,  # Внеочередные ключевые кадры по изменениям сцены
+    KEYFRAME_CONFIDENCE_DECAY,  # Затухание уверенности перенесенного бокса
+    KEYFRAME_FLOW_SCALE,  # Масштаб кадра для оптического потока
+    KEYFRAME_FLOW_GRID,  # Сетка точек потока в боксе
+    KEYFRAME_MIN_POINTS,  # Минимум отслеженных точек бокса
+    HAND_CLASSIFIER_ENABLED,  # Заклинания в руке - классификатор слотов вместо модели
+    HAND_SLOT_BOXES,  # Слоты руки (доли ROI)
+    HAND_CLASSIFIER_THRESHOLD,  # Минимальная корреляция с картинкой карты
+    TRACKER_ENABLED,  # Включение трекинга детекций
+    TRACKER_HIGH_CONFIDENCE,  # Граница высокой уверенности для трекера
+    TRACKER_MATCH_IOU,  # Порог IoU сопоставления трекера (первый этап)
+    TRACKER_LOW_MATCH_IOU,  # Порог IoU сопоставления трекера (второй этап)
+    TRACKER_MAX_LOST,  # Время жизни трека без подтверждения (кадры)
+    DETECTION_CACHE_DIR,  # Папка дискового кэша детекций (None - выключен)
+    DETECTION_CACHE_MAX_MB,  # Максимальный размер кэша детекций
     SELECTION_COLOR,  # Цвет рамки при выборе области экрана (BGR формат для OpenCV)
     SELECTION_THICKNESS  # Толщина линии рамки при выборе области
 )
 
 
+def _thread_candidates():
+    """Варианты количества потоков CPU для замера (из конфига или от числа ядер)."""
+    if YOLO_THREAD_CANDIDATES:
+        return sorted(set(int(n) for n in YOLO_THREAD_CANDIDATES if n > 0))
+
+    cpu = os.cpu_count() or 1
+    return sorted(n for n in {1, 2, 4, cpu // 2, cpu - 1, cpu} if 0 < n <= cpu)
+
+
+def _load_thread_config(path):
+    """Сохраненный выбор потоков {hostname: threads} (пустой словарь если файла нет)."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Не удалось прочитать файл потоков %s: %s", path, e)
+        return {}
+
+
+def _save_thread_config(path, data):
+    """Сохраняет выбор потоков {hostname: threads}."""
+    if not path:
+        return
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning("Не удалось сохранить файл потоков %s: %s", path, e)
+
+
+@dataclass
+class _ModelRuntime:
+    """
+    Все, что зависит от файла модели. При горячей замене модели заменяется целиком
+    одним присваиванием между кадрами.
+    """
+    model_path: str
+    mtime: float  # время изменения файла модели на момент загрузки
+    model: object  # ultralytics.YOLO
+    model_hash: Optional[str]
+    class_names: dict
+    taxonomy: ClassTaxonomy
+    class_thresholds: np.ndarray
+    predict_confidence: float
+    nms_groups: Optional[NmsGroups]
+    runner: Optional[DirectYoloRunner]
+    crop_runner: Optional[DirectYoloRunner] = None  # Прямой инференс на областях каскада (CASCADE_CROP_SIZE)
+    size_runners: Optional[dict] = None  # Прямой инференс для остальных размеров входа {imgsz: runner} (создается при прогреве)
+    generation: int = 0  # поколение модели: swap_count детектора, при котором модель стала текущей
+
+
+def _runtime_field(name, default=None):
+    """
+    Свойство детектора - поле текущей модели (default - модель не загружена).
+    Запись меняет поле текущей модели (инструменты переопределяют, например, predict_confidence).
+    """
+    def getter(self):
+        runtime = self.runtime
+        return getattr(runtime, name) if runtime is not None else default
+
+    def setter(self, value):
+        if self.runtime is None:
+            raise AttributeError(f"{name}: модель не загружена")
+        setattr(self.runtime, name, value)
+    return property(getter, setter)
+
+
+def _result_to_arrays(result):
+    """Результат model.predict() для одного кадра → DetectionArrays."""
+    boxes = result.boxes
+
+    # Если детекций нет, возвращаем пустые массивы
+    if boxes is None or len(boxes) == 0:
+        return DetectionArrays.empty()
+
+    # Забираем все детекции одним переносом tensor → numpy
+    return DetectionArrays(
+        boxes.xyxy.cpu().numpy().astype(np.float32),
+        boxes.conf.cpu().numpy().astype(np.float32),
+        boxes.cls.cpu().numpy().astype(np.int64),
+    )
+
+
 class YoloDetector:
     """
     Класс для детекции карт Clash Royale с помощью YOLO11
@@ -32,10 +204,21 @@ class YoloDetector:
     Функционал:
     1. Загрузка обученной модели YOLO
     2. Обработка кадров и получение детекций
-    3. Фильтрация детекций по уровню уверенности
+    3. Фильтрация детекций по порогам уверенности классов
     4. Возврат информации об обнаруженных объектах
+    5. Горячая замена модели без перезапуска (request_model_swap, poll_model_file)
     """
 
+    # Поля текущей модели (self.runtime)
+    model = _runtime_field('model')  # Модель YOLO
+    model_hash = _runtime_field('model_hash')  # Хэш файла модели (ключ кэша детекций)
+    class_names = _runtime_field('class_names')  # Названия классов (карт) из модели
+    taxonomy = _runtime_field('taxonomy')  # Таблица категорий классов
+    class_thresholds = _runtime_field('class_thresholds')  # Пороги уверенности по class_id
+    predict_confidence = _runtime_field('predict_confidence', YOLO_CONFIDENCE)  # Порог для самой модели
+    nms_groups = _runtime_field('nms_groups')  # Группы классов для подавления дублей
+    runner = _runtime_field('runner')  # Прямой инференс сети (None - используется model.predict)
+
     def __init__(self, model_path=MODEL_PATH):
         """
         Инициализация детектора
@@ -44,13 +227,73 @@ class YoloDetector:
             model_path (str): Путь к файлу модели YOLO (.pt файл)
         """
         self.model_path = model_path  # Сохраняем путь к модели
-        self.model = None  # Модель YOLO (загружается при вызове load_model)
-        self.class_names = None  # Названия классов (карт) из модели
+        self.runtime = None  # Текущая модель и все ее таблицы (_ModelRuntime, строится в load_model)
+        self.last_timings = {}  # Время стадий инференса последнего кадра (мс)
+        self.frame_shape = None  # Форма кадра ROI (для прогрева новой модели при горячей замене)
+
+        # Горячая замена модели: фоновая загрузка → подмена между кадрами
+        self._swap_lock = threading.Lock()
+        self._swap_thread = None
+        self._pending_runtime = None  # Загруженная и прогретая модель, ждущая подмены
+        self._last_model_poll = 0.0
+        self._seen_mtime = None  # mtime файла модели на прошлой проверке
+        self._requested_mtime = None  # mtime файла, для которого уже запускалась замена
+        self.swap_count = 0
+
+        # Каскад моделей: быстрая модель на всем кадре (None - каскад выключен)
+        self.fast_runtime = None
+        self._cascade_for = None  # runtime, для которого построены таблицы ниже
+        self._cascade_mapping = None  # class_id быстрой модели → class_id основной (-1 - нет класса)
+        self._cascade_categories = None  # категории классов основной модели
+        self._cascade_timer_boxes = np.zeros((0, 4), dtype=np.float32)  # таймеры прошлого кадра
+        self.cascade_stats = {'frames': 0, 'crops': 0}
+
+        # Инференс по изменившимся областям кадра (None - всегда весь кадр)
+        self.change_detector = ChangeDetector(
+            MOTION_BLOCK_SIZE, MOTION_THRESHOLD, MOTION_MAX_REGIONS, MOTION_MAX_AREA, MOTION_REFRESH_INTERVAL
+        ) if MOTION_MASK_ENABLED else None
+        self._motion_arrays = None  # детекции прошлого кадра (переносятся в неизменившиеся области)
+        self.motion_stats = {'frames': 0, 'full': 0, 'regions': 0, 'area': 0.0}
+
+        # Модель только на ключевых кадрах, между ними - перенос боксов оптическим потоком (None - модель на каждом кадре)
+        self.keyframes = KeyframePropagator(
+            KEYFRAME_INTERVAL, KEYFRAME_CONFIDENCE_DECAY, KEYFRAME_FLOW_SCALE, KEYFRAME_FLOW_GRID, KEYFRAME_MIN_POINTS,
+            ChangeDetector(
+                MOTION_BLOCK_SIZE, MOTION_THRESHOLD, MOTION_MAX_REGIONS, MOTION_MAX_AREA, MOTION_REFRESH_INTERVAL
+            ) if KEYFRAME_ON_CHANGE else None
+        ) if KEYFRAME_ENABLED else None
+
+        # Заклинания в НАШЕЙ руке по слотам руки (None - классы "Z..." основной модели)
+        self.hand_classifier = HandSlotClassifier(
+            load_card_templates(card_registry), HAND_SLOT_BOXES, HAND_CLASSIFIER_THRESHOLD
+        ) if HAND_CLASSIFIER_ENABLED else None
+
+        # Размер входа модели по бюджету времени кадра (None - всегда YOLO_IMG_SIZE)
+        self.imgsz_controller = ImgszController(
+            YOLO_IMG_SIZES, YOLO_LATENCY_BUDGET_MS, YOLO_IMG_SIZE,
+            YOLO_IMGSZ_DOWN_RATIO, YOLO_IMGSZ_UP_RATIO, YOLO_IMGSZ_HOLD_FRAMES
+        ) if YOLO_DYNAMIC_IMGSZ else None
+        self._budget_ms = None  # оставшееся время текущего кадра (из detect)
 
-    def load_model(self):
+        # Статическая маска интерфейса (None - сеть получает весь кадр)
+        self.static_mask = StaticMask(YOLO_STATIC_MASK) if YOLO_STATIC_MASK else None
+
+        # Дисковый кэш детекций (None - кэш выключен)
+        self.cache = DetectionCache(DETECTION_CACHE_DIR, DETECTION_CACHE_MAX_MB) if DETECTION_CACHE_DIR else None
+
+        # Трекер детекций между кадрами (None - трекинг выключен)
+        self.tracker = ByteTracker(
+            TRACKER_HIGH_CONFIDENCE, TRACKER_MATCH_IOU, TRACKER_LOW_MATCH_IOU, TRACKER_MAX_LOST
+        ) if TRACKER_ENABLED else None
+
+    def load_model(self, frame_shape=None):
         """
         Загрузка обученной модели YOLO из файла
 
+        Args:
+            frame_shape (tuple | None): форма кадра ROI (h, w, 3) для прогрева модели.
+                None - без прогрева (первые вызовы detect будут медленнее)
+
         Returns:
             bool: True если модель успешно загружена, False если произошла ошибка
         """
@@ -60,14 +303,23 @@ class YoloDetector:
             return False
 
         try:
-            # Загружаем модель YOLO
-            self.model = YOLO(self.model_path)
+            self.runtime = self._load_runtime(self.model_path, with_crops=CASCADE_ENABLED or MOTION_MASK_ENABLED)
 
-            # Получаем названия классов из модели
-            # model.names - это словарь {0: "Giant", 1: "Arrows", ...}
-            self.class_names = self.model.names
+            # Быстрая модель каскада (при ошибке работает только основная модель)
+            self.fast_runtime = None
+            if CASCADE_ENABLED:
+                try:
+                    self.fast_runtime = self._load_runtime(CASCADE_FAST_MODEL_PATH)
+                    # быстрая модель должна отдавать и неуверенные детекции (нижняя граница полосы)
+                    self.fast_runtime.predict_confidence = min(
+                        self.fast_runtime.predict_confidence, CASCADE_UNCERTAIN_BAND[0]
+                    )
+                except Exception as e:
+                    logger.warning("Каскад выключен, быстрая модель не загружена: %s", e)
 
-            logger.info("Количество классов: %s", len(self.class_names))
+            # Прогрев и подбор количества потоков CPU на кадрах реального размера
+            if frame_shape is not None:
+                self.prepare_frame_shape(frame_shape)
 
             return True
 
@@ -75,25 +327,338 @@ class YoloDetector:
             logger.error("ОШИБКА при загрузке модели: %s", e)
             return False
 
-    def detect(self, frame):
+    def prepare_frame_shape(self, frame_shape):
+        """
+        Прогрев загруженных моделей на кадрах размера ROI (отдельно от load_model,
+        когда модель загружается до выбора ROI).
+
+        Args:
+            frame_shape (tuple): форма кадра ROI (h, w, 3)
+        """
+        self.frame_shape = frame_shape
+        self._log_input_shape(frame_shape)
+        self.warmup(frame_shape)
+        if self.fast_runtime is not None:
+            self.warmup(frame_shape, self.fast_runtime)
+        self.select_threads(frame_shape)
+
+    def _load_runtime(self, model_path, with_crops=False):
+        """
+        Загрузка модели и построение всех таблиц, зависящих от ее классов.
+        Не меняет состояние детектора (используется и для горячей замены в фоне).
+
+        Args:
+            model_path (str): путь к файлу модели
+            with_crops (bool): подготовить прямой инференс на областях (каскад, области изменений)
+
+        Returns:
+            _ModelRuntime: загруженная модель
+        """
+        mtime = os.path.getmtime(model_path)
+
+        # Загружаем модель YOLO
+        model = YOLO(model_path)
+
+        # Хэш модели - часть ключа кэша детекций и артефактов компиляции сети
+        model_hash = None
+        if self.cache is not None or YOLO_COMPILE_MODE is not None:
+            model_hash = file_hash(model_path)
+
+        # Прямой инференс сети (при ошибке остается model.predict)
+        runner = None
+        crop_runner = None
+        if YOLO_BACKEND == "direct":
+            try:
+                runner = DirectYoloRunner(model, YOLO_IMG_SIZE, YOLO_COMPILE_MODE, YOLO_COMPILE_DIR, model_hash)
+                if with_crops:
+                    crop_runner = DirectYoloRunner(model, CASCADE_CROP_SIZE, YOLO_COMPILE_MODE, YOLO_COMPILE_DIR, model_hash)
+            except Exception as e:
+                logger.warning("Прямой инференс недоступен, используется model.predict: %s", e)
+
+        # Получаем названия классов из модели
+        # model.names - это словарь {0: "Giant", 1: "Arrows", ...}
+        class_names = model.names
+
+        logger.info("Количество классов: %s", len(class_names))
+
+        taxonomy, class_thresholds, predict_confidence, nms_groups = self._build_class_tables(class_names)
+
+        return _ModelRuntime(
+            model_path, mtime, model, model_hash, class_names, taxonomy,
+            class_thresholds, predict_confidence, nms_groups, runner, crop_runner
+        )
+
+    @staticmethod
+    def _build_class_tables(class_names):
+        """
+        Таблицы, зависящие только от классов модели (строятся один раз на модель).
+
+        Args:
+            class_names (dict): классы модели {class_id: class_name}
+
+        Returns:
+            tuple: (taxonomy, class_thresholds, predict_confidence, nms_groups)
+        """
+        # Строим таблицу категорий классов (один раз, вместо разбора строк на каждом кадре)
+        taxonomy = ClassTaxonomy(class_names, card_registry)
+
+        # Пороги уверенности по классам: файл калибровки, поверх него словарь из конфига
+        overrides = load_class_thresholds(YOLO_CLASS_CONFIDENCE_PATH)
+        overrides.update(YOLO_CLASS_CONFIDENCE)
+        class_thresholds = build_class_thresholds(class_names, YOLO_CONFIDENCE, overrides)
+
+        # Заклинания в руке определяет классификатор слотов - классы "Z..." модели отбрасываются
+        if HAND_CLASSIFIER_ENABLED:
+            class_thresholds[taxonomy.ids_of(CATEGORY_HAND_SPELL)] = np.inf
+
+        predict_confidence = float(class_thresholds.min()) if len(class_thresholds) else YOLO_CONFIDENCE
+        logger.info("Пороги уверенности: %s классов переопределено, минимальный %.2f",
+                    len(overrides), predict_confidence)
+
+        # Группы классов для подавления дублей
+        nms_groups = None
+        if YOLO_NMS_ENABLED:
+            nms_groups = build_nms_groups(taxonomy.class_names, taxonomy.categories, YOLO_NMS_GROUPS, YOLO_IOU)
+
+        return taxonomy, class_thresholds, predict_confidence, nms_groups
+
+    def _log_input_shape(self, frame_shape):
+        """
+        Размер входа сети для кадра ROI: против квадратного letterbox и с маской интерфейса
+        (вычисления сети пропорциональны числу пикселей входа).
+        """
+        frame_hw = tuple(frame_shape[:2])
+        rect_h, rect_w = letterbox_geometry(frame_hw, YOLO_IMG_SIZE).input_hw
+        logger.info("Вход сети для кадра %sx%s: %sx%s (%.0f%% пикселей квадрата %s)",
+                    frame_hw[1], frame_hw[0], rect_w, rect_h,
+                    rect_h * rect_w / YOLO_IMG_SIZE ** 2 * 100, YOLO_IMG_SIZE)
+
+        if self.static_mask is not None:
+            x1, y1, x2, y2 = self.static_mask.crop_box(frame_hw)
+            imgsz = self.static_mask.scaled_imgsz(YOLO_IMG_SIZE, frame_hw)
+            mask_h, mask_w = letterbox_geometry((y2 - y1, x2 - x1), imgsz).input_hw
+            logger.info("Вход сети с маской интерфейса: %sx%s (%.0f%% пикселей без маски)",
+                        mask_w, mask_h, mask_h * mask_w / (rect_h * rect_w) * 100)
+
+    @staticmethod
+    def _warmup_frame(frame_shape):
+        """Синтетический кадр-шум: модель проходит те же ветки, что и на реальном кадре."""
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 256, size=tuple(frame_shape), dtype=np.uint8)
+
+    def warmup(self, frame_shape, runtime=None):
+        """
+        Прогрев модели: прогоны на синтетических кадрах без изменения глобальных настроек
+        (безопасен в фоновом потоке горячей замены параллельно с инференсом).
+
+        Args:
+            frame_shape (tuple): форма кадра ROI (h, w, 3)
+            runtime (_ModelRuntime | None): модель для прогрева (None - текущая)
+        """
+        frame = self._warmup_frame(frame_shape)
+        runtime = runtime or self.runtime
+
+        started = time.perf_counter()
+        for _ in range(YOLO_WARMUP_RUNS):
+            self._infer(frame, runtime)  # напрямую, мимо кэша детекций
+
+        # Области каскада: свой размер входа основной модели
+        if runtime.crop_runner is not None:
+            side = min(frame.shape[0], frame.shape[1])
+            region = np.array([[0, 0, side, side]], dtype=np.float32)
+            for _ in range(YOLO_WARMUP_RUNS):
+                self._detect_crops(frame, region, runtime)
+
+        # Остальные размеры входа: прогрев и начальная оценка времени для выбора размера
+        # (модель горячей замены прогревается в фоне параллельно с инференсом - ее время не показательно)
+        if self.imgsz_controller is not None:
+            for imgsz in self.imgsz_controller.sizes:
+                runs = []
+                for _ in range(YOLO_WARMUP_RUNS):
+                    t0 = time.perf_counter()
+                    self._infer(frame, runtime, imgsz)
+                    runs.append((time.perf_counter() - t0) * 1000)
+                if runtime is self.runtime:
+                    self.imgsz_controller.update(imgsz, float(np.median(runs)))
+
+        logger.info("Прогрев модели: %s прогонов за %.2f с", YOLO_WARMUP_RUNS, time.perf_counter() - started)
+
+    def select_threads(self, frame_shape):
+        """
+        Выбор количества потоков CPU для инференса (только при первой загрузке:
+        torch.set_num_threads глобален для процесса, а замеры параллельно с инференсом не показательны).
+
+        Сохраненный выбор для текущего хоста берется из YOLO_THREADS_CONFIG_PATH,
+        иначе каждый вариант из _thread_candidates замеряется на синтетических кадрах
+        (медиана времени _infer) и лучший сохраняется в файл для следующего запуска.
+
+        Args:
+            frame_shape (tuple): форма кадра ROI (h, w, 3)
+        """
+        frame = self._warmup_frame(frame_shape)
+        runtime = self.runtime
+
+        host = socket.gethostname()
+        saved = _load_thread_config(YOLO_THREADS_CONFIG_PATH)
+        threads = saved.get(host)
+        if threads:
+            torch.set_num_threads(int(threads))
+            logger.info("Потоки CPU для инференса: %s (сохранено для %s)", threads, host)
+            return
+
+        timings = {}
+        for candidate in _thread_candidates():
+            torch.set_num_threads(candidate)
+            self._infer(frame, runtime)  # первый прогон после смены потоков не учитываем
+            runs = []
+            for _ in range(YOLO_THREAD_BENCH_RUNS):
+                t0 = time.perf_counter()
+                self._infer(frame, runtime)
+                runs.append(time.perf_counter() - t0)
+            timings[candidate] = float(np.median(runs))
+            logger.info("Потоки CPU %s: медиана %.1f мс", candidate, timings[candidate] * 1000)
+
+        threads = min(timings, key=timings.get)
+        torch.set_num_threads(threads)
+        logger.info("Потоки CPU для инференса: %s (%.1f мс на кадр)", threads, timings[threads] * 1000)
+
+        saved[host] = threads
+        _save_thread_config(YOLO_THREADS_CONFIG_PATH, saved)
+
+    def request_model_swap(self, model_path=None, frame_shape=None):
+        """
+        Запуск фоновой загрузки новой модели (горячая замена без перезапуска).
+
+        Модель загружается и прогревается в отдельном потоке, проверяется совместимость
+        ее классов с текущей моделью, затем подменяется в начале следующего detect().
+        При ошибке загрузки или несовместимых классах продолжает работать текущая модель.
+
+        Args:
+            model_path (str | None): путь к новой модели (None - тот же файл)
+            frame_shape (tuple | None): форма кадра ROI для прогрева (None - из prepare_frame_shape)
+
+        Returns:
+            bool: True если загрузка запущена, False если предыдущая еще не завершена
+        """
+        if self._swap_thread is not None and self._swap_thread.is_alive():
+            return False
+
+        self._swap_thread = threading.Thread(
+            target=self._prepare_swap,
+            args=(model_path or self.model_path, frame_shape or self.frame_shape),
+            name="model-swap",
+            daemon=True
+        )
+        self._swap_thread.start()
+        return True
+
+    def _prepare_swap(self, model_path, frame_shape):
+        """Фоновый поток: загрузка, прогрев и проверка новой модели."""
+        logger.info("Горячая замена: загрузка модели %s", model_path)
+        try:
+            runtime = self._load_runtime(model_path, with_crops=CASCADE_ENABLED or MOTION_MASK_ENABLED)
+            if frame_shape is not None:
+                self.warmup(frame_shape, runtime)
+        except Exception as e:
+            logger.error("Горячая замена: ошибка загрузки модели %s: %s", model_path, e)
+            return
+
+        # Классы, на которые опираются процессоры, должны остаться в новой модели
+        if self.taxonomy is not None:
+            errors, warnings = check_class_compatibility(self.taxonomy, runtime.taxonomy)
+            for warning in warnings:
+                logger.warning("Горячая замена: %s", warning)
+            if errors:
+                logger.error("Горячая замена: модель %s отклонена: %s", model_path, "; ".join(errors))
+                return
+
+        with self._swap_lock:
+            self._pending_runtime = runtime
+        logger.info("Горячая замена: модель %s готова к подмене", model_path)
+
+    def _apply_pending_swap(self):
+        """Подмена модели между кадрами (вызывается в начале detect)."""
+        with self._swap_lock:
+            runtime, self._pending_runtime = self._pending_runtime, None
+        if runtime is None:
+            return
+
+        # Треки переживают замену: class_id старой модели → class_id новой по class_name
+        if self.tracker is not None and self.runtime is not None:
+            class_ids = runtime.taxonomy.class_ids
+            mapping = np.asarray([class_ids.get(name, -1) for name in self.taxonomy.class_names], dtype=np.int64)
+            self.tracker.remap_classes(mapping)
+
+        # Поколение записывается в модель до подмены: runtime и его поколение читаются одним снимком
+        runtime.generation = self.swap_count + 1
+        self.runtime = runtime
+        self.model_path = runtime.model_path
+        self.swap_count += 1
+
+        # Перенесенные детекции посчитаны старой моделью - следующий кадр полный
+        if self.change_detector is not None:
+            self.change_detector.reset()
+            self._motion_arrays = None
+        if self.keyframes is not None:
+            self.keyframes.reset()
+        logger.info("Горячая замена: используется модель %s (%s классов)", runtime.model_path, len(runtime.class_names))
+
+    def poll_model_file(self):
+        """
+        Проверка файла модели (не чаще MODEL_WATCH_INTERVAL), при изменении - горячая замена.
+        Замена запускается, когда mtime файла не менялся между двумя проверками (копирование завершено).
+
+        Returns:
+            bool: True если запущена загрузка новой модели
+        """
+        if not MODEL_HOT_SWAP or self.runtime is None:
+            return False
+
+        now = time.monotonic()
+        if now - self._last_model_poll < MODEL_WATCH_INTERVAL:
+            return False
+        self._last_model_poll = now
+
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            return False
+
+        seen, self._seen_mtime = self._seen_mtime, mtime
+        if mtime == self.runtime.mtime or mtime != seen or mtime == self._requested_mtime:
+            return False
+
+        if self.request_model_swap():
+            self._requested_mtime = mtime
+            return True
+        return False
+
+    def detect(self, frame, budget_ms=None):
         """
         Обнаружение карт на кадре
 
         Args:
             frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+            budget_ms (float | None): оставшееся время кадра (мс) для выбора размера входа модели
 
         Returns:
             list: Список обнаруженных объектов, каждый объект - это словарь:
                   {
                       'class_id': int,          # ID класса
                       'class_name': str,        # Название класса
+                      'category': int,          # Категория класса (CATEGORY_* из class_taxonomy)
                       'confidence': float,      # Уверенность детекции (0-1)
-                      'bbox': [x1, y1, x2, y2]  # Координаты bounding box
+                      'bbox': [x1, y1, x2, y2], # Координаты bounding box
+                      'track_id': int | None    # Постоянный ID объекта между кадрами (None без трекера)
                   }
                   Возвращает пустой список если ничего не обнаружено
         """
+        # Подмена модели, загруженной в фоне (между кадрами)
+        if self._pending_runtime is not None:
+            self._apply_pending_swap()
+
         # Проверяем что модель загружена
-        if self.model is None or self.class_names is None:
+        if self.runtime is None:
             logger.error("ОШИБКА: Модель не загружена. Вызовите load_model() сначала.")
             return []
 
@@ -102,63 +667,417 @@ class YoloDetector:
             logger.error("ОШИБКА: Получен пустой кадр")
             return []
 
+        self._budget_ms = budget_ms
+
         try:
-            # Запускаем инференс модели на кадре
-            # verbose=False - отключаем вывод логов YOLO в консоль
-            # imgsz - размер изображения для обработки (YOLO изменит размер автоматически)
-            # conf - минимальный порог уверенности для детекций
-            # iou - минимальный порог IoU для фильтрации задвоенных детекций
-            results = self.model.predict(
-                source=frame,
-                imgsz=YOLO_IMG_SIZE,
-                conf=YOLO_CONFIDENCE,
-                iou=YOLO_IOU,
-                verbose=False
+            if self.keyframes is not None and not self.keyframes.is_keyframe(frame):
+                # 1-2. Не ключевой кадр: детекции прошлого кадра, перенесенные оптическим потоком
+                arrays = self.keyframes.propagate(frame, self.class_thresholds)
+            else:
+                # 1. Инференс модели → колоночные массивы (или готовый результат из кэша)
+                if self.change_detector is not None:
+                    arrays = self._infer_motion(frame)
+                else:
+                    arrays = self._infer_cached(frame)
+
+                # 2. Постобработка (векторно, над всеми детекциями кадра)
+                arrays = self._postprocess(arrays)
+                if self.keyframes is not None:
+                    self.keyframes.set_keyframe(frame, arrays)
+
+            # 3. Трекинг: постоянный track_id для каждой детекции
+            track_ids = self.tracker.update(arrays) if self.tracker is not None else None
+
+            # 4. Список словарей для процессоров
+            detections = self._to_detections(arrays, track_ids)
+
+            # 5. Заклинания в НАШЕЙ руке - классификатор слотов руки
+            if self.hand_classifier is not None:
+                detections.extend(self.hand_classifier.detect(frame, self.taxonomy))
+
+            return detections
+
+        except Exception as e:
+            logger.error("ОШИБКА при детекции: %s", e)
+            return []
+
+    def detect_raw(self, frame):
+        """
+        Инференс без постобработки (для калибровки порогов и бенчмарков).
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+
+        Returns:
+            DetectionArrays: детекции модели с порогом predict_confidence
+        """
+        # Проверяем runtime, а не model: у клиента сервера инференса модели в процессе нет
+        if self.runtime is None or frame is None:
+            return DetectionArrays.empty()
+        return self._infer_cached(frame)
+
+    def _infer_motion(self, frame):
+        """
+        Инференс только на изменившихся областях кадра, детекции остальной части
+        кадра переносятся с прошлого кадра. Весь кадр - по решению ChangeDetector
+        (первый кадр, периодическое обновление, слишком большие изменения).
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+
+        Returns:
+            DetectionArrays: детекции кадра (до постобработки)
+        """
+        frame_h, frame_w = frame.shape[:2]
+
+        # Квадраты одной стороны - с масштабом всего кадра: после приведения к CASCADE_CROP_SIZE
+        # объекты в области того же размера, что и при инференсе всего кадра до YOLO_IMG_SIZE
+        side = full_scale_side((frame_h, frame_w), CASCADE_CROP_SIZE, YOLO_IMG_SIZE)
+        regions = self.change_detector.update(frame, side, side)
+
+        if regions is None or self._motion_arrays is None:
+            arrays = self._infer_cached(frame)
+            self.motion_stats['full'] += 1
+        else:
+            refined = self._detect_crops(frame, regions)
+            arrays = merge_region_detections(self._motion_arrays, refined, regions)
+            self.motion_stats['regions'] += len(regions)
+            area = (regions[:, 2] - regions[:, 0]) * (regions[:, 3] - regions[:, 1])
+            self.motion_stats['area'] += float(area.sum()) / (frame_h * frame_w)
+
+        self.motion_stats['frames'] += 1
+        self._motion_arrays = arrays
+        return arrays
+
+    def _infer_cached(self, frame):
+        """
+        Инференс через дисковый кэш: при попадании модель не запускается.
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+
+        Returns:
+            DetectionArrays: детекции модели (до постобработки)
+        """
+        # Каскад зависит от прошлого кадра (новые таймеры) - мимо кэша
+        if self.fast_runtime is not None:
+            return self._infer_cascade(frame)
+
+        # Размер входа по времени прошлых кадров и остатку времени текущего
+        controller = self.imgsz_controller
+        imgsz = controller.choose(self._budget_ms) if controller is not None else YOLO_IMG_SIZE
+
+        arrays = None
+        runtime = self.runtime  # ключ кэша - по модели на момент запроса
+        if self.cache is not None:
+            key_size = (imgsz, self.static_mask.rects) if self.static_mask is not None else imgsz
+            key = DetectionCache.make_key(frame, runtime.model_hash, key_size, runtime.predict_confidence, YOLO_IOU)
+            arrays = self.cache.get(key)
+        if arrays is None:
+            arrays = self._infer(frame, imgsz=imgsz)
+            if controller is not None:
+                controller.update(imgsz, self.last_timings['total'])
+            # Модель заменилась во время инференса (сервер инференса) - детекции не от модели ключа
+            if self.cache is not None and self.runtime is runtime:
+                self.cache.put(key, arrays)
+        return arrays
+
+    def _infer(self, frame, runtime=None, imgsz=None):
+        """
+        Инференс модели на кадре.
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+            runtime (_ModelRuntime | None): модель (None - текущая)
+            imgsz (int | None): размер входа модели (None - YOLO_IMG_SIZE)
+
+        Returns:
+            DetectionArrays: колоночные массивы детекций (boxes, scores, class_ids) в координатах кадра
+        """
+        runtime = runtime or self.runtime
+        imgsz = imgsz or YOLO_IMG_SIZE
+        started = time.perf_counter()
+
+        # Маска интерфейса: обрезанный кадр и вход меньше при том же масштабе
+        offset = None
+        if self.static_mask is not None:
+            imgsz = self.static_mask.scaled_imgsz(imgsz, frame.shape[:2])
+            frame, offset = self.static_mask.apply(frame)
+
+        runner = self._runner_for(runtime, imgsz)
+        if runner is not None:
+            arrays = runner(frame, runtime.predict_confidence, YOLO_IOU)
+            timings = dict(runner.last_timings)
+        else:
+            arrays, timings = self._infer_predict(frame, runtime, imgsz)
+
+        if offset is not None:
+            StaticMask.restore(arrays.boxes, offset)
+
+        # Накладные расходы Python сверх самой сети
+        timings['total'] = (time.perf_counter() - started) * 1000
+        timings['overhead'] = timings['total'] - timings.get('forward', 0.0)
+        if runtime is self.runtime:
+            self.last_timings = timings
+        return arrays
+
+    @staticmethod
+    def _runner_for(runtime, imgsz):
+        """
+        Прямой инференс модели для размера входа (None - model.predict).
+        Для размеров кроме YOLO_IMG_SIZE создается при первом обращении (при прогреве).
+        """
+        if runtime.runner is None or runtime.runner.imgsz == imgsz:
+            return runtime.runner
+
+        if runtime.size_runners is None:
+            runtime.size_runners = {}
+        runner = runtime.size_runners.get(imgsz)
+        if runner is None:
+            runner = DirectYoloRunner(runtime.model, imgsz, YOLO_COMPILE_MODE, YOLO_COMPILE_DIR, runtime.model_hash)
+            runtime.size_runners[imgsz] = runner
+        return runner
+
+    def _infer_cascade(self, frame):
+        """
+        Каскад моделей: быстрая модель на всем кадре, основная - на областях вокруг
+        неуверенных детекций (уверенность в CASCADE_UNCERTAIN_BAND) и новых красных таймеров.
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+
+        Returns:
+            DetectionArrays: детекции кадра (class_id основной модели)
+        """
+        started = time.perf_counter()
+        runtime = self.runtime
+
+        # Таблицы связи классов быстрой и основной модели (пересчет после горячей замены)
+        if self._cascade_for is not runtime:
+            class_ids = runtime.taxonomy.class_ids
+            self._cascade_mapping = np.asarray(
+                [class_ids.get(name, -1) for name in self.fast_runtime.taxonomy.class_names], dtype=np.int64
             )
+            self._cascade_categories = np.asarray(runtime.taxonomy.categories, dtype=np.int64)
+            self._cascade_for = runtime
 
-            # Список для хранения обнаруженных объектов
-            detections = []
+        # 1. Быстрая модель на всем кадре, class_id → class_id основной модели по class_name
+        fast = self._infer(frame, self.fast_runtime)
+        class_ids = self._cascade_mapping[fast.class_ids]
+        known = class_ids >= 0
+        fast = DetectionArrays(fast.boxes[known], fast.scores[known], class_ids[known])
+        fast_ms = (time.perf_counter() - started) * 1000
 
-            # Обрабатываем результаты
-            # results[0] - результаты для первого (единственного) изображения
-            for result in results:
-                # result.boxes - объект содержащий все bounding boxes
-                boxes = result.boxes
+        # 2. Что уточнять: новые красные таймеры первыми, затем неуверенные детекции
+        low, high = CASCADE_UNCERTAIN_BAND
+        uncertain = (fast.scores >= low) & (fast.scores < high)
+        timers = self._cascade_categories[fast.class_ids] == CATEGORY_TIMER
+        new_timers = timers & new_object_mask(fast.boxes, self._cascade_timer_boxes, CASCADE_NEW_TIMER_IOU)
+        self._cascade_timer_boxes = fast.boxes[timers]
 
-                # Если детекций нет, пропускаем
-                if boxes is None or len(boxes) == 0:
-                    continue
+        order = np.concatenate([np.flatnonzero(new_timers), np.flatnonzero(uncertain & ~new_timers)])
+        # Область не меньше стороны с масштабом всего кадра: объекты не увеличиваются относительно полного кадра
+        min_side = max(CASCADE_CROP_MIN_SIDE, full_scale_side(frame.shape[:2], CASCADE_CROP_SIZE, YOLO_IMG_SIZE))
+        regions = build_crop_regions(
+            fast.boxes[order], frame.shape[:2], CASCADE_CROP_PADDING, min_side, CASCADE_MAX_CROPS
+        )
 
-                # Проходим по каждой детекции
-                for box in boxes:
-                    # Извлекаем данные из детекции
-                    # box.xyxy - координаты bounding box в формате [x1, y1, x2, y2]
-                    # box.conf - уверенность детекции
-                    # box.cls - ID класса
+        # 3. Основная модель на областях, слияние с детекциями быстрой модели
+        arrays = merge_region_detections(fast, self._detect_crops(frame, regions, runtime), regions)
 
-                    bbox = box.xyxy[0].cpu().numpy()  # Координаты (конвертируем из tensor в numpy)
-                    confidence = float(box.conf[0].cpu().numpy())  # Уверенность
-                    class_id = int(box.cls[0].cpu().numpy())  # ID класса
+        self.cascade_stats['frames'] += 1
+        self.cascade_stats['crops'] += len(regions)
+        total_ms = (time.perf_counter() - started) * 1000
+        self.last_timings = {'fast': fast_ms, 'crops': total_ms - fast_ms, 'total': total_ms, 'regions': len(regions)}
+        return arrays
 
-                    # Получаем название класса (карты)
-                    class_name = self.class_names[class_id]
+    def _detect_crops(self, frame, regions, runtime=None):
+        """
+        Инференс на квадратных областях кадра.
+        Каждая область уменьшается до CASCADE_CROP_SIZE, но не крупнее масштаба всего кадра:
+        меньшая область вписывается в левый верхний угол входа с серыми полями (буферы прямого
+        инференса не пересоздаются), боксы возвращаются в координатах кадра.
 
-                    # Формируем словарь с информацией об объекте
-                    detection = {
-                        'class_id': class_id,
-                        'class_name': class_name,
-                        'confidence': confidence,
-                        'bbox': bbox.tolist()  # [x1, y1, x2, y2]
-                    }
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+            regions (numpy.ndarray): (R, 4) квадратные области x1, y1, x2, y2
+            runtime (_ModelRuntime | None): модель (None - текущая)
 
-                    # Добавляем в список обнаруженных объектов
-                    detections.append(detection)
+        Returns:
+            DetectionArrays: детекции всех областей (до постобработки)
+        """
+        runtime = runtime or self.runtime
+        if len(regions) == 0:
+            return DetectionArrays.empty()
 
-            return detections
+        frame_hw = frame.shape[:2]
+        boxes, scores, class_ids = [], [], []
+        for x1, y1, x2, y2 in regions.astype(np.int64).tolist():
+            crop = frame[y1:y2, x1:x2]
+            scale = crop_input_scale(x2 - x1, CASCADE_CROP_SIZE, frame_hw, YOLO_IMG_SIZE)
+            side = min(int(round((x2 - x1) * scale)), CASCADE_CROP_SIZE)
+            if crop.shape[:2] != (side, side):
+                crop = cv2.resize(crop, (side, side), interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+            if side < CASCADE_CROP_SIZE:
+                padded = np.full((CASCADE_CROP_SIZE, CASCADE_CROP_SIZE, 3), 114, dtype=frame.dtype)  # серый, как у letterbox
+                padded[:side, :side] = crop
+                crop = padded
 
-        except Exception as e:
-            logger.error("ОШИБКА при детекции: %s", e)
-            return []
+            if runtime.crop_runner is not None:
+                arrays = runtime.crop_runner(crop, runtime.predict_confidence, YOLO_IOU)
+            else:
+                arrays, _ = self._infer_predict(crop, runtime, CASCADE_CROP_SIZE)
+
+            boxes.append(arrays.boxes / scale + np.array([x1, y1, x1, y1], dtype=np.float32))
+            scores.append(arrays.scores)
+            class_ids.append(arrays.class_ids)
+
+        return DetectionArrays(
+            np.concatenate(boxes).astype(np.float32),
+            np.concatenate(scores),
+            np.concatenate(class_ids),
+        )
+
+    def _infer_predict(self, frame, runtime, imgsz=YOLO_IMG_SIZE):
+        """
+        Инференс через model.predict() ultralytics.
+
+        Args:
+            frame (numpy.ndarray): Изображение в формате BGR (OpenCV)
+            runtime (_ModelRuntime): модель
+            imgsz (int): размер входа модели
+
+        Returns:
+            tuple: (DetectionArrays, время стадий предиктора в мс)
+        """
+        # Запускаем инференс модели на кадре
+        # verbose=False - отключаем вывод логов YOLO в консоль
+        # imgsz - размер изображения для обработки (YOLO изменит размер автоматически)
+        # conf - минимальный порог среди порогов всех классов (точная фильтрация в _postprocess)
+        # iou - минимальный порог IoU для фильтрации задвоенных детекций
+        results = runtime.model.predict(
+            source=frame,
+            imgsz=imgsz,
+            conf=runtime.predict_confidence,
+            iou=YOLO_IOU,
+            verbose=False
+        )
+
+        # results[0] - результаты для первого (единственного) изображения
+        # speed - время стадий предиктора (мс)
+        speed = results[0].speed if results else {}
+        timings = {
+            'preprocess': speed.get('preprocess', 0.0),
+            'forward': speed.get('inference', 0.0),
+            'postprocess': speed.get('postprocess', 0.0),
+        }
+        arrays = _result_to_arrays(results[0]) if results else DetectionArrays.empty()
+        return arrays, timings
+
+    def detect_raw_batch(self, frames):
+        """
+        Инференс пачки кадров без постобработки (сервер инференса).
+        Кадры одного размера идут через сеть одним проходом.
+
+        Args:
+            frames (list): кадры BGR
+
+        Returns:
+            list: DetectionArrays для каждого кадра (в порядке frames)
+        """
+        # Подмена модели, загруженной в фоне (между пачками)
+        if self._pending_runtime is not None:
+            self._apply_pending_swap()
+
+        runtime = self.runtime
+        results = [None] * len(frames)
+
+        # Маска интерфейса: размер входа по размеру исходного кадра, детекции - в его координатах
+        offsets = [None] * len(frames)
+        sizes = [YOLO_IMG_SIZE] * len(frames)
+        if self.static_mask is not None:
+            frames = list(frames)
+            for i, frame in enumerate(frames):
+                sizes[i] = self.static_mask.scaled_imgsz(YOLO_IMG_SIZE, frame.shape[:2])
+                frames[i], offsets[i] = self.static_mask.apply(frame)
+
+        # Группы кадров одного размера
+        groups = {}
+        for i, frame in enumerate(frames):
+            groups.setdefault((frame.shape, sizes[i]), []).append(i)
+
+        for (_, imgsz), indices in groups.items():
+            batch = [frames[i] for i in indices]
+            runner = self._runner_for(runtime, imgsz)
+            if runner is not None:
+                batch_arrays = runner.run_batch(batch, runtime.predict_confidence, YOLO_IOU)
+            else:
+                batch_results = runtime.model.predict(
+                    source=batch,
+                    imgsz=imgsz,
+                    conf=runtime.predict_confidence,
+                    iou=YOLO_IOU,
+                    verbose=False
+                )
+                batch_arrays = [_result_to_arrays(result) for result in batch_results]
+
+            for i, arrays in zip(indices, batch_arrays):
+                if offsets[i] is not None:
+                    StaticMask.restore(arrays.boxes, offsets[i])
+                results[i] = arrays
+
+        return results
+
+    def _postprocess(self, arrays):
+        """
+        Постобработка детекций кадра.
+
+        Args:
+            arrays (DetectionArrays): детекции после инференса
+
+        Returns:
+            DetectionArrays: отфильтрованные детекции
+
+        Последовательность:
+            1. Порог уверенности своего класса (одна маска NumPy)
+            2. Подавление дублей по группам классов (NMS + слияние разных классов группы)
+        """
+        arrays = filter_by_class_confidence(arrays, self.class_thresholds)
+
+        if self.nms_groups is not None:
+            arrays = suppress_duplicates(arrays, self.nms_groups)
+
+        return arrays
+
+    def _to_detections(self, arrays, track_ids=None):
+        """
+        Преобразование колоночных массивов в список словарей детекций.
+
+        Args:
+            arrays (DetectionArrays): детекции кадра
+            track_ids (numpy.ndarray | None): track_id для каждой детекции (от трекера)
+
+        Returns:
+            list: список словарей (формат описан в detect)
+        """
+        class_names = self.taxonomy.class_names
+        categories = self.taxonomy.categories
+        track_list = track_ids.tolist() if track_ids is not None else [None] * len(arrays)
+
+        detections = []
+        for bbox, confidence, class_id, track_id in zip(
+            arrays.boxes.tolist(), arrays.scores.tolist(), arrays.class_ids.tolist(), track_list
+        ):
+            detections.append({
+                'class_id': class_id,
+                'class_name': class_names[class_id],
+                'category': categories[class_id],
+                'confidence': confidence,
+                'bbox': bbox,  # [x1, y1, x2, y2]
+                'track_id': track_id
+            })
+
+        return detections
 
     def draw_detections(self, frame, detections):
         """
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Модуль прямого инференса YOLO без model.predict() ultralytics.
+
+Letterbox кадра в заранее выделенный буфер, прямой вызов сети (model.model),
+векторный разбор выхода и NMS. Результат совпадает с model.predict
+(та же геометрия letterbox, тот же NMS по классам), но без пересоздания
+обвязки предиктора и объектов Results на каждом кадре.
+"""
+
+import os
+import time
+import logging
+
+# Настраиваем логгер модуля
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.info("Загружен модуль: %s", __name__)
+
+from typing import List, NamedTuple, Tuple
+
+import cv2  # OpenCV для изменения размера кадра
+import numpy as np
+import torch  # type: ignore
+import torchvision  # type: ignore # NMS (torchvision.ops.nms), зависимость ultralytics
+
+from modules.detection_postprocess import DetectionArrays
+
+LETTERBOX_PAD_VALUE = 114  # цвет полей letterbox (как в ultralytics)
+MAX_WH = 7680  # смещение боксов по классам для NMS по классам одним вызовом (как в ultralytics)
+MAX_NMS = 30000  # максимум кандидатов на входе NMS
+MAX_DET = 300  # максимум детекций на кадр
+
+COMPILE_MODES = (None, "torchscript", "compile")  # None - eager
+COMPILE_CHECK_ATOL = 1e-3  # допустимое расхождение выхода скомпилированной сети с eager
+
+
+class LetterboxGeometry(NamedTuple):
+    """Геометрия letterbox для кадра фиксированного размера."""
+    resized_hw: Tuple[int, int]  # размер кадра после масштабирования (h, w)
+    input_hw: Tuple[int, int]  # размер входа сети (h, w)
+    top: int  # поле сверху
+    left: int  # поле слева
+    gain: float  # коэффициент масштабирования кадра
+
+
+def letterbox_geometry(frame_hw, imgsz: int, stride: int = 32, auto: bool = True) -> LetterboxGeometry:
+    """
+    Геометрия letterbox, совпадающая с ultralytics LetterBox (center=True, scaleup=True).
+
+    Args:
+        frame_hw: размер кадра (h, w)
+        imgsz: размер входа модели
+        stride: максимальный шаг сети (поля выравниваются до кратного stride)
+        auto: минимальные поля (прямоугольный вход), как в predict для .pt моделей
+
+    Returns:
+        LetterboxGeometry
+    """
+    h, w = frame_hw
+    r = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    dw, dh = imgsz - new_w, imgsz - new_h
+    if auto:
+        dw, dh = dw % stride, dh % stride
+    dw, dh = dw / 2, dh / 2
+
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+
+    # gain и поля для обратного пересчета - как в ultralytics scale_boxes
+    input_hw = (new_h + top + bottom, new_w + left + right)
+    gain = min(input_hw[0] / h, input_hw[1] / w)
+    return LetterboxGeometry((new_h, new_w), input_hw, top, left, gain)
+
+
+def scale_boxes_to_frame(boxes: np.ndarray, geometry: LetterboxGeometry, frame_hw) -> np.ndarray:
+    """
+    Пересчет боксов из координат входа сети в координаты кадра (на месте).
+
+    Args:
+        boxes: (N, 4) float32 xyxy в координатах входа сети
+        geometry: геометрия letterbox кадра
+        frame_hw: размер кадра (h, w)
+
+    Returns:
+        np.ndarray: те же boxes в координатах кадра
+    """
+    input_h, input_w = geometry.input_hw
+    gain = geometry.gain
+    pad_x = round((input_w - frame_hw[1] * gain) / 2 - 0.1)
+    pad_y = round((input_h - frame_hw[0] * gain) / 2 - 0.1)
+
+    boxes[:, [0, 2]] -= pad_x
+    boxes[:, [1, 3]] -= pad_y
+    boxes /= gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, frame_hw[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, frame_hw[0])
+    return boxes
+
+
+class DirectYoloRunner:
+    """
+    Прямой инференс сети YOLO на кадрах фиксированного размера (ROI).
+
+    Буферы letterbox (uint8 HWC) и входной тензор (1, 3, H, W) выделяются один раз
+    на размер кадра и переиспользуются. Время стадий последнего кадра - в last_timings (мс).
+
+    Режимы исполнения сети (compile_mode), сеть готовится под фиксированный размер входа:
+        None          - eager PyTorch
+        "torchscript" - torch.jit.trace + freeze, артефакт кэшируется на диске
+                        (<compile_dir>/<model_hash>_<H>x<W>.torchscript)
+        "compile"     - torch.compile (кэш inductor в <compile_dir>/inductor)
+    При ошибке подготовки или расхождении выхода с eager используется eager.
+    """
+
+    def __init__(self, model, imgsz: int, compile_mode=None, compile_dir=None, model_hash=None):
+        """
+        Args:
+            model: загруженная модель ultralytics.YOLO
+            imgsz: размер входа модели
+            compile_mode: режим исполнения сети (COMPILE_MODES)
+            compile_dir: папка артефактов компиляции (None - без кэша на диске)
+            model_hash: хэш файла модели (ключ артефакта)
+        """
+        if compile_mode not in COMPILE_MODES:
+            raise ValueError(f"Неизвестный режим компиляции: {compile_mode}")
+        self.network = model.model
+        self.network.eval()
+        if hasattr(self.network, 'fuse') and not getattr(self.network, 'is_fused', lambda: True)():
+            self.network.fuse(verbose=False)  # Conv+BN как в AutoBackend predict()
+
+        parameter = next(self.network.parameters())
+        self.device = parameter.device
+        self.dtype = parameter.dtype
+        self.stride = int(max(int(self.network.stride.max()), 32))
+        self.imgsz = imgsz
+
+        self.compile_mode = compile_mode
+        self.compile_dir = compile_dir
+        self.model_hash = model_hash
+        self.forward = self.network  # исполняемая сеть (eager или скомпилированная)
+
+        self._frame_hw = None  # размер кадра, под который выделены буферы
+        self._geometry = None
+        self._canvas = None  # uint8 (H, W, 3) - кадр с полями letterbox
+        self._input = None  # тензор (1, 3, H, W) - вход сети
+        self._batch_input = None  # тензор (B, 3, H, W) - вход сети для пачки кадров (run_batch)
+
+        self.last_timings = {}
+
+    def _prepare(self, frame_hw) -> None:
+        """Выделение буферов под размер кадра (один раз на размер ROI)."""
+        self._frame_hw = frame_hw
+        self._geometry = letterbox_geometry(frame_hw, self.imgsz, self.stride)
+        input_h, input_w = self._geometry.input_hw
+        self._canvas = np.full((input_h, input_w, 3), LETTERBOX_PAD_VALUE, dtype=np.uint8)
+        self._input = torch.empty((1, 3, input_h, input_w), dtype=self.dtype, device=self.device)
+        logger.info("Буферы прямого инференса: кадр %sx%s → вход %sx%s",
+                    frame_hw[1], frame_hw[0], input_w, input_h)
+
+        if self.compile_mode is not None:
+            self.forward = self._compile()
+
+    def _artifact_path(self):
+        """Путь к артефакту TorchScript для текущего размера входа (None - без кэша на диске)."""
+        if not self.compile_dir or not self.model_hash:
+            return None
+        _, _, input_h, input_w = self._input.shape
+        dtype = str(self.dtype).replace('torch.', '')
+        return os.path.join(self.compile_dir, f"{self.model_hash}_{input_h}x{input_w}_{dtype}_{self.device.type}.torchscript")
+
+    def _trace(self):
+        """TorchScript сети под размер входа: из кэша на диске или trace + freeze с сохранением."""
+        path = self._artifact_path()
+        if path and os.path.exists(path):
+            logger.info("TorchScript из кэша: %s", path)
+            return torch.jit.load(path, map_location=self.device)
+
+        example = torch.rand(self._input.shape, dtype=self.dtype, device=self.device)
+        traced = torch.jit.freeze(torch.jit.trace(self.network, example, strict=False, check_trace=False))
+        if path:
+            os.makedirs(self.compile_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            torch.jit.save(traced, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info("TorchScript сохранен: %s", path)
+        return traced
+
+    def _compile(self):
+        """
+        Подготовка сети в режиме compile_mode под текущий размер входа.
+
+        Returns:
+            исполняемая сеть (при ошибке или расхождении с eager - сама сеть)
+        """
+        started = time.perf_counter()
+        # trace не работает с тензорами inference_mode (_prepare вызывается из __call__)
+        try:
+            with torch.inference_mode(False), torch.no_grad():
+                compiled = self._compile_checked()
+        except Exception as e:
+            logger.warning("Режим %s недоступен, используется eager: %s", self.compile_mode, e)
+            return self.network
+
+        logger.info("Сеть подготовлена в режиме %s за %.1f с", self.compile_mode, time.perf_counter() - started)
+        return compiled
+
+    def _compile_checked(self):
+        """Компиляция сети и проверка выхода на случайном входе против eager."""
+        if self.compile_mode == "torchscript":
+            compiled = self._trace()
+        else:
+            if self.compile_dir:
+                os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', os.path.join(self.compile_dir, 'inductor'))
+            compiled = torch.compile(self.network, dynamic=False)
+
+        example = torch.rand(self._input.shape, dtype=self.dtype, device=self.device)
+        expected = self.network(example)
+        actual = compiled(example)
+        expected = expected[0] if isinstance(expected, (list, tuple)) else expected
+        actual = actual[0] if isinstance(actual, (list, tuple)) else actual
+        if not torch.allclose(expected, actual, atol=COMPILE_CHECK_ATOL):
+            raise RuntimeError("выход скомпилированной сети не совпадает с eager")
+        return compiled
+
+    def _letterbox(self, frame: np.ndarray) -> None:
+        """Кадр BGR → входной тензор (RGB, CHW, 0..1) в заранее выделенные буферы."""
+        geometry = self._geometry
+        new_h, new_w = geometry.resized_hw
+        region = self._canvas[geometry.top:geometry.top + new_h, geometry.left:geometry.left + new_w]
+        if (new_h, new_w) != frame.shape[:2]:
+            region[...] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        else:
+            region[...] = frame
+        # поля canvas не перезаписываются и остаются LETTERBOX_PAD_VALUE
+
+        image = torch.from_numpy(self._canvas).to(self.device, non_blocking=True)
+        self._input[0].copy_(image.permute(2, 0, 1).flip(0))  # HWC BGR → CHW RGB
+        self._input.div_(255.0)
+
+    @staticmethod
+    def _decode(prediction, conf: float, iou: float):
+        """
+        Выход сети (1, 4 + nc, A) → отобранные боксы после NMS по классам.
+
+        Returns:
+            tuple: (boxes xyxy, scores, class_ids) - тензоры в порядке убывания уверенности
+        """
+        if isinstance(prediction, (list, tuple)):
+            prediction = prediction[0]
+        candidates = prediction[0].transpose(0, 1)  # (A, 4 + nc)
+
+        scores, class_ids = candidates[:, 4:].max(1)
+        keep = scores > conf
+        boxes, scores, class_ids = candidates[keep, :4], scores[keep], class_ids[keep]
+        if scores.shape[0] > MAX_NMS:
+            order = scores.argsort(descending=True)[:MAX_NMS]
+            boxes, scores, class_ids = boxes[order], scores[order], class_ids[order]
+
+        # xywh (центр) → xyxy
+        xy, wh = boxes[:, :2], boxes[:, 2:] / 2
+        boxes = torch.cat((xy - wh, xy + wh), 1)
+
+        # NMS по классам одним вызовом: боксы разных классов разнесены смещением
+        offsets = class_ids.to(boxes.dtype)[:, None] * MAX_WH
+        index = torchvision.ops.nms(boxes + offsets, scores, iou)[:MAX_DET]
+        return boxes[index], scores[index], class_ids[index]
+
+    @torch.inference_mode()
+    def __call__(self, frame: np.ndarray, conf: float, iou: float) -> DetectionArrays:
+        """
+        Инференс на кадре.
+
+        Args:
+            frame: кадр BGR (h, w, 3)
+            conf: порог уверенности
+            iou: порог IoU для NMS
+
+        Returns:
+            DetectionArrays: детекции в координатах кадра
+        """
+        t0 = time.perf_counter()
+        frame_hw = frame.shape[:2]
+        if frame_hw != self._frame_hw:
+            self._prepare(frame_hw)
+        self._letterbox(frame)
+
+        t1 = time.perf_counter()
+        prediction = self.forward(self._input)
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize(self.device)
+
+        t2 = time.perf_counter()
+        arrays = self._to_arrays(prediction, conf, iou, frame_hw)
+
+        t3 = time.perf_counter()
+        self.last_timings = {
+            'preprocess': (t1 - t0) * 1000,
+            'forward': (t2 - t1) * 1000,
+            'postprocess': (t3 - t2) * 1000,
+        }
+        return arrays
+
+    def _to_arrays(self, prediction, conf: float, iou: float, frame_hw) -> DetectionArrays:
+        """Выход сети для одного кадра → DetectionArrays в координатах кадра."""
+        boxes, scores, class_ids = self._decode(prediction, conf, iou)
+        if scores.shape[0] == 0:
+            return DetectionArrays.empty()
+        return DetectionArrays(
+            scale_boxes_to_frame(boxes.float().cpu().numpy(), self._geometry, frame_hw),
+            scores.float().cpu().numpy(),
+            class_ids.cpu().numpy().astype(np.int64),
+        )
+
+    @torch.inference_mode()
+    def run_batch(self, frames: List[np.ndarray], conf: float, iou: float) -> List[DetectionArrays]:
+        """
+        Инференс пачки кадров одного размера одним прямым проходом сети.
+        Скомпилированная сеть подготовлена под вход (1, 3, H, W), поэтому пачка идет через eager.
+
+        Args:
+            frames: кадры BGR одного размера (h, w, 3)
+            conf: порог уверенности
+            iou: порог IoU для NMS
+
+        Returns:
+            list: DetectionArrays для каждого кадра (в порядке frames)
+        """
+        if len(frames) == 1:
+            return [self(frames[0], conf, iou)]
+
+        frame_hw = frames[0].shape[:2]
+        if frame_hw != self._frame_hw:
+            self._prepare(frame_hw)
+
+        shape = (len(frames),) + tuple(self._input.shape[1:])
+        if self._batch_input is None or tuple(self._batch_input.shape) != shape:
+            self._batch_input = torch.empty(shape, dtype=self.dtype, device=self.device)
+
+        for i, frame in enumerate(frames):
+            self._letterbox(frame)
+            self._batch_input[i].copy_(self._input[0])
+
+        prediction = self.network(self._batch_input)
+        if isinstance(prediction, (list, tuple)):
+            prediction = prediction[0]
+        return [self._to_arrays(prediction[i:i + 1], conf, iou, frame_hw) for i in range(len(frames))]
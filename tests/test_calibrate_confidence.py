@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+pytest.importorskip("ultralytics")
+pytest.importorskip("cv2")
+
+from modules.yolo_detector import YoloDetector
+from tools.calibrate_confidence import set_min_confidence
+
+
+def test_min_confidence_overrides_runtime():
+    """Тест: порог калибровки записывается в текущую модель детектора"""
+    detector = YoloDetector()
+    detector.runtime = SimpleNamespace(predict_confidence=0.42)
+    set_min_confidence(detector, 0.1)
+    assert detector.runtime.predict_confidence == 0.1
+    assert detector.predict_confidence == 0.1
+
+
+def test_min_confidence_without_model():
+    """Тест: без загруженной модели - понятная ошибка, а не запись в пустоту"""
+    detector = YoloDetector()
+    with pytest.raises(AttributeError):
+        set_min_confidence(detector, 0.1)
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import dataclasses
+import pytest
+from modules.all_card import all_card
+from modules.card_registry import CardRegistry, card_registry
+
+
+def test_lookups_match_linear_scan():
+    """Тест: поиск по каждому ключу совпадает с перебором all_card"""
+    for card in all_card:
+        assert card_registry.by_id(card.card_id) is card
+        for name, lookup in (
+            (card.class_name, card_registry.by_class_name),
+            (card.spell_my_hand_class_name, card_registry.by_hand_class_name),
+            (card.ability_class_name, card_registry.by_ability_class_name),
+        ):
+            if name:
+                assert lookup(name) is card
+                assert card_registry.by_any_name(name) is card
+    assert card_registry.by_class_name('missing') is None
+    assert card_registry.spell_class_names == {card.class_name for card in all_card if card.spell and card.class_name}
+
+
+def test_deck_is_copy_without_random():
+    """Тест: колода - копии карт без заглушки, изменение копии не меняет реестр"""
+    deck = card_registry.deck()
+    assert len(deck) == len(all_card) - 1
+    deck[0].cnt_evo += 1
+    assert card_registry.by_id(deck[0].card_id).cnt_evo == 0
+    with pytest.raises(AttributeError):
+        card_registry.cards = ()
+
+
+def test_duplicate_key_rejected():
+    """Тест: повтор class_name у двух карт - ошибка при построении"""
+    clone = dataclasses.replace(all_card[1], card_id=999)
+    with pytest.raises(ValueError):
+        CardRegistry(list(all_card) + [clone])
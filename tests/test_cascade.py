@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from modules.detection_postprocess import DetectionArrays
+from modules.cascade import (
+    build_crop_regions, new_object_mask, merge_region_detections, full_frame_scale, full_scale_side, crop_input_scale
+)
+
+
+def test_build_crop_regions():
+    """Тест: квадратные области внутри кадра, бокс внутри готовой области не создает новую"""
+    boxes = np.array([[0, 0, 20, 40], [10, 10, 30, 30], [300, 300, 340, 340]], dtype=np.float32)
+    regions = build_crop_regions(boxes, (400, 360), padding=0.5, min_side=64)
+    assert regions.tolist() == [[0, 0, 80, 80], [280, 280, 360, 360]]
+
+
+def test_build_crop_regions_limit():
+    """Тест: не больше max_regions областей"""
+    boxes = np.array([[i * 100, 0, i * 100 + 10, 10] for i in range(5)], dtype=np.float32)
+    assert len(build_crop_regions(boxes, (500, 500), max_regions=2, min_side=32)) == 2
+
+
+def test_new_object_mask():
+    """Тест: таймер без пары на прошлом кадре - новый"""
+    boxes = np.array([[0, 0, 10, 10], [50, 50, 60, 60]], dtype=np.float32)
+    previous = np.array([[1, 0, 11, 10]], dtype=np.float32)
+    assert new_object_mask(boxes, previous).tolist() == [False, True]
+    assert new_object_mask(boxes, np.zeros((0, 4), dtype=np.float32)).tolist() == [True, True]
+
+
+def test_merge_region_detections():
+    """Тест: внутри области остаются только детекции большой модели"""
+    base = DetectionArrays(
+        np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=np.float32),
+        np.array([0.4, 0.9], dtype=np.float32),
+        np.array([1, 2], dtype=np.int64),
+    )
+    refined = DetectionArrays(
+        np.array([[1, 1, 11, 11]], dtype=np.float32),
+        np.array([0.8], dtype=np.float32),
+        np.array([3], dtype=np.int64),
+    )
+    regions = np.array([[0, 0, 50, 50]], dtype=np.float32)
+    result = merge_region_detections(base, refined, regions)
+    assert result.class_ids.tolist() == [2, 3]
+
+
+def test_crop_scale_matches_full_frame():
+    """Тест: объект в области модель видит того же размера, что и на всем кадре (без увеличения)"""
+    frame_hw, crop_size, imgsz = (1700, 960), 256, 544
+    box = np.array([[400, 800, 430, 836]], dtype=np.float32)  # красный таймер 30x36
+    full_size = (box[0, 2:] - box[0, :2]) * full_frame_scale(frame_hw, imgsz)
+
+    side = full_scale_side(frame_hw, crop_size, imgsz)
+    regions = build_crop_regions(box, frame_hw, padding=0.5, min_side=max(128, side))
+    region_side = regions[0, 2] - regions[0, 0]
+    crop_size_box = (box[0, 2:] - box[0, :2]) * crop_input_scale(region_side, crop_size, frame_hw, imgsz)
+    np.testing.assert_allclose(crop_size_box, full_size, rtol=0.01)
+
+    # Маленькая область не растягивается на весь вход (вписывается с полями)
+    assert crop_input_scale(96, crop_size, frame_hw, imgsz) == full_frame_scale(frame_hw, imgsz)
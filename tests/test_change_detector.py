@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from modules.change_detector import ChangeDetector, label_blocks, square_tiles
+from modules.cascade import full_frame_scale, full_scale_side, crop_input_scale
+
+
+def test_label_blocks():
+    """Тест: две группы блоков - два прямоугольника"""
+    mask = np.zeros((6, 6), dtype=bool)
+    mask[0:2, 0:2] = True
+    mask[4, 3:6] = True
+    assert sorted(label_blocks(mask)) == [(0, 0, 2, 2), (4, 3, 5, 6)]
+
+
+def test_square_tiles():
+    """Тест: длинный прямоугольник покрывается квадратами внутри кадра"""
+    tiles = square_tiles((0, 0, 300, 100), (400, 400), max_side=128)
+    assert len(tiles) == 3
+    assert all(x2 - x1 == y2 - y1 == 128 for x1, y1, x2, y2 in tiles)
+    assert tiles[-1][2] == 300
+
+
+def test_update_regions():
+    """Тест: первый кадр полный, статичный кадр без областей, изменение - область вокруг него"""
+    detector = ChangeDetector(block_size=32, threshold=10, refresh_interval=100)
+    frame = np.zeros((320, 192, 3), dtype=np.uint8)
+    assert detector.update(frame) is None
+    assert len(detector.update(frame)) == 0
+
+    moved = frame.copy()
+    moved[100:120, 100:120] = 255
+    regions = detector.update(moved)
+    assert len(regions) == 1
+    x1, y1, x2, y2 = regions[0]
+    assert x1 <= 100 and y1 <= 100 and x2 >= 120 and y2 >= 120
+
+
+def test_update_full_frame():
+    """Тест: большая изменившаяся площадь и периодическое обновление - полный кадр"""
+    detector = ChangeDetector(block_size=32, threshold=10, max_area=0.5, refresh_interval=3)
+    frame = np.zeros((320, 192, 3), dtype=np.uint8)
+    detector.update(frame)
+    assert detector.update(np.full_like(frame, 200)) is None
+    assert detector.update(np.full_like(frame, 200)) is not None
+    assert detector.update(np.full_like(frame, 200)) is not None
+    assert detector.update(np.full_like(frame, 200)) is None
+
+
+def test_regions_at_full_frame_scale():
+    """Тест: маленькое изменение - квадрат заданной стороны (не растягивается на вход модели)"""
+    detector = ChangeDetector(block_size=32, threshold=10, refresh_interval=100)
+    frame = np.zeros((640, 384, 3), dtype=np.uint8)
+    detector.update(frame)
+    moved = frame.copy()
+    moved[300:310, 200:210] = 255
+    regions = detector.update(moved, max_side=200, min_side=200)
+    assert len(regions) == 1
+    x1, y1, x2, y2 = regions[0]
+    assert x2 - x1 == y2 - y1 == 200
+    assert x1 <= 200 and y1 <= 300 and x2 >= 210 and y2 >= 310
+
+
+def test_region_boxes_match_full_frame_scale():
+    """Тест: размер объекта во входе модели для области = размер при инференсе всего кадра"""
+    frame_hw, crop_size, imgsz = (1700, 960), 256, 544
+    detector = ChangeDetector(block_size=32, threshold=10, refresh_interval=100)
+    frame = np.zeros(frame_hw + (3,), dtype=np.uint8)
+    detector.update(frame)
+    moved = frame.copy()
+    moved[800:836, 400:430] = 255  # красный таймер 30x36
+
+    side = full_scale_side(frame_hw, crop_size, imgsz)
+    regions = detector.update(moved, side, side)
+    region_side = regions[0, 2] - regions[0, 0]
+    object_hw = np.array([36, 30])
+    np.testing.assert_allclose(
+        object_hw * crop_input_scale(region_side, crop_size, frame_hw, imgsz),
+        object_hw * full_frame_scale(frame_hw, imgsz),
+        rtol=0.01,
+    )
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from modules.all_card import all_card
+from modules.class_taxonomy import (
+    ClassTaxonomy,
+    check_class_compatibility,
+    classify_class_name,
+    CATEGORY_TECHNICAL,
+    CATEGORY_TIMER,
+    CATEGORY_LEVEL,
+    CATEGORY_LEVEL_CHAMPION,
+    CATEGORY_FIELD_SPELL,
+    CATEGORY_HAND_SPELL,
+    CATEGORY_ABILITY,
+    CATEGORY_EVOLUTION,
+    CATEGORY_UNIT,
+)
+
+
+@pytest.mark.parametrize("class_name,expected", [
+    ('_ timer red', CATEGORY_TIMER),
+    ('_ timer total', CATEGORY_TECHNICAL),
+    ('_ lvl red', CATEGORY_LEVEL),
+    ('_ lvl red cham', CATEGORY_LEVEL_CHAMPION),
+    ('_ evolution mark', CATEGORY_EVOLUTION),
+    ('_ start', CATEGORY_TECHNICAL),
+    ('_ bomb', CATEGORY_TECHNICAL),
+    ('SE rage', CATEGORY_FIELD_SPELL),
+    ('Z rage', CATEGORY_HAND_SPELL),
+    ('AC boss bandit', CATEGORY_ABILITY),
+    ('WC skeleton', CATEGORY_UNIT),
+    ('.WC boss bandit', CATEGORY_UNIT),
+    ('BR bomb tower', CATEGORY_UNIT),
+])
+def test_classify_class_name(class_name, expected):
+    """Тест: категория определяется по неймингу классов модели"""
+    assert classify_class_name(class_name) == expected
+
+
+@pytest.fixture
+def taxonomy():
+    """Таблица категорий для небольшой модели (class_id с пропуском)"""
+    class_names = {0: '_ timer red', 1: 'SE rage', 2: 'Z rage', 3: 'AC boss bandit', 5: 'WC new unit'}
+    return ClassTaxonomy(class_names, all_card)
+
+
+def test_taxonomy_categories(taxonomy):
+    """Тест: таблица индексируется по class_id"""
+    assert len(taxonomy) == 6
+    assert taxonomy.category(0) == CATEGORY_TIMER
+    assert taxonomy.category(1) == CATEGORY_FIELD_SPELL
+    assert taxonomy.category(5) == CATEGORY_UNIT
+    assert taxonomy.ids_of(CATEGORY_HAND_SPELL) == [2]
+    assert taxonomy.class_id('Z rage') == 2
+
+
+def test_taxonomy_cards(taxonomy):
+    """Тест: классы связаны с картами по всем трем неймингам"""
+    assert taxonomy.card(0) is None
+    assert taxonomy.card(1).card_name == "Rage"
+    assert taxonomy.card(2).card_name == "Rage"
+    assert taxonomy.card(3).card_name == "Boss Bandit"
+    assert taxonomy.card(5) is None
+
+
+def test_check_class_compatibility():
+    """Тест: пропавший служебный класс - ошибка, пропавший карточный - предупреждение"""
+    old = ClassTaxonomy({0: '_ timer red', 1: '_ start', 2: 'SE rage'}, all_card)
+    same = ClassTaxonomy({0: '_ start', 1: '_ timer red', 2: 'SE rage', 3: 'new class'}, all_card)
+    assert check_class_compatibility(old, same) == ([], [])
+
+    reduced = ClassTaxonomy({0: '_ timer red'}, all_card)
+    errors, warnings = check_class_compatibility(old, reduced)
+    assert errors == ["нет служебных классов: _ start"]
+    assert len(warnings) == 1
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+import pytest
+from modules.classes import TimerObject, ClassVoteWindow
+from modules.functions import group_class_name
+
+
+data_2 = [
+    ["sceleton", "sceleton", "rage"],
+    ["sceleton", "sceleton", "sceleton", "rage"],
+    ["sceleton", "sceleton"],
+    ["sceleton", "sceleton", "hunter"],
+    ["sceleton"],
+    ["sceleton", "bandit"],
+]
+
+
+@pytest.mark.parametrize("threshold", range(1, 8))
+def test_groups_match_group_class_name(threshold):
+    """Тест: группы окна совпадают с group_class_name (случаи tests/test_group_class_name.py)"""
+    window = ClassVoteWindow()
+    for row in data_2:
+        window.update(row, 1)
+    assert window.groups(threshold) == group_class_name(data_2, threshold)
+
+
+def test_sliding_window_matches_recomputation():
+    """Тест: окно timer_obj при добавлении/вытеснении timer_screen = пересчет group_class_name"""
+    rng = random.Random(1)
+    timer_obj = TimerObject()
+    for step in range(300):
+        if len(timer_obj) and rng.random() < 0.3:
+            timer_obj.del_last_screen()
+        else:
+            class_names = [rng.choice(['WC a', 'WC b', 'SE c', '_ bomb']) for _ in range(rng.randint(0, 4))]
+            timer_obj.add_first_screen([[], [], [], class_names])
+
+        rows = [timer_screen[3] for timer_screen in timer_obj if timer_screen[3]]
+        for threshold in (1, 2, 3):
+            assert timer_obj.class_votes.groups(threshold) == group_class_name(rows, threshold)
+
+    while len(timer_obj):
+        timer_obj.del_last_screen()
+    assert not timer_obj.class_votes
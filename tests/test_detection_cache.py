@@ -0,0 +1,77 @@
+import sys
+import os
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from modules.detection_postprocess import DetectionArrays
+from modules.detection_cache import DetectionCache, encode_arrays, decode_arrays
+
+
+def make_arrays(count):
+    """Случайные детекции"""
+    rng = np.random.default_rng(count)
+    return DetectionArrays(
+        rng.uniform(0, 500, size=(count, 4)).astype(np.float32),
+        rng.uniform(0, 1, size=count).astype(np.float32),
+        rng.integers(0, 80, size=count).astype(np.int64),
+    )
+
+
+def test_encode_decode_roundtrip():
+    """Тест: запись без потерь"""
+    arrays = make_arrays(7)
+    restored = decode_arrays(encode_arrays(arrays))
+    assert np.array_equal(restored.boxes, arrays.boxes)
+    assert np.array_equal(restored.scores, arrays.scores)
+    assert np.array_equal(restored.class_ids, arrays.class_ids)
+    assert len(decode_arrays(encode_arrays(DetectionArrays.empty()))) == 0
+
+
+def test_key_depends_on_frame_and_params():
+    """Тест: ключ меняется от содержимого кадра и параметров инференса"""
+    frame = np.zeros((32, 16, 3), dtype=np.uint8)
+    key = DetectionCache.make_key(frame, "model", 544, 0.42, 0.85)
+    assert key == DetectionCache.make_key(frame.copy(), "model", 544, 0.42, 0.85)
+    assert key != DetectionCache.make_key(frame, "model", 640, 0.42, 0.85)
+    assert key != DetectionCache.make_key(frame, "other", 544, 0.42, 0.85)
+    frame[0, 0, 0] = 1
+    assert key != DetectionCache.make_key(frame, "model", 544, 0.42, 0.85)
+
+
+def test_get_put(tmp_path):
+    """Тест: промах, запись, попадание"""
+    cache = DetectionCache(str(tmp_path))
+    assert cache.get("abc") is None
+    cache.put("abc", make_arrays(3))
+    assert len(cache.get("abc")) == 3
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction(tmp_path):
+    """Тест: при превышении лимита удаляются самые давно использованные записи"""
+    record_size = len(encode_arrays(make_arrays(100)))
+    cache = DetectionCache(str(tmp_path), max_size_mb=record_size * 3.5 / 1024 / 1024)
+
+    for i, key in enumerate(["k1", "k2", "k3"]):
+        cache.put(key, make_arrays(100))
+        os.utime(cache._path(key), (i, i))
+
+    cache.get("k1")  # k1 становится самой свежей записью
+    cache.put("k4", make_arrays(100))
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") is not None
+    assert cache.get("k4") is not None
+    assert cache.size <= cache.max_size
+
+
+def test_overwrite_keeps_size(tmp_path):
+    """Тест: повторная запись того же ключа не увеличивает размер кэша"""
+    cache = DetectionCache(str(tmp_path))
+    cache.put("abc", make_arrays(10))
+    size = cache.size
+    cache.put("abc", make_arrays(10))
+    assert cache.size == size
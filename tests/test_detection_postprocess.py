@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+from modules.detection_postprocess import (
+    DetectionArrays,
+    build_class_thresholds,
+    filter_by_class_confidence,
+    iou_matrix,
+    match_to_labels,
+    derive_class_thresholds,
+    build_nms_groups,
+    suppress_duplicates,
+)
+from modules.class_taxonomy import CATEGORY_UNIT, CATEGORY_TIMER, CATEGORY_TECHNICAL
+
+
+@pytest.fixture
+def arrays():
+    """Детекции кадра: 4 объекта трех классов"""
+    return DetectionArrays(
+        np.array([[0, 0, 10, 10], [0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50]], dtype=np.float32),
+        np.array([0.9, 0.3, 0.5, 0.35], dtype=np.float32),
+        np.array([0, 1, 1, 2], dtype=np.int64),
+    )
+
+
+def test_build_class_thresholds():
+    """Тест: переопределение порогов по class_name"""
+    thresholds = build_class_thresholds({0: "a", 1: "b", 2: "c"}, 0.42, {"b": 0.25, "x": 0.1})
+    assert thresholds.tolist() == pytest.approx([0.42, 0.25, 0.42])
+
+
+def test_filter_by_class_confidence(arrays):
+    """Тест: каждая детекция сравнивается с порогом своего класса"""
+    thresholds = np.array([0.42, 0.25, 0.42], dtype=np.float32)
+    result = filter_by_class_confidence(arrays, thresholds)
+    assert len(result) == 3
+    assert result.class_ids.tolist() == [0, 1, 1]
+
+
+def test_filter_empty():
+    """Тест: пустой кадр"""
+    result = filter_by_class_confidence(DetectionArrays.empty(), np.array([0.5], dtype=np.float32))
+    assert len(result) == 0
+
+
+def test_iou_matrix():
+    """Тест: матрица IoU"""
+    a = np.array([[0, 0, 10, 10], [5, 0, 15, 10]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [100, 100, 110, 110]], dtype=np.float32)
+    result = iou_matrix(a, b)
+    assert result.shape == (2, 2)
+    assert result[0, 0] == pytest.approx(1.0)
+    assert result[1, 0] == pytest.approx(1 / 3, abs=0.01)
+    assert result[:, 1].tolist() == [0.0, 0.0]
+
+
+def test_match_to_labels(arrays):
+    """Тест: совпадение только с разметкой своего класса, один объект разметки - одна детекция"""
+    label_boxes = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+    label_class_ids = np.array([0, 1], dtype=np.int64)
+    is_tp = match_to_labels(arrays, label_boxes, label_class_ids)
+    assert is_tp.tolist() == [True, False, True, False]
+
+
+def test_derive_class_thresholds():
+    """Тест: порог отсекает ложные детекции с низкой уверенностью"""
+    scores = np.array([0.9, 0.8, 0.7, 0.3, 0.2], dtype=np.float32)
+    class_ids = np.zeros(5, dtype=np.int64)
+    is_tp = np.array([True, True, True, False, False])
+    thresholds = derive_class_thresholds(scores, class_ids, is_tp, {0: 3, 1: 2})
+    assert thresholds[0] == pytest.approx(0.7)
+    # класс без единой детекции получает минимальный порог
+    assert thresholds[1] == pytest.approx(0.1)
+
+
+@pytest.fixture
+def nms_groups():
+    """Группы: юниты сливаются между классами, таймеры - нет"""
+    class_names = ['WC skeleton', 'WL bandit', '_ timer red', '_ start']
+    categories = [CATEGORY_UNIT, CATEGORY_UNIT, CATEGORY_TIMER, CATEGORY_TECHNICAL]
+    groups = {
+        'units': {'categories': ['unit/building'], 'iou': 0.7, 'cross_iou': 0.5},
+        'timers': {'categories': ['timer'], 'iou': 0.5, 'cross_iou': None},
+    }
+    return build_nms_groups(class_names, categories, groups, default_iou=0.85)
+
+
+def test_build_nms_groups(nms_groups):
+    """Тест: классы вне групп попадают в группу 0 (default)"""
+    assert nms_groups.group_of_class.tolist() == [1, 1, 2, 0]
+    assert nms_groups.names == ['default', 'units', 'timers']
+
+
+def test_suppress_cross_class_duplicate(nms_groups):
+    """Тест: дубль разных классов одной группы - остается метка с максимальной уверенностью"""
+    arrays = DetectionArrays(
+        np.array([[0, 0, 10, 10], [1, 0, 11, 10], [0, 0, 10, 10]], dtype=np.float32),
+        np.array([0.6, 0.8, 0.9], dtype=np.float32),
+        np.array([0, 1, 2], dtype=np.int64),
+    )
+    result = suppress_duplicates(arrays, nms_groups)
+    # таймер в другой группе не подавляет юнита
+    assert result.class_ids.tolist() == [2, 1]
+
+
+def test_suppress_same_class_threshold(nms_groups):
+    """Тест: дубли одного класса подавляются только при IoU выше порога группы"""
+    arrays = DetectionArrays(
+        np.array([[0, 0, 10, 10], [2, 0, 12, 10], [0, 0, 10, 10], [2, 0, 12, 10]], dtype=np.float32),
+        np.array([0.9, 0.8, 0.9, 0.8], dtype=np.float32),
+        np.array([0, 0, 2, 2], dtype=np.int64),
+    )
+    # IoU = 8/12 = 0.67: юниты (порог 0.7) остаются, таймеры (порог 0.5) сливаются
+    result = suppress_duplicates(arrays, nms_groups)
+    assert sorted(result.class_ids.tolist()) == [0, 0, 2]
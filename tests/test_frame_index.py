@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+from modules.frame_index import FrameIndex
+
+
+def random_detections(count, seed=0):
+    """Детекции со случайными боксами трех категорий"""
+    rng = random.Random(seed)
+    detections = []
+    for number in range(count):
+        x1, y1 = rng.uniform(0, 500), rng.uniform(0, 800)
+        detections.append({
+            'class_name': f"class {number % 5}",
+            'category': number % 3,
+            'bbox': [x1, y1, x1 + rng.uniform(5, 80), y1 + rng.uniform(5, 80)],
+        })
+    return detections
+
+
+def test_intersecting_matches_linear_scan():
+    """Тест: пересечение с зоной как при линейном проходе (порядок кадра, касание - пересечение)"""
+    detections = random_detections(200)
+    index = FrameIndex(detections, cell_size=50)
+    rng = random.Random(1)
+    for _ in range(50):
+        zx1, zy1 = rng.uniform(-50, 500), rng.uniform(-50, 800)
+        zone = (zx1, zy1, zx1 + rng.uniform(10, 300), zy1 + rng.uniform(10, 300))
+        expected = [
+            det for det in detections if det['category'] in (0, 2) and not (
+                det['bbox'][2] < zone[0] or det['bbox'][0] > zone[2] or
+                det['bbox'][3] < zone[1] or det['bbox'][1] > zone[3]
+            )
+        ]
+        assert index.intersecting(zone, (0, 2)) == expected
+
+
+def test_centers_in_zone():
+    """Тест: центр бокса в зоне, включая границы"""
+    detections = [
+        {'class_name': 'a', 'category': 1, 'bbox': [0, 0, 20, 20]},    # центр (10, 10) на границе
+        {'class_name': 'b', 'category': 1, 'bbox': [0, 0, 100, 100]},  # пересекает, центр вне зоны
+        {'class_name': 'c', 'category': 2, 'bbox': [12, 12, 16, 16]},  # другая категория
+    ]
+    index = FrameIndex(detections)
+    assert [det['class_name'] for det in index.centers_in((10, 10, 40, 40), (1,))] == ['a']
+    assert [det['class_name'] for det in index.intersecting((10, 10, 40, 40), (1,))] == ['a', 'b']
+
+
+def test_buckets():
+    """Тест: выборка по категории и классу"""
+    index = FrameIndex(random_detections(10))
+    assert len(index.of_category(0)) == 4
+    assert index.has_class('class 4') and not index.has_class('_ finish')
+    assert index.of_category(7) == [] and index.intersecting((0, 0, 10, 10), (7,)) == []
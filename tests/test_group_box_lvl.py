@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+from modules.classes import TimerObject
+from modules.functions import group_box_lvl, iou_box
+
+
+def greedy_group_box_lvl(timer_obj, threshold=3, iou_threshold=0.7):
+    """Прежняя жадная группировка (эталон для случаев без цепочек)"""
+    all_boxes = [box for timer_screen in timer_obj for box in timer_screen[2]]
+    used = [False] * len(all_boxes)
+    sizes = []
+    for i, box_i in enumerate(all_boxes):
+        if used[i]:
+            continue
+        used[i] = True
+        size = 1
+        for j, box_j in enumerate(all_boxes):
+            if not used[j] and iou_box(box_i, box_j) >= iou_threshold:
+                used[j] = True
+                size += 1
+        sizes.append(size)
+    return sum(1 for size in sizes if size >= threshold)
+
+
+def screens(*box_lvl_lists):
+    return [[[], [], list(box_lvl), []] for box_lvl in box_lvl_lists]
+
+
+def test_docstring_example():
+    """Тест: пример из docstring - одна группа из 3 боксов"""
+    timer_obj = screens([[100, 200, 120, 220], [102, 198, 118, 222]], [[101, 201, 119, 221]])
+    assert group_box_lvl(timer_obj, threshold=3) == 1
+    assert group_box_lvl(timer_obj, threshold=4) == 0
+    assert group_box_lvl(timer_obj, threshold=1, iou_threshold=0.8) == greedy_group_box_lvl(timer_obj, 1, 0.8)
+    assert group_box_lvl([], threshold=1) == 0
+
+
+def test_matches_greedy_on_separated_levels():
+    """Тест: далеко стоящие уровни (без цепочек) - как у жадной группировки, для TimerObject тоже"""
+    rng = random.Random(3)
+    for _ in range(50):
+        centers = [(rng.uniform(0, 600), rng.uniform(0, 900)) for _ in range(rng.randint(1, 5))]
+        rows = []
+        for _ in range(6):
+            rows.append([[x + rng.uniform(-1, 1), y + rng.uniform(-1, 1), x + 20, y + 20]
+                         for x, y in centers if rng.random() < 0.7])
+        timer_obj = TimerObject()
+        for row in reversed(rows):
+            timer_obj.add_first_screen([[], [], row, []])
+        for threshold in (1, 3, 5):
+            expected = greedy_group_box_lvl(screens(*rows), threshold)
+            assert group_box_lvl(screens(*rows), threshold) == expected
+            assert group_box_lvl(timer_obj, threshold) == expected
+
+
+def test_order_independent_chain():
+    """Тест: цепочка A~B~C (A и C не похожи) - одна группа при любом порядке боксов"""
+    chain = [[0, 0, 20, 20], [2, 0, 22, 20], [4, 0, 24, 20]]
+    assert iou_box(chain[0], chain[2]) < 0.7 <= iou_box(chain[0], chain[1])
+    for order in ([0, 1, 2], [1, 0, 2], [2, 0, 1]):
+        timer_obj = screens(*[[chain[k]] for k in order])
+        assert group_box_lvl(timer_obj, threshold=3) == 1
+
+
+def test_crowded_arena():
+    """Тест: десятки box_lvl в окне - по группе на каждый уровень"""
+    rng = random.Random(5)
+    centers = [(60 * k, 40 * (k % 3)) for k in range(12)]
+    rows = [[[x + rng.uniform(-1, 1), y, x + 20, y + 16] for x, y in centers] for _ in range(6)]
+    rng.shuffle(rows)
+    assert group_box_lvl(screens(*rows), threshold=6) == 12
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from modules.hand_classifier import HandSlotClassifier, embed
+from modules.class_taxonomy import CATEGORY_HAND_SPELL
+
+SLOTS = [(0.0, 0.5, 0.5, 1.0), (0.5, 0.5, 1.0, 1.0)]
+
+
+def card_image(rng):
+    """Картинка карты 400x330: крупные цветные пятна"""
+    return np.kron(rng.integers(0, 256, (8, 6, 3), dtype=np.uint8), np.ones((50, 55, 1), dtype=np.uint8))
+
+
+def make_templates():
+    """Три карты-эталона: два заклинания и одна обычная карта"""
+    rng = np.random.default_rng(0)
+    return [('Z rage', card_image(rng)), ('Z the log', card_image(rng)), (None, card_image(rng))]
+
+
+def place(frame, slot, image):
+    """Уменьшенная картинка карты в слот кадра (выборка пикселей, как при масштабировании экрана)"""
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = int(slot[0] * w), int(slot[1] * h), int(slot[2] * w), int(slot[3] * h)
+    rows = np.linspace(0, image.shape[0] - 1, y2 - y1).astype(int)
+    cols = np.linspace(0, image.shape[1] - 1, x2 - x1).astype(int)
+    frame[y1:y2, x1:x2] = image[rows][:, cols]
+
+
+def test_embed_normalized():
+    """Тест: вектор с нулевым средним и единичной нормой, не зависит от яркости"""
+    image = np.random.default_rng(1).integers(0, 200, (60, 50, 3), dtype=np.uint8)
+    vector = embed(image)
+    assert abs(float(vector.mean())) < 1e-5
+    assert abs(float(np.linalg.norm(vector)) - 1) < 1e-5
+    assert np.allclose(embed(image + 40), vector, atol=1e-5)
+
+
+def test_classify_slots():
+    """Тест: заклинание в слоте распознано, обычная карта в слоте - None"""
+    templates = make_templates()
+    classifier = HandSlotClassifier(templates, SLOTS, threshold=0.8)
+
+    frame = np.zeros((240, 200, 3), dtype=np.uint8)
+    place(frame, SLOTS[0], templates[1][1])
+    place(frame, SLOTS[1], templates[2][1])
+
+    labels = [label for label, _ in classifier.classify(frame)]
+    assert labels == ['Z the log', None]
+
+
+def test_detect_format():
+    """Тест: детекции в формате YoloDetector с категорией заклинаний в руке"""
+    templates = make_templates()
+    classifier = HandSlotClassifier(templates, SLOTS)
+
+    frame = np.zeros((240, 200, 3), dtype=np.uint8)
+    place(frame, SLOTS[1], templates[0][1])
+
+    detections = classifier.detect(frame)
+    assert len(detections) == 1
+    assert detections[0]['class_name'] == 'Z rage'
+    assert detections[0]['category'] == CATEGORY_HAND_SPELL
+    assert detections[0]['bbox'] == [100, 120, 200, 240]
+
+
+def test_empty_slot():
+    """Тест: пустой (однотонный) слот не распознается"""
+    classifier = HandSlotClassifier(make_templates(), SLOTS)
+    frame = np.full((240, 200, 3), 90, dtype=np.uint8)
+    assert classifier.detect(frame) == []
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from modules.imgsz_controller import ImgszController
+
+
+def make_controller(**kwargs):
+    params = dict(sizes=(448, 544, 640), budget_ms=100, initial=544, down_ratio=0.9, up_ratio=0.6, hold_frames=3)
+    params.update(kwargs)
+    return ImgszController(**params)
+
+
+def test_predict_scales_by_pixels():
+    """Тест: время незамеренного размера - от ближайшего замеренного по числу пикселей"""
+    controller = make_controller()
+    assert controller.predict(640) is None
+    controller.update(320, 10.0)
+    assert controller.predict(640) == pytest.approx(40.0)
+
+
+def test_down_immediately_on_overrun():
+    """Тест: превышение бюджета - уменьшение размера на том же кадре"""
+    controller = make_controller()
+    controller.update(544, 95.0)
+    assert controller.choose() == 448
+
+
+def test_remaining_budget_limits_size():
+    """Тест: остаток времени кадра меньше бюджета - размер уменьшается"""
+    controller = make_controller()
+    controller.update(544, 50.0)
+    assert controller.choose() == 544
+    assert controller.choose(remaining_ms=40) == 448
+
+
+def test_hysteresis_no_oscillation():
+    """Тест: вверх только после hold_frames кадров и с запасом по времени, без колебаний"""
+    controller = make_controller()
+    controller.update(448, 40.0)
+    controller.update(544, 58.0)
+    controller.update(640, 75.0)  # 75 > 0.6 * 100 - на 640 не переходим, хотя в бюджет укладывается
+
+    sizes = [controller.choose() for _ in range(20)]
+    assert set(sizes) == {544}
+    assert controller.switches == 0
+
+
+def test_up_after_hold():
+    """Тест: в простое размер увеличивается после hold_frames кадров"""
+    controller = make_controller()
+    controller.update(544, 30.0)
+    controller.update(640, 45.0)
+    sizes = [controller.choose() for _ in range(5)]
+    assert sizes == [544, 544, 544, 640, 640]
+
+
+def test_invalid_ratios():
+    """Тест: up_ratio >= down_ratio - нет гистерезиса"""
+    with pytest.raises(ValueError):
+        make_controller(up_ratio=0.9)
@@ -0,0 +1,129 @@
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+from modules.detection_postprocess import DetectionArrays
+from modules.detection_cache import decode_arrays
+from modules.inference_server import (
+    InferenceServer,
+    connect,
+    parse_address,
+    send_frame_request,
+    send_info_request,
+    recv_response,
+)
+
+
+class FakeDetector:
+    """Детектор без модели: одна детекция на кадр, class_id = значение первого пикселя"""
+
+    def __init__(self):
+        self.runtime = SimpleNamespace(
+            class_names={0: '_ start', 1: 'WC skeleton'}, model_hash='abc', model_path='', generation=0
+        )
+        self.batch_sizes = []
+
+    def poll_model_file(self):
+        return False
+
+    def detect_raw_batch(self, frames):
+        self.batch_sizes.append(len(frames))
+        return [
+            DetectionArrays(
+                np.array([[0, 0, frame.shape[1], frame.shape[0]]], dtype=np.float32),
+                np.array([0.9], dtype=np.float32),
+                np.array([frame[0, 0, 0]], dtype=np.int64),
+            )
+            for frame in frames
+        ]
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Сервер на Unix-сокете во временной папке"""
+    detector = FakeDetector()
+    server = InferenceServer(detector, str(tmp_path / "yolo.sock"), max_batch=4, max_wait_ms=50)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while not server._running:
+        time.sleep(0.01)
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def test_parse_address():
+    """Тест: host:port - TCP, иначе путь к Unix-сокету"""
+    assert parse_address("127.0.0.1:47650")[1] == ("127.0.0.1", 47650)
+    assert parse_address("/tmp/yolo.sock")[1] == "/tmp/yolo.sock"
+
+
+def test_info_and_frame(server):
+    """Тест: классы модели и детекции кадра через сокет"""
+    with connect(server.address, timeout=5) as sock:
+        send_info_request(sock)
+        _, data = recv_response(sock)
+        assert json.loads(data)['class_names'] == {'0': '_ start', '1': 'WC skeleton'}
+
+        frame = np.ones((20, 10, 3), dtype=np.uint8)
+        send_frame_request(sock, frame)
+        generation, data = recv_response(sock)
+        arrays = decode_arrays(data)
+        assert generation == 0
+        assert arrays.class_ids.tolist() == [1]
+        assert arrays.boxes.tolist() == [[0, 0, 10, 20]]
+
+
+def test_info_generation_from_runtime_snapshot(server):
+    """Тест: поколение и классы в ответе MSG_INFO - из одного снимка detector.runtime (поле generation модели)"""
+    with connect(server.address, timeout=5) as sock:
+        send_info_request(sock)
+        recv_response(sock)  # поколение 0 в кэше ответов
+
+        server.detector.runtime = SimpleNamespace(
+            class_names={0: 'WC skeleton'}, model_hash='def', model_path='', generation=1
+        )
+        send_info_request(sock)
+        generation, data = recv_response(sock)
+        info = json.loads(data)
+        assert generation == info['generation'] == 1
+        assert (info['class_names'], info['model_hash']) == ({'0': 'WC skeleton'}, 'def')
+
+
+def test_client_detect_raw_asks_server(server):
+    """Тест: detect_raw клиента идет на сервер (модели в процессе клиента нет)"""
+    pytest.importorskip("ultralytics")
+    from modules.inference_client import InferenceClient
+
+    client = InferenceClient(server.address, timeout=5)
+    client.cache = None
+    assert client.load_model()
+    arrays = client.detect_raw(np.ones((20, 10, 3), dtype=np.uint8))
+    assert arrays.class_ids.tolist() == [1]
+
+
+def test_requests_batched_across_clients(server):
+    """Тест: кадры нескольких клиентов попадают в одну пачку"""
+    results = {}
+
+    def client(index):
+        with connect(server.address, timeout=5) as sock:
+            send_frame_request(sock, np.full((8, 8, 3), index, dtype=np.uint8))
+            results[index] = decode_arrays(recv_response(sock)[1]).class_ids.tolist()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == {0: [0], 1: [1], 2: [2]}
+    assert max(server.detector.batch_sizes) > 1
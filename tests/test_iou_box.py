@@ -5,7 +5,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
-from modules.functions import iou_box
+from modules.functions import iou_box, iou_box_matrix
 
 
 # Фикстура с тестовыми данными
@@ -98,3 +98,14 @@ def test_distance_cases(arg_boxes, box_pair, expected_low):
         assert result < 0.5, f"IoU для {box_pair} должен быть низким"
     else:
         assert result >= 0.2, f"IoU для {box_pair} должен быть выше"
+
+
+@pytest.mark.parametrize('alpha, sigma', [(1, 0.9), (0.5, 0.5), (0, 0.9), (0.5, 0)])
+def test_matrix_matches_pairwise(arg_boxes, alpha, sigma):
+    """Тест: матрица iou_box_matrix совпадает с попарными iou_box (вкл. вырожденные боксы)"""
+    boxes = list(arg_boxes.values()) + [(5, 5, 5, 9)]
+    matrix = iou_box_matrix(boxes, boxes[::-1], alpha=alpha, sigma=sigma)
+    assert matrix.shape == (len(boxes), len(boxes))
+    for i, box_a in enumerate(boxes):
+        for j, box_b in enumerate(boxes[::-1]):
+            assert matrix[i, j] == pytest.approx(iou_box(box_a, box_b, alpha=alpha, sigma=sigma), abs=1e-12)
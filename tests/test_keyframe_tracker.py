@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import numpy as np
+
+pytest.importorskip("cv2")
+
+from modules.keyframe_tracker import KeyframePropagator, box_grid_points, median_shifts
+from modules.detection_postprocess import DetectionArrays
+
+
+def textured_frame(x, y):
+    """Кадр 160x160 с текстурным квадратом 40x40 в точке (x, y)"""
+    frame = np.full((160, 160, 3), 40, dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    patch = np.kron(rng.integers(80, 255, (8, 8)), np.ones((5, 5))).astype(np.uint8)
+    frame[y:y + 40, x:x + 40] = patch[:, :, None]
+    return frame
+
+
+def test_box_grid_points():
+    """Тест: сетка точек в центральной части каждого бокса"""
+    boxes = np.array([[0, 0, 40, 40], [100, 100, 120, 140]], dtype=np.float32)
+    points = box_grid_points(boxes, grid=3, inner=0.5)
+    assert points.shape == (18, 2)
+    assert points[:9, 0].min() > 10 and points[:9, 0].max() < 30
+    assert points[9:, 1].min() > 110 and points[9:, 1].max() < 130
+
+
+def test_median_shifts_drops_lost_boxes():
+    """Тест: смещение - медиана отслеженных точек, бокс без точек потерян"""
+    old = np.zeros((6, 2), dtype=np.float32)
+    new = np.array([[2, 1], [2, 1], [50, 50], [0, 0], [0, 0], [0, 0]], dtype=np.float32)
+    valid = np.array([True, True, True, False, False, True])
+    shifts, tracked = median_shifts(old, new, valid, per_box=3, min_points=2)
+    assert tracked.tolist() == [True, False]
+    assert shifts[0].tolist() == [2, 1]
+
+
+def test_propagate_follows_motion():
+    """Тест: бокс следует за объектом, класс сохраняется, уверенность затухает"""
+    propagator = KeyframePropagator(interval=3, decay=0.9, flow_scale=1.0)
+    first = textured_frame(40, 40)
+    assert propagator.is_keyframe(first)
+    arrays = DetectionArrays(
+        np.array([[40, 40, 80, 80]], dtype=np.float32), np.array([0.8], dtype=np.float32), np.array([5])
+    )
+    propagator.set_keyframe(first, arrays)
+
+    second = textured_frame(44, 42)
+    assert not propagator.is_keyframe(second)
+    moved = propagator.propagate(second)
+    assert moved.class_ids.tolist() == [5]
+    assert moved.scores[0] == pytest.approx(0.72)
+    np.testing.assert_allclose(moved.boxes[0], [44, 42, 84, 82], atol=1.0)
+
+    # Порог класса выше затухшей уверенности - уверенность останавливается на пороге, бокс остается
+    assert not propagator.is_keyframe(textured_frame(48, 44))
+    kept = propagator.propagate(textured_frame(48, 44), np.array([0.7] * 6, dtype=np.float32))
+    assert kept.class_ids.tolist() == [5]
+    assert kept.scores[0] == pytest.approx(0.7)
+
+    # Интервал ключевых кадров
+    assert propagator.is_keyframe(textured_frame(52, 46))
+
+
+def test_detection_just_above_threshold_does_not_flicker():
+    """Тест: детекция чуть выше порога класса есть на всех промежуточных кадрах"""
+    propagator = KeyframePropagator(interval=10, decay=0.9, flow_scale=1.0)
+    thresholds = np.array([0.5] * 6, dtype=np.float32)
+    first = textured_frame(40, 40)
+    propagator.is_keyframe(first)
+    propagator.set_keyframe(first, DetectionArrays(
+        np.array([[40, 40, 80, 80]], dtype=np.float32), np.array([0.52], dtype=np.float32), np.array([5])
+    ))
+
+    for step in range(1, 6):
+        frame = textured_frame(40 + step, 40)
+        assert not propagator.is_keyframe(frame)
+        moved = propagator.propagate(frame, thresholds)
+        assert len(moved) == 1
+        assert moved.scores[0] == pytest.approx(0.5)
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+from modules.static_mask import StaticMask
+
+
+def test_edge_bands_cropped():
+    """Тест: полосы маски по краям кадра обрезаются, внутренние области закрашиваются"""
+    mask = StaticMask([(0.0, 0.0, 1.0, 0.1), (0.0, 0.9, 1.0, 1.0), (0.4, 0.5, 0.6, 0.6)])
+    frame = np.full((100, 50, 3), 7, dtype=np.uint8)
+
+    masked, offset = mask.apply(frame)
+    assert offset == (0, 10)
+    assert masked.shape == (80, 50, 3)
+    assert (masked[40:50, 20:30] == 114).all()
+    assert (masked[:40] == 7).all()
+    assert (frame == 7).all()  # исходный кадр не изменен
+    assert mask.cropped_fraction((100, 50)) == pytest.approx(0.2)
+
+
+def test_scaled_imgsz_keeps_scale():
+    """Тест: размер входа уменьшается пропорционально длинной стороне (кратно 32)"""
+    mask = StaticMask([(0.0, 0.0, 1.0, 0.25)])
+    assert mask.scaled_imgsz(544, (1700, 960)) == 416  # 544 * 1275 / 1700 = 408 → 416
+    assert StaticMask([(0.0, 0.0, 0.1, 0.1)]).scaled_imgsz(544, (1700, 960)) == 544
+
+
+def test_restore_offsets_boxes():
+    """Тест: боксы обрезанного кадра → координаты всего кадра"""
+    boxes = np.array([[1, 2, 3, 4]], dtype=np.float32)
+    StaticMask.restore(boxes, (10, 20))
+    assert boxes.tolist() == [[11, 22, 13, 24]]
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+from modules.classes import TimerObject, TIMER_OBJ_CAPACITY
+from modules.functions import cnt_box_timer
+
+
+def random_screen(rng):
+    """timer_screen со случайными box_timer, box_lvl и class_name"""
+    box_timer = [[1, 2, 3, 4]] if rng.random() < 0.5 else []
+    box_lvl = [[0, 0, 5, 5]] * rng.randint(0, 2)
+    class_names = [rng.choice(['WC a', 'WC b', 'Z c']) for _ in range(rng.randint(0, 3))]
+    return [box_timer, [], box_lvl, class_names]
+
+
+def test_ring_buffer_order_and_counts():
+    """Тест: порядок как у списка (новый спереди), счетчики окна совпадают с пересчетом"""
+    rng = random.Random(0)
+    timer_obj = TimerObject()
+    reference = []
+    for step in range(100):
+        if reference and rng.random() < 0.4:
+            timer_obj.del_last_screen()
+            reference.pop()
+        else:
+            screen = random_screen(rng)
+            timer_obj.add_first_screen(screen)
+            reference.insert(0, screen)
+            del reference[TIMER_OBJ_CAPACITY:]
+
+        assert list(timer_obj) == reference
+        assert len(timer_obj) == len(reference) <= TIMER_OBJ_CAPACITY
+        assert cnt_box_timer(timer_obj) == cnt_box_timer(reference)
+        assert timer_obj.lvl_box_count == sum(len(screen[2]) for screen in reference)
+        votes = {}
+        for screen in reference:
+            for class_name in set(screen[3]):
+                votes[class_name] = votes.get(class_name, 0) + 1
+        assert dict(timer_obj.class_votes) == votes
+        if reference:
+            assert timer_obj[0] is reference[0] and timer_obj[-1] is reference[-1]
+
+
+def test_equal_fields_are_different_timers():
+    """Тест: timer_obj с одинаковыми атрибутами - разные объекты (remove по объекту)"""
+    first, second = TimerObject(time_first_screen=1.0), TimerObject(time_first_screen=1.0)
+    assert first != second
+    timer_list = [first, second]
+    timer_list.remove(second)
+    assert timer_list[0] is first
@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+from modules.detection_postprocess import DetectionArrays
+from modules.tracker import ByteTracker, greedy_match, optimal_match
+
+
+def frame(boxes, scores, class_ids):
+    """Детекции кадра из списков"""
+    return DetectionArrays(
+        np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+        np.asarray(scores, dtype=np.float32),
+        np.asarray(class_ids, dtype=np.int64),
+    )
+
+
+def test_greedy_match_best_pairs_first():
+    """Тест: сначала сопоставляется пара с максимальным скором"""
+    scores = np.array([[0.5, 0.9], [0.4, 0.8]])
+    rows, cols = greedy_match(scores, 0.3)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+
+
+def test_track_ids_are_stable():
+    """Тест: смещенный объект сохраняет track_id, новый объект получает новый"""
+    tracker = ByteTracker()
+    ids_1 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [0]))
+    ids_2 = tracker.update(frame([[1, 1, 11, 11], [50, 50, 60, 60]], [0.9, 0.9], [0, 0]))
+    assert ids_2[0] == ids_1[0]
+    assert ids_2[1] != ids_1[0]
+
+
+def test_low_confidence_second_stage():
+    """Тест: детекция с низкой уверенностью продлевает существующий трек"""
+    tracker = ByteTracker(high_confidence=0.6)
+    ids_1 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [0]))
+    ids_2 = tracker.update(frame([[2, 0, 12, 10]], [0.45], [0]))
+    assert ids_2[0] == ids_1[0]
+
+
+def test_different_classes_not_matched():
+    """Тест: другой класс в том же месте - другой трек"""
+    tracker = ByteTracker()
+    ids_1 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [0]))
+    ids_2 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [1]))
+    assert ids_2[0] != ids_1[0]
+
+
+@pytest.mark.parametrize("gap,same_id", [(3, True), (4, False)])
+def test_lost_track_expires(gap, same_id):
+    """Тест: трек живет max_lost кадров без подтверждения"""
+    tracker = ByteTracker(max_lost=3)
+    ids_1 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [0]))
+    for _ in range(gap):
+        tracker.update(DetectionArrays.empty())
+    ids_2 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [0]))
+    assert (ids_2[0] == ids_1[0]) == same_id
+
+
+def test_remap_classes_keeps_track_ids():
+    """Тест: после замены модели трек сохраняет track_id, классы без пары удаляются"""
+    tracker = ByteTracker()
+    ids_1 = tracker.update(frame([[0, 0, 10, 10], [50, 50, 60, 60]], [0.9, 0.9], [0, 1]))
+    tracker.remap_classes(np.array([5, -1], dtype=np.int64))
+    assert len(tracker) == 1
+    ids_2 = tracker.update(frame([[0, 0, 10, 10]], [0.9], [5]))
+    assert ids_2[0] == ids_1[0]
+
+
+def test_optimal_match_no_stealing():
+    """Тест: оптимальное сопоставление не отдает общую пару первой строке (в отличие от жадного)"""
+    scores = np.array([[0.9, 0.8], [0.85, 0.1]])
+    rows, cols = greedy_match(scores, 0.3)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+    rows, cols = optimal_match(scores, 0.3)
+    assert list(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+
+
+def test_optimal_match_brute_force():
+    """Тест: сумма скоров равна максимуму перебором, пары ниже порога не сопоставляются"""
+    import itertools
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        n, m = rng.integers(1, 5, size=2)
+        scores = rng.random((n, m))
+        rows, cols = optimal_match(scores, 0.5)
+        assert len(set(rows.tolist())) == rows.size and len(set(cols.tolist())) == cols.size
+        assert (scores[rows, cols] >= 0.5).all()
+        gated = np.where(scores >= 0.5, scores, 0.0)
+        if n > m:
+            gated = gated.T
+        best = max(sum(gated[i, p[i]] for i in range(len(p)))
+                   for p in itertools.permutations(range(gated.shape[1]), gated.shape[0]))
+        assert scores[rows, cols].sum() == pytest.approx(best)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк режимов исполнения сети (eager / TorchScript / torch.compile) на CPU.
+
+Для каждого режима готовит DirectYoloRunner под размер кадра, прогревает его
+и замеряет время прямого прохода сети и полного инференса кадра.
+Кадры - записанные скриншоты (--frames) или синтетический шум размера --shape.
+
+Запуск:
+    python tools/benchmark_compile.py --frames recordings/match_01
+    python tools/benchmark_compile.py --shape 720x405 --runs 200 --json bench_compile.json
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+import cv2
+import numpy as np
+from ultralytics import YOLO  # type: ignore
+
+from modules.yolo_direct import DirectYoloRunner, COMPILE_MODES
+from modules.detection_cache import file_hash
+from config import MODEL_PATH, YOLO_IMG_SIZE, YOLO_CONFIDENCE, YOLO_IOU, YOLO_COMPILE_DIR
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+WARMUP_RUNS = 5
+
+
+def load_frames(args):
+    """Кадры для замера: из папки или синтетические."""
+    if args.frames:
+        paths = sorted(p for p in Path(args.frames).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        frames = [frame for frame in (cv2.imread(str(p)) for p in paths) if frame is not None]
+        return frames[:args.runs]
+
+    width, height = (int(v) for v in args.shape.lower().split('x'))
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8) for _ in range(8)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк режимов исполнения сети YOLO")
+    parser.add_argument('--frames', default=None, help="папка с записанными кадрами")
+    parser.add_argument('--shape', default="720x405", help="размер синтетического кадра ШxВ (без --frames)")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--runs', type=int, default=100, help="количество замеров на режим")
+    parser.add_argument('--json', default=None, help="файл для сохранения результатов")
+    args = parser.parse_args()
+
+    frames = load_frames(args)
+    if not frames:
+        logger.error("Нет кадров для замера")
+        return
+
+    model_hash = file_hash(args.model)
+    report = {'frames_shape': list(frames[0].shape), 'modes': {}}
+
+    for mode in COMPILE_MODES:
+        name = mode or "eager"
+        runner = DirectYoloRunner(YOLO(args.model), YOLO_IMG_SIZE, mode, YOLO_COMPILE_DIR, model_hash)
+
+        for i in range(WARMUP_RUNS):
+            runner(frames[i % len(frames)], YOLO_CONFIDENCE, YOLO_IOU)
+        compiled = runner.forward is not runner.network
+
+        forward_ms, total_ms = [], []
+        for i in range(args.runs):
+            runner(frames[i % len(frames)], YOLO_CONFIDENCE, YOLO_IOU)
+            timings = runner.last_timings
+            forward_ms.append(timings['forward'])
+            total_ms.append(timings['preprocess'] + timings['forward'] + timings['postprocess'])
+
+        report['modes'][name] = {
+            'active': mode is None or compiled,  # False - режим не собрался, замерен eager
+            'forward_ms_p50': float(np.percentile(forward_ms, 50)),
+            'forward_ms_p95': float(np.percentile(forward_ms, 95)),
+            'total_ms_p50': float(np.percentile(total_ms, 50)),
+        }
+
+    eager = report['modes']['eager']['forward_ms_p50']
+    print(f"Кадр: {report['frames_shape']}, замеров на режим: {args.runs}")
+    print(f"{'режим':14}{'forward p50':>13}{'forward p95':>13}{'total p50':>11}{'к eager':>10}")
+    for name, row in report['modes'].items():
+        status = "" if row['active'] else "  (не собран, eager)"
+        print(f"{name:14}{row['forward_ms_p50']:>13.2f}{row['forward_ms_p95']:>13.2f}"
+              f"{row['total_ms_p50']:>11.2f}{eager / row['forward_ms_p50']:>9.2f}x{status}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
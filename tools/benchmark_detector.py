@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк YoloDetector: матрица способов инференса × размеров входа × потоков CPU.
+
+Каждая комбинация прогоняет записанные кадры через инференс и постобработку детектора
+(без трекера и кэша) и замеряет задержку кадра (p50/p95/p99), пропускную способность,
+пиковую память процесса (RSS) и совпадение детекций с эталонной комбинацией
+(тот же класс, IoU >= --iou). Результаты сохраняются в JSON для сравнения запусков.
+
+Способы инференса: predict (model.predict ultralytics), direct (прямой вызов сети, eager),
+torchscript / compile (прямой вызов сети с компиляцией, см. YOLO_COMPILE_MODE).
+
+Запуск:
+    python tools/benchmark_detector.py --frames recordings/match_01
+    python tools/benchmark_detector.py --frames recordings/match_01 --backends predict,direct,torchscript \\
+        --imgsz 448,544,640 --threads 2,4,8 --json bench/detector_2026-10-19.json
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+try:
+    import resource  # пиковая память процесса (нет на Windows)
+except ImportError:
+    resource = None
+
+import cv2
+import numpy as np
+import torch  # type: ignore
+
+from modules.yolo_detector import YoloDetector, _thread_candidates
+from modules.yolo_direct import DirectYoloRunner
+from modules.detection_postprocess import iou_matrix
+from modules.tracker import greedy_match
+from config import MODEL_PATH, YOLO_IMG_SIZE, YOLO_COMPILE_MODE, YOLO_COMPILE_DIR
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+BACKENDS = ('predict', 'direct', 'torchscript', 'compile')
+WARMUP_RUNS = 3
+
+
+class PredictRunner:
+    """model.predict() с интерфейсом DirectYoloRunner (размер входа отличается от YOLO_IMG_SIZE)."""
+
+    def __init__(self, detector, imgsz):
+        self.detector = detector
+        self.imgsz = imgsz
+        self.last_timings = {}
+
+    def __call__(self, frame, conf, iou):
+        arrays, self.last_timings = self.detector._infer_predict(frame, self.detector.runtime, self.imgsz)
+        return arrays
+
+
+def make_runner(detector, backend, imgsz):
+    """Способ инференса для комбинации."""
+    if backend == 'predict':
+        return PredictRunner(detector, imgsz)
+    compile_mode = None if backend == 'direct' else backend
+    return DirectYoloRunner(detector.model, imgsz, compile_mode, YOLO_COMPILE_DIR, detector.model_hash)
+
+
+def install_runner(detector, runner):
+    """
+    Способ инференса комбинации - единственный у модели: _runner_for вернет именно его
+    (без подмены прямым инференсом YOLO_IMG_SIZE из size_runners, общими для всех комбинаций).
+    """
+    detector.runtime.runner = runner
+    detector.runtime.size_runners = {runner.imgsz: runner}
+
+
+def runner_backend(runner):
+    """Способ инференса, который фактически выполнялся (compile/torchscript могут откатиться на eager)."""
+    if isinstance(runner, PredictRunner):
+        return 'predict'
+    return runner.compile_mode or 'direct'
+
+
+def peak_rss_mb():
+    """
+    Пиковая память процесса (МБ), None если не поддерживается.
+    Пик не убывает: у каждой комбинации - максимум на момент ее окончания.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024  # macOS - байты, Linux - КБ
+
+
+def match_count(reference, candidate, iou_threshold):
+    """Количество совпавших детекций (тот же класс, IoU >= порога)."""
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0
+    ious = iou_matrix(reference.boxes, candidate.boxes)
+    ious[reference.class_ids[:, None] != candidate.class_ids[None, :]] = 0.0
+    rows, _ = greedy_match(ious, iou_threshold)
+    return int(rows.size)
+
+
+def percentiles(values):
+    """p50 / p95 / p99 списка времен (мс)."""
+    return {f'p{q}': float(np.percentile(values, q)) for q in (50, 95, 99)}
+
+
+def parse_list(value, cast=str):
+    """Список значений аргумента через запятую."""
+    return [cast(v) for v in value.split(',') if v.strip()]
+
+
+def run_combination(detector, frames, runs, imgsz):
+    """
+    Прогон кадров: задержка кадра (инференс + постобработка) и детекции после постобработки.
+
+    Returns:
+        tuple: (задержки мс, forward мс, детекции по кадрам)
+    """
+    for i in range(WARMUP_RUNS):
+        detector._postprocess(detector._infer(frames[i % len(frames)], imgsz=imgsz))
+
+    latencies, forwards, results = [], [], []
+    for i in range(runs):
+        frame = frames[i % len(frames)]
+        started = time.perf_counter()
+        arrays = detector._postprocess(detector._infer(frame, imgsz=imgsz))
+        latencies.append((time.perf_counter() - started) * 1000)
+        forwards.append(detector.last_timings.get('forward', 0.0))
+        if i < len(frames):
+            results.append(arrays)
+    return latencies, forwards, results
+
+
+def main():
+    default_backends = ['predict', 'direct'] + ([YOLO_COMPILE_MODE] if YOLO_COMPILE_MODE else [])
+
+    parser = argparse.ArgumentParser(description="Бенчмарк YoloDetector: способы инференса × imgsz × потоки")
+    parser.add_argument('--frames', required=True, help="папка с записанными кадрами")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--backends', default=','.join(default_backends), help=f"через запятую из {BACKENDS}")
+    parser.add_argument('--imgsz', default=str(YOLO_IMG_SIZE), help="размеры входа через запятую")
+    parser.add_argument('--threads', default=None, help="количество потоков через запятую (по умолчанию - как при подборе)")
+    parser.add_argument('--runs', type=int, default=None, help="замеров на комбинацию (по умолчанию - все кадры)")
+    parser.add_argument('--iou', type=float, default=0.5, help="минимальный IoU совпадающих детекций")
+    parser.add_argument('--json', default="benchmark_detector.json", help="файл для сохранения результатов")
+    args = parser.parse_args()
+
+    backends = parse_list(args.backends)
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"неизвестные способы инференса: {sorted(unknown)}")
+    sizes = parse_list(args.imgsz, int)
+    threads = parse_list(args.threads, int) if args.threads else _thread_candidates()
+
+    paths = sorted(p for p in Path(args.frames).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    frames = [frame for frame in (cv2.imread(str(p)) for p in paths) if frame is not None]
+    if not frames:
+        logger.error("Нет кадров в %s", args.frames)
+        return
+    runs = args.runs or len(frames)
+
+    detector = YoloDetector(args.model)
+    detector.tracker = None
+    detector.cache = None
+    if not detector.load_model():
+        return
+
+    report = {
+        'host': socket.gethostname(),
+        'model': args.model,
+        'model_hash': detector.model_hash,
+        'frames': len(frames),
+        'frame_shape': list(frames[0].shape),
+        'runs': runs,
+        'reference': None,
+        'results': [],
+    }
+    reference = None  # детекции эталонной (первой) комбинации по кадрам
+
+    print(f"Кадров: {len(frames)} {list(frames[0].shape)}, замеров на комбинацию: {runs}")
+    print(f"{'backend':13}{'imgsz':>6}{'threads':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'fps':>8}{'RSS, МБ':>9}{'совпад.':>9}")
+
+    for backend in backends:
+        for imgsz in sizes:
+            # С маской интерфейса _infer уменьшает размер входа - runner под фактический размер
+            effective_imgsz = imgsz
+            if detector.static_mask is not None:
+                effective_imgsz = detector.static_mask.scaled_imgsz(imgsz, frames[0].shape[:2])
+            runner = make_runner(detector, backend, effective_imgsz)
+            install_runner(detector, runner)
+            for thread_count in threads:
+                torch.set_num_threads(thread_count)
+                latencies, forwards, results = run_combination(detector, frames, runs, imgsz)
+                ran = detector._runner_for(detector.runtime, effective_imgsz)
+
+                detections = sum(len(arrays) for arrays in results)
+                if reference is None:
+                    reference = results
+                    report['reference'] = {'backend': backend, 'imgsz': imgsz, 'threads': thread_count}
+                matched = sum(match_count(ref, cand, args.iou) for ref, cand in zip(reference, results))
+                reference_total = sum(len(arrays) for arrays in reference)
+
+                row = {
+                    'backend': backend,
+                    'imgsz': imgsz,
+                    'threads': thread_count,
+                    'ran_backend': runner_backend(ran),  # фактически выполнявшийся способ и размер входа
+                    'ran_imgsz': ran.imgsz,
+                    'latency_ms': percentiles(latencies),
+                    'forward_ms': percentiles(forwards),
+                    'throughput_fps': len(latencies) / (sum(latencies) / 1000),
+                    'peak_rss_mb': peak_rss_mb(),
+                    'detections': detections,
+                    'agreement': matched / max(reference_total, detections, 1),
+                }
+                report['results'].append(row)
+
+                rss = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else "-"
+                print(f"{backend:13}{imgsz:>6}{thread_count:>8}{row['latency_ms']['p50']:>9.2f}"
+                      f"{row['latency_ms']['p95']:>9.2f}{row['latency_ms']['p99']:>9.2f}"
+                      f"{row['throughput_fps']:>8.1f}{rss:>9}{row['agreement']:>9.2%}")
+
+    Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк подавления дублей (suppress_duplicates) против текущего вывода детектора.
+
+Прогоняет записанные кадры через модель один раз, затем сравнивает:
+    - "до":    детекции после порогов уверенности (вывод без групп NMS)
+    - "после": детекции после подавления дублей по группам классов
+Считает детекции, красные таймеры, заклинания на поле, пары дублей разных классов
+и время самой стадии на кадр.
+
+Запуск:
+    python tools/benchmark_postprocess.py --frames recordings/match_01
+    python tools/benchmark_postprocess.py --frames recordings/match_01 --json bench_postprocess.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+import cv2
+import numpy as np
+
+from modules.yolo_detector import YoloDetector
+from modules.class_taxonomy import CATEGORY_TIMER, CATEGORY_FIELD_SPELL
+from modules.detection_postprocess import (
+    filter_by_class_confidence,
+    build_nms_groups,
+    suppress_duplicates,
+    iou_matrix,
+)
+from config import MODEL_PATH, YOLO_IOU, YOLO_NMS_GROUPS
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def count_cross_class_pairs(arrays, group_of_class, iou_threshold=0.5):
+    """Количество пар детекций разных классов одной группы с IoU >= iou_threshold (дубли)."""
+    if len(arrays) < 2:
+        return 0
+    ious = iou_matrix(arrays.boxes, arrays.boxes)
+    group = group_of_class[arrays.class_ids]
+    pairs = (ious >= iou_threshold) & (group[:, None] == group[None, :]) & (arrays.class_ids[:, None] != arrays.class_ids[None, :])
+    return int(np.triu(pairs, 1).sum())
+
+
+def summarize(arrays, categories, group_of_class):
+    """Сводка по детекциям одного кадра."""
+    frame_categories = categories[arrays.class_ids]
+    return np.array([
+        len(arrays),
+        int((frame_categories == CATEGORY_TIMER).sum()),
+        int((frame_categories == CATEGORY_FIELD_SPELL).sum()),
+        count_cross_class_pairs(arrays, group_of_class),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк подавления дублей по группам классов")
+    parser.add_argument('--frames', required=True, help="папка с записанными кадрами")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--json', default=None, help="файл для сохранения результатов")
+    args = parser.parse_args()
+
+    frames = sorted(p for p in Path(args.frames).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not frames:
+        logger.error("Нет кадров в %s", args.frames)
+        return
+
+    detector = YoloDetector(args.model)
+    if not detector.load_model():
+        return
+
+    groups = build_nms_groups(detector.taxonomy.class_names, detector.taxonomy.categories, YOLO_NMS_GROUPS, YOLO_IOU)
+    categories = np.asarray(detector.taxonomy.categories)
+
+    before_total = np.zeros(4, dtype=np.int64)
+    after_total = np.zeros(4, dtype=np.int64)
+    stage_ms = []
+
+    for frame_path in frames:
+        frame = cv2.imread(str(frame_path))
+        if frame is None:
+            continue
+
+        before = filter_by_class_confidence(detector.detect_raw(frame), detector.class_thresholds)
+
+        start = time.perf_counter()
+        after = suppress_duplicates(before, groups)
+        stage_ms.append((time.perf_counter() - start) * 1000)
+
+        before_total += summarize(before, categories, groups.group_of_class)
+        after_total += summarize(after, categories, groups.group_of_class)
+
+    labels = ['detections', 'timer_red', 'field_spells', 'cross_class_pairs']
+    report = {
+        'frames': len(stage_ms),
+        'before': dict(zip(labels, before_total.tolist())),
+        'after': dict(zip(labels, after_total.tolist())),
+        'stage_ms_p50': float(np.percentile(stage_ms, 50)),
+        'stage_ms_p95': float(np.percentile(stage_ms, 95)),
+    }
+
+    print(f"Кадров: {report['frames']}")
+    print(f"{'':20}{'до':>10}{'после':>10}")
+    for label in labels:
+        print(f"{label:20}{report['before'][label]:>10}{report['after'][label]:>10}")
+    print(f"Время стадии: p50 = {report['stage_ms_p50']:.3f} мс, p95 = {report['stage_ms_p95']:.3f} мс")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк сопоставления красных таймеров кадра с timer_obj.
+
+На синтетических кадрах (timer_obj + смещенные красные таймеры, часть таймеров рядом
+друг с другом - розыгрыши вплотную) сравнивает:
+    - "first":   прежний поиск - первый timer_obj по порядку со скором iou_box >= порога
+    - "greedy":  матрица скоров + жадное сопоставление (greedy_match)
+    - "optimal": матрица скоров + оптимальное сопоставление (optimal_match)
+Считает время на кадр (мкс, p50/p99), число кадров с ошибкой сопоставления и кадров,
+где один timer_obj отдан двум таймерам (перехват).
+
+Запуск:
+    python tools/benchmark_timer_matching.py
+    python tools/benchmark_timer_matching.py --loads 3x4,8x12,16x24 --frames 2000 --json bench_timers.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+import numpy as np
+
+from modules.classes import TimerObject
+from modules.functions import iou_box
+from modules.tracker import greedy_match, optimal_match
+from modules.timer_processor import timer_match_scores, first_box_timer, TIMER_MATCH_THRESHOLD
+
+
+def parse_loads(value):
+    """Нагрузки "таймеров x timer_obj,..." → [(3, 4), ...]"""
+    return [tuple(int(v) for v in load.split('x')) for load in value.split(',') if load.strip()]
+
+
+def make_frame(rng, timers, objects, close_fraction=0.3):
+    """
+    Синтетический кадр: timer_obj и красные таймеры (смещенные боксы первых timers объектов).
+
+    Returns:
+        tuple: (box_timer кадра, timer_obj, истинный индекс timer_obj для каждого таймера)
+    """
+    boxes = []
+    for _ in range(objects):
+        if boxes and rng.random() < close_fraction:
+            # Розыгрыш вплотную к другому таймеру
+            x, y = boxes[rng.integers(len(boxes))][:2] + rng.normal(0, 6, 2)
+        else:
+            x, y = rng.uniform(0, 680), rng.uniform(0, 980)
+        boxes.append(np.array([x, y, x + 20, y + 24]))
+
+    timer_list = []
+    for box in boxes:
+        timer_obj = TimerObject()
+        timer_obj.add_first_screen([[box.tolist()], [], [], []])
+        timer_list.append(timer_obj)
+
+    truth = rng.permutation(objects)[:timers]
+    new_boxes = [(boxes[k] + np.tile(rng.normal(0, 1.0, 2), 2)).tolist() for k in truth]
+    return new_boxes, timer_list, truth
+
+
+def match_first(new_boxes, timer_list):
+    """Прежний поиск: первый timer_obj по порядку выше порога (без учета уже занятых)."""
+    known = [first_box_timer(timer_obj) for timer_obj in timer_list]
+    result = []
+    for box in new_boxes:
+        found = -1
+        for k, search_box in enumerate(known):
+            if search_box and iou_box(search_box, box, alpha=0.5, sigma=0.5) >= TIMER_MATCH_THRESHOLD:
+                found = k
+                break
+        result.append(found)
+    return result
+
+
+def match_matrix(new_boxes, timer_list, matcher):
+    """Матрица скоров + сопоставление один-к-одному."""
+    scores = timer_match_scores(new_boxes, timer_list)
+    rows, cols = matcher(scores, TIMER_MATCH_THRESHOLD)
+    result = [-1] * len(new_boxes)
+    for row, col in zip(rows, cols):
+        result[row] = int(col)
+    return result
+
+
+def percentiles(values):
+    """p50/p99 (мкс)"""
+    values = np.asarray(values) * 1e6
+    return {'p50': float(np.percentile(values, 50)), 'p99': float(np.percentile(values, 99))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сопоставления красных таймеров с timer_obj")
+    parser.add_argument('--loads', default='3x4,8x12,16x24', help="нагрузки: таймеров x timer_obj через запятую")
+    parser.add_argument('--frames', type=int, default=1000, help="кадров на нагрузку")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', default=None, help="файл для сохранения результатов")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    methods = {
+        'first': match_first,
+        'greedy': lambda boxes, timers: match_matrix(boxes, timers, greedy_match),
+        'optimal': lambda boxes, timers: match_matrix(boxes, timers, optimal_match),
+    }
+
+    report = []
+    for timers, objects in parse_loads(args.loads):
+        frames = [make_frame(rng, timers, objects) for _ in range(args.frames)]
+        row = {'timers': timers, 'objects': objects, 'frames': args.frames}
+        for name, method in methods.items():
+            latencies, wrong, stolen = [], 0, 0
+            for new_boxes, timer_list, truth in frames:
+                started = time.perf_counter()
+                result = method(new_boxes, timer_list)
+                latencies.append(time.perf_counter() - started)
+                matched = [k for k in result if k >= 0]
+                stolen += len(matched) != len(set(matched))
+                wrong += any(k != t for k, t in zip(result, truth))
+            row[name] = {'us': percentiles(latencies), 'wrong_frames': wrong, 'stolen_frames': stolen}
+        report.append(row)
+
+        print(f"Таймеров {timers} x timer_obj {objects}:")
+        for name in methods:
+            stats = row[name]
+            print(f"  {name:8s} p50 {stats['us']['p50']:7.1f} мкс, p99 {stats['us']['p99']:7.1f} мкс, "
+                  f"ошибок {stats['wrong_frames']}/{args.frames}, перехватов {stats['stolen_frames']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Калибровка порогов уверенности по классам на размеченных кадрах.
+
+Кадры и разметка в формате экспорта Roboflow (YOLO):
+    <dataset>/images/*.png|jpg
+    <dataset>/labels/*.txt   ("class_id cx cy w h" в долях кадра)
+
+Результат - JSON файл {class_name: threshold}, который читает YoloDetector (YOLO_CLASS_CONFIDENCE_PATH).
+
+Запуск:
+    python tools/calibrate_confidence.py --dataset recordings/valid
+    python tools/calibrate_confidence.py --dataset recordings/valid --beta 2 --out class_confidence.json
+"""
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+from collections import Counter
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+import cv2
+import numpy as np
+
+from modules.yolo_detector import YoloDetector
+from modules.detection_postprocess import (
+    match_to_labels,
+    derive_class_thresholds,
+    save_class_thresholds,
+    labels_from_yolo_txt,
+)
+from config import MODEL_PATH, YOLO_CLASS_CONFIDENCE_PATH
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def set_min_confidence(detector, min_conf):
+    """Порог самой модели = нижняя граница калибровки (детекции ниже порогов классов тоже нужны)."""
+    detector.predict_confidence = min_conf
+
+
+def main():
+    """
+    1. Загрузка модели с минимальным порогом уверенности
+    2. Инференс на всех размеченных кадрах, сопоставление с разметкой
+    3. Подбор порога для каждого класса (максимум F-beta)
+    4. Сохранение порогов в JSON
+    """
+    parser = argparse.ArgumentParser(description="Калибровка порогов уверенности по классам")
+    parser.add_argument('--dataset', required=True, help="папка с подпапками images/ и labels/")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--out', default=YOLO_CLASS_CONFIDENCE_PATH, help="файл для сохранения порогов")
+    parser.add_argument('--iou', type=float, default=0.5, help="IoU для true positive")
+    parser.add_argument('--beta', type=float, default=1.0, help="вес recall в F-мере")
+    parser.add_argument('--min-conf', type=float, default=0.1, help="нижняя граница порога")
+    parser.add_argument('--max-conf', type=float, default=0.9, help="верхняя граница порога")
+    args = parser.parse_args()
+
+    dataset = Path(args.dataset)
+    images = sorted(p for p in (dataset / 'images').iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not images:
+        logger.error("Нет кадров в %s", dataset / 'images')
+        return
+
+    # 1. Загрузка модели (порог модели = нижняя граница калибровки)
+    detector = YoloDetector(args.model)
+    if not detector.load_model():
+        return
+    set_min_confidence(detector, args.min_conf)
+
+    # 2. Инференс и сопоставление с разметкой
+    all_scores, all_class_ids, all_tp = [], [], []
+    label_counts: Counter = Counter()
+
+    for image_path in images:
+        frame = cv2.imread(str(image_path))
+        if frame is None:
+            logger.warning("Не удалось прочитать кадр %s", image_path)
+            continue
+
+        height, width = frame.shape[:2]
+        label_boxes, label_class_ids = labels_from_yolo_txt(str(dataset / 'labels' / (image_path.stem + '.txt')), width, height)
+        label_counts.update(label_class_ids.tolist())
+
+        arrays = detector.detect_raw(frame)
+        all_scores.append(arrays.scores)
+        all_class_ids.append(arrays.class_ids)
+        all_tp.append(match_to_labels(arrays, label_boxes, label_class_ids, args.iou))
+
+    # 3. Подбор порогов
+    thresholds = derive_class_thresholds(
+        np.concatenate(all_scores),
+        np.concatenate(all_class_ids),
+        np.concatenate(all_tp),
+        dict(label_counts),
+        beta=args.beta,
+        min_threshold=args.min_conf,
+        max_threshold=args.max_conf,
+    )
+
+    # 4. Сохранение
+    save_class_thresholds(args.out, thresholds, detector.class_names)
+
+    print(f"Кадров: {len(images)}, классов с разметкой: {len(thresholds)}")
+    for class_id, thr in sorted(thresholds.items(), key=lambda x: x[1]):
+        print(f"  {thr:.3f}  {detector.class_names[class_id]}  (объектов: {label_counts[class_id]})")
+    print(f"Пороги сохранены в {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Проверка статической маски интерфейса на записанных кадрах.
+
+Прогоняет кадры через детектор без маски и с маской (YOLO_STATIC_MASK или --mask)
+и сравнивает: размер входа сети, время инференса, совпадение детекций после
+постобработки (тот же класс, IoU >= --iou). Детекции без маски с центром в закрытой
+области считаются отдельно - это классы, которые маска закрывает по ошибке.
+
+Запуск:
+    python tools/check_static_mask.py --frames recordings/match_01
+    python tools/check_static_mask.py --frames recordings/match_01 --mask "0,0,1,0.05;0,0.95,1,1" --json mask.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+import cv2
+import numpy as np
+
+from modules.yolo_detector import YoloDetector
+from modules.yolo_direct import letterbox_geometry
+from modules.static_mask import StaticMask
+from modules.cascade import box_centers, points_in_regions
+from modules.detection_postprocess import iou_matrix
+from modules.tracker import greedy_match
+from config import MODEL_PATH, YOLO_IMG_SIZE, YOLO_STATIC_MASK
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def parse_mask(value):
+    """Области маски "x1,y1,x2,y2;..." (доли ROI)."""
+    return [tuple(float(v) for v in rect.split(',')) for rect in value.split(';') if rect.strip()]
+
+
+def match_count(reference, candidate, iou_threshold):
+    """Количество совпавших детекций (тот же класс, IoU >= порога)."""
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0
+    ious = iou_matrix(reference.boxes, candidate.boxes)
+    ious[reference.class_ids[:, None] != candidate.class_ids[None, :]] = 0.0
+    rows, _ = greedy_match(ious, iou_threshold)
+    return int(rows.size)
+
+
+def run(detector, frames):
+    """Детекции после постобработки и время инференса (мс) по кадрам."""
+    results, latencies = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        arrays = detector._postprocess(detector._infer(frame))
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(arrays)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка статической маски интерфейса")
+    parser.add_argument('--frames', required=True, help="папка с записанными кадрами")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--mask', default=None, help="области маски x1,y1,x2,y2;... (по умолчанию YOLO_STATIC_MASK)")
+    parser.add_argument('--iou', type=float, default=0.5, help="минимальный IoU совпадающих детекций")
+    parser.add_argument('--json', default=None, help="файл для сохранения результатов")
+    args = parser.parse_args()
+
+    rects = parse_mask(args.mask) if args.mask else YOLO_STATIC_MASK
+    if not rects:
+        logger.error("Маска не задана (YOLO_STATIC_MASK пуст, --mask не указан)")
+        return
+
+    paths = sorted(p for p in Path(args.frames).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    frames = [frame for frame in (cv2.imread(str(p)) for p in paths) if frame is not None]
+    if not frames:
+        logger.error("Нет кадров в %s", args.frames)
+        return
+
+    detector = YoloDetector(args.model)
+    detector.tracker = None
+    detector.cache = None
+    if not detector.load_model():
+        return
+
+    mask = StaticMask(rects)
+    frame_hw = frames[0].shape[:2]
+    x1, y1, x2, y2 = mask.crop_box(frame_hw)
+    full_input = letterbox_geometry(frame_hw, YOLO_IMG_SIZE).input_hw
+    mask_input = letterbox_geometry((y2 - y1, x2 - x1), mask.scaled_imgsz(YOLO_IMG_SIZE, frame_hw)).input_hw
+
+    # Прогрев обоих вариантов (буферы и сеть под размер входа)
+    for static_mask in (None, mask):
+        detector.static_mask = static_mask
+        run(detector, frames[:3])
+
+    detector.static_mask = None
+    reference, reference_ms = run(detector, frames)
+    detector.static_mask = mask
+    masked, masked_ms = run(detector, frames)
+
+    # Детекции без маски с центром в закрытых областях
+    masked_regions = np.array([
+        [rx1 * frame_hw[1], ry1 * frame_hw[0], rx2 * frame_hw[1], ry2 * frame_hw[0]] for rx1, ry1, rx2, ry2 in rects
+    ], dtype=np.float32)
+    inside = sum(int(points_in_regions(box_centers(arrays.boxes), masked_regions).any(axis=1).sum())
+                 for arrays in reference)
+
+    reference_total = sum(len(arrays) for arrays in reference)
+    masked_total = sum(len(arrays) for arrays in masked)
+    matched = sum(match_count(ref, cand, args.iou) for ref, cand in zip(reference, masked))
+
+    report = {
+        'frames': len(frames),
+        'frame_shape': list(frames[0].shape),
+        'mask': [list(rect) for rect in rects],
+        'crop': [x1, y1, x2, y2],
+        'input_hw': {'square': [YOLO_IMG_SIZE, YOLO_IMG_SIZE], 'rect': list(full_input), 'masked': list(mask_input)},
+        'input_pixels_saved': {
+            'rect_vs_square': 1 - full_input[0] * full_input[1] / YOLO_IMG_SIZE ** 2,
+            'masked_vs_rect': 1 - mask_input[0] * mask_input[1] / (full_input[0] * full_input[1]),
+        },
+        'latency_ms_p50': {'no_mask': float(np.median(reference_ms)), 'mask': float(np.median(masked_ms))},
+        'detections': {'no_mask': reference_total, 'mask': masked_total, 'matched': matched,
+                       'no_mask_inside_mask': inside},
+        'agreement': matched / max(reference_total - inside, masked_total, 1),
+    }
+
+    print(f"Кадров: {len(frames)} {list(frames[0].shape)}, обрезка до {report['crop']}")
+    print(f"Вход сети: квадрат {YOLO_IMG_SIZE}x{YOLO_IMG_SIZE} → прямоугольный {full_input[1]}x{full_input[0]} "
+          f"(-{report['input_pixels_saved']['rect_vs_square']:.0%}) → с маской {mask_input[1]}x{mask_input[0]} "
+          f"(-{report['input_pixels_saved']['masked_vs_rect']:.0%})")
+    print(f"Время p50: без маски {report['latency_ms_p50']['no_mask']:.1f} мс, "
+          f"с маской {report['latency_ms_p50']['mask']:.1f} мс")
+    print(f"Детекций: без маски {reference_total} (в закрытых областях {inside}), с маской {masked_total}, "
+          f"совпало {matched} ({report['agreement']:.2%} вне маски)")
+    if inside:
+        print("ВНИМАНИЕ: маска закрывает детекции модели - проверьте области YOLO_STATIC_MASK")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
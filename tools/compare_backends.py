@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Сравнение способов инференса: model.predict() ultralytics против прямого вызова сети.
+
+Прогоняет записанные кадры через оба способа и проверяет совпадение детекций
+(тот же класс, IoU >= --iou, разница уверенности <= --conf-tol), а также
+считает время стадий и накладные расходы Python сверх самой сети (total - forward).
+
+Запуск:
+    python tools/compare_backends.py --frames recordings/match_01
+    python tools/compare_backends.py --frames recordings/match_01 --json compare_backends.json
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+import cv2
+import numpy as np
+
+from modules.yolo_detector import YoloDetector
+from modules.yolo_direct import DirectYoloRunner
+from modules.detection_postprocess import iou_matrix
+from modules.tracker import greedy_match
+from config import MODEL_PATH, YOLO_IMG_SIZE
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+TIMING_KEYS = ('preprocess', 'forward', 'postprocess', 'total', 'overhead')
+
+
+def compare_frame(reference, candidate, iou_threshold, conf_tolerance):
+    """Количество совпавших детекций двух способов на одном кадре."""
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0
+    ious = iou_matrix(reference.boxes, candidate.boxes)
+    ious[reference.class_ids[:, None] != candidate.class_ids[None, :]] = 0.0
+    ious[np.abs(reference.scores[:, None] - candidate.scores[None, :]) > conf_tolerance] = 0.0
+    rows, _ = greedy_match(ious, iou_threshold)
+    return int(rows.size)
+
+
+def percentiles(values):
+    """p50 / p95 списка времен (мс)."""
+    return {'p50': float(np.percentile(values, 50)), 'p95': float(np.percentile(values, 95))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение model.predict() и прямого инференса сети")
+    parser.add_argument('--frames', required=True, help="папка с записанными кадрами")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--iou', type=float, default=0.99, help="минимальный IoU совпадающих детекций")
+    parser.add_argument('--conf-tol', type=float, default=1e-3, help="допустимая разница уверенности")
+    parser.add_argument('--json', default=None, help="файл для сохранения результатов")
+    args = parser.parse_args()
+
+    frames = sorted(p for p in Path(args.frames).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not frames:
+        logger.error("Нет кадров в %s", args.frames)
+        return
+
+    detector = YoloDetector(args.model)
+    if not detector.load_model():
+        return
+    direct = detector.runner or DirectYoloRunner(detector.model, YOLO_IMG_SIZE)
+
+    timings = {'predict': {key: [] for key in TIMING_KEYS}, 'direct': {key: [] for key in TIMING_KEYS}}
+    totals = {'predict': 0, 'direct': 0, 'matched': 0}
+
+    for frame_path in frames:
+        frame = cv2.imread(str(frame_path))
+        if frame is None:
+            continue
+
+        results = {}
+        for name, runner in (('predict', None), ('direct', direct)):
+            detector.runtime.runner = runner
+            results[name] = detector._infer(frame)
+            for key in TIMING_KEYS:
+                timings[name][key].append(detector.last_timings.get(key, 0.0))
+
+        totals['predict'] += len(results['predict'])
+        totals['direct'] += len(results['direct'])
+        totals['matched'] += compare_frame(results['predict'], results['direct'], args.iou, args.conf_tol)
+
+    report = {
+        'frames': len(timings['direct']['total']),
+        'detections': totals,
+        'agreement': totals['matched'] / max(totals['predict'], totals['direct'], 1),
+        'timings_ms': {name: {key: percentiles(values) for key, values in stages.items()}
+                       for name, stages in timings.items()},
+    }
+
+    print(f"Кадров: {report['frames']}")
+    print(f"Детекций: predict = {totals['predict']}, direct = {totals['direct']}, совпало = {totals['matched']} "
+          f"({report['agreement']:.2%})")
+    print(f"{'p50, мс':14}{'predict':>10}{'direct':>10}")
+    for key in TIMING_KEYS:
+        print(f"{key:14}{report['timings_ms']['predict'][key]['p50']:>10.2f}"
+              f"{report['timings_ms']['direct'][key]['p50']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
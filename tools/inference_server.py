@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Запуск локального сервера инференса (одна модель YOLO на несколько ботов).
+
+Боты подключаются с INFERENCE_MODE = "client" в config.py.
+
+Запуск:
+    python tools/inference_server.py
+    python tools/inference_server.py --address /tmp/clash_royale_yolo.sock --max-batch 4 --max-wait-ms 5 --warmup 720x405
+"""
+
+import sys
+import signal
+import argparse
+import logging
+from pathlib import Path
+
+# Добавляем корневую папку проекта в sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.INFO, format='[%(asctime)s] #%(levelname)-5s -  %(name)s:%(lineno)d  -  %(message)s')
+logger = logging.getLogger(__name__)
+
+from modules.yolo_detector import YoloDetector
+from modules.inference_server import InferenceServer
+from config import MODEL_PATH, INFERENCE_SERVER_ADDRESS, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный сервер инференса YOLO")
+    parser.add_argument('--address', default=INFERENCE_SERVER_ADDRESS, help="путь к Unix-сокету или host:port")
+    parser.add_argument('--model', default=MODEL_PATH, help="путь к модели (.pt)")
+    parser.add_argument('--max-batch', type=int, default=INFERENCE_MAX_BATCH, help="максимум кадров в пачке")
+    parser.add_argument('--max-wait-ms', type=float, default=INFERENCE_MAX_WAIT_MS, help="ожидание кадров пачки (мс)")
+    parser.add_argument('--warmup', default=None, help="размер кадра ROI для прогрева ШxВ")
+    args = parser.parse_args()
+
+    frame_shape = None
+    if args.warmup:
+        width, height = (int(v) for v in args.warmup.lower().split('x'))
+        frame_shape = (height, width, 3)
+
+    detector = YoloDetector(args.model)
+    detector.tracker = None  # треки ведут клиенты (у каждого стола свои)
+    if not detector.load_model(frame_shape=frame_shape):
+        return
+
+    server = InferenceServer(detector, args.address, args.max_batch, args.max_wait_ms)
+    signal.signal(signal.SIGINT, lambda *_: server.shutdown())
+    signal.signal(signal.SIGTERM, lambda *_: server.shutdown())
+
+    server.serve_forever()
+    logger.info("Сервер остановлен: %s кадров в %s пачках", server.frames, server.batches)
+
+
+if __name__ == "__main__":
+    main()